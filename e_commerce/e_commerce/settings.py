@@ -38,12 +38,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "shop.middleware.AnonymousPageCacheMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "shop.middleware.ProductViewFlushMiddleware",
 ]
 
 ROOT_URLCONF = "e_commerce.urls"
@@ -124,9 +126,17 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
-        "LOCATION": os.path.join(BASE_DIR, "shop_cache"),
-    }
+        "BACKEND": "shop.cache.TwoTierCache",
+        "LOCATION": "shared",
+        "OPTIONS": {"MAX_ENTRIES": 1000, "STALENESS": 2},
+    },
+    "shared": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "shop_cache",
+        # Two rows per value; culling a tenth of a large table keeps
+        # version keys and hot pages from being evicted all at once.
+        "OPTIONS": {"MAX_ENTRIES": 200000, "CULL_FREQUENCY": 10},
+    },
 }
 
 EMAIL_HOST = os.getenv("MAIL_SERVER")
@@ -0,0 +1,242 @@
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from .counters import get_counter, increment_counter
+from .models import Brand, Category, ProductCard
+from .search import get_words
+
+SEQUENCE_COUNTER = "shop:autocomplete:sequence"
+CHANGE_KEY = "shop:autocomplete:change:{}"
+CHANGE_TIMEOUT = 60 * 60
+TOP_PREFIX_LENGTH = 3
+TOP_SIZE = 50
+MAX_CHANGES = 500
+PRODUCT, CATEGORY, BRAND = "product", "category", "brand"
+ALL = "all"
+
+
+class Suggestion(NamedTuple):
+    kind: str
+    pk: int
+    label: str
+    url: str
+    popularity: int
+
+
+def get_sync_interval() -> float:
+    """
+    Returns seconds between checks of the shared change counter.
+    """
+    return getattr(settings, "SHOP_AUTOCOMPLETE_SYNC_INTERVAL", 5)
+
+
+def get_keys(label: str) -> List[str]:
+    """
+    Returns index keys of the label: normalized text starting from every
+    word, so "Тактичний рюкзак" is found by "рюк" as well.
+    """
+    words = get_words(label)
+    return list(dict.fromkeys(" ".join(words[i:]) for i in range(len(words))))
+
+
+def get_brand_url(name: str) -> str:
+    return f"{reverse('shop:search_results')}?{urlencode({'q': name})}"
+
+
+def load_suggestions(kind: str, pk: Optional[int] = None) -> List[Suggestion]:
+    """
+    Loads suggestions of given kind from database, all or one by pk.
+    """
+    if kind == PRODUCT:
+        cards = ProductCard.objects.all()
+        if pk is not None:
+            cards = cards.filter(pk=pk)
+        return [
+            Suggestion(PRODUCT, *row)
+            for row in cards.values_list("product_id", "name", "url", "access_number")
+        ]
+    model = Category if kind == CATEGORY else Brand
+    objects = model.objects.annotate(popularity=Sum("product__access_number"))
+    if pk is not None:
+        objects = objects.filter(pk=pk)
+    return [
+        Suggestion(
+            kind,
+            obj_pk,
+            name,
+            reverse("shop:category", kwargs={"category_slug": slug})
+            if kind == CATEGORY
+            else get_brand_url(name),
+            popularity or 0,
+        )
+        for obj_pk, name, slug, popularity in objects.values_list(
+            "pk", "name", "slug", "popularity"
+        )
+    ]
+
+
+class PrefixIndex:
+    """
+    Sorted array of (key, kind, pk) tuples. Prefix lookup is a binary
+    search followed by a scan of all keys with the prefix, ranked by
+    popularity. Ranked suggestions of short prefixes, which match many
+    keys, are kept until a suggestion with such prefix changes.
+    """
+
+    def __init__(self, suggestions: List[Suggestion] = ()) -> None:
+        self.entries: Dict[Tuple[str, int], Suggestion] = {}
+        self.keys: List[Tuple[str, str, int]] = []
+        self.top: Dict[str, List[Suggestion]] = {}
+        for suggestion in suggestions:
+            self.entries[suggestion.kind, suggestion.pk] = suggestion
+            self.keys.extend(
+                (key, suggestion.kind, suggestion.pk)
+                for key in get_keys(suggestion.label)
+            )
+        self.keys.sort()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def forget_top(self, label: str) -> None:
+        for key in get_keys(label):
+            for length in range(1, TOP_PREFIX_LENGTH + 1):
+                self.top.pop(key[:length], None)
+
+    def add(self, suggestion: Suggestion) -> None:
+        self.remove(suggestion.kind, suggestion.pk)
+        self.entries[suggestion.kind, suggestion.pk] = suggestion
+        for key in get_keys(suggestion.label):
+            insort(self.keys, (key, suggestion.kind, suggestion.pk))
+        self.forget_top(suggestion.label)
+
+    def remove(self, kind: str, pk: int) -> None:
+        suggestion = self.entries.pop((kind, pk), None)
+        if not suggestion:
+            return
+        for key in get_keys(suggestion.label):
+            position = bisect_left(self.keys, (key, kind, pk))
+            if position < len(self.keys) and self.keys[position] == (key, kind, pk):
+                del self.keys[position]
+        self.forget_top(suggestion.label)
+
+    def rank(self, prefix: str, limit: int) -> List[Suggestion]:
+        found = {}
+        for position in range(bisect_left(self.keys, (prefix,)), len(self.keys)):
+            key, kind, pk = self.keys[position]
+            if not key.startswith(prefix):
+                break
+            found[kind, pk] = self.entries[kind, pk]
+        return heapq.nlargest(limit, found.values(), key=lambda item: item.popularity)
+
+    def lookup(self, prefix: str, limit: int) -> List[Suggestion]:
+        if len(prefix) > TOP_PREFIX_LENGTH or limit > TOP_SIZE:
+            return self.rank(prefix, limit)
+        top = self.top.get(prefix)
+        if top is None:
+            top = self.top[prefix] = self.rank(prefix, TOP_SIZE)
+        return top[:limit]
+
+
+class AutocompleteIndex:
+    """
+    Process wide PrefixIndex over product, category and brand names.
+    Changes are numbered by shared counter and kept in the shared cache,
+    so every process applies changes made by others incrementally and
+    rebuilds the index only if some change already expired. The counter
+    is checked at most once per sync interval, and popularity is reloaded
+    when the trending job publishes a refresh.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.index: Optional[PrefixIndex] = None
+        self.sequence = 0
+        self.checked_at = 0.0
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self.index = None
+
+    def rebuild(self, sequence: int) -> None:
+        self.index = PrefixIndex(
+            [
+                *load_suggestions(PRODUCT),
+                *load_suggestions(CATEGORY),
+                *load_suggestions(BRAND),
+            ]
+        )
+        self.sequence = sequence
+
+    def apply(self, kind: str, pk: int) -> None:
+        if kind == ALL:
+            self.rebuild(self.sequence)
+            return
+        suggestions = load_suggestions(kind, pk)
+        if suggestions:
+            self.index.add(suggestions[0])
+        else:
+            self.index.remove(kind, pk)
+
+    def sync(self) -> PrefixIndex:
+        now = time.monotonic()
+        with self.lock:
+            if self.index is not None and now - self.checked_at < get_sync_interval():
+                return self.index
+        sequence = get_counter(SEQUENCE_COUNTER)
+        with self.lock:
+            self.checked_at = now
+            if self.index is None or sequence < self.sequence:
+                self.rebuild(sequence)
+            elif sequence - self.sequence > MAX_CHANGES:
+                self.rebuild(sequence)
+            elif sequence > self.sequence:
+                numbers = range(self.sequence + 1, sequence + 1)
+                changes = cache.get_many([CHANGE_KEY.format(i) for i in numbers])
+                if len(changes) < len(numbers) or any(
+                    change[0] == ALL for change in changes.values()
+                ):
+                    self.rebuild(sequence)
+                else:
+                    for number in numbers:
+                        self.apply(*changes[CHANGE_KEY.format(number)])
+                    self.sequence = sequence
+            return self.index
+
+    def record_change(self, kind: str, pk: int) -> None:
+        """
+        Publishes change of the object for all processes and applies it
+        to the index of the current one.
+        """
+        sequence = increment_counter(SEQUENCE_COUNTER)
+        cache.set(CHANGE_KEY.format(sequence), (kind, pk), CHANGE_TIMEOUT)
+        with self.lock:
+            if self.index is not None and self.sequence == sequence - 1:
+                self.apply(kind, pk)
+                self.sequence = sequence
+
+    def record_refresh(self) -> None:
+        """
+        Makes all processes reload the index with current popularity.
+        """
+        self.record_change(ALL, 0)
+
+    def lookup(self, query: Optional[str], limit: int) -> List[Suggestion]:
+        prefix = " ".join(get_words(query))
+        if not prefix:
+            return []
+        index = self.sync()
+        with self.lock:
+            return index.lookup(prefix, limit)
+
+
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,194 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+NEAR, SHARED = "near", "shared"
+STAMP_SUFFIX = ":stamp"
+
+
+class TwoTierCache(BaseCache):
+    """
+    Cache backend with bounded in-process LRU (near tier) in front of
+    other configured cache (shared tier), e.g.
+
+        "default": {
+            "BACKEND": "shop.cache.TwoTierCache",
+            "LOCATION": "shared",
+            "OPTIONS": {"MAX_ENTRIES": 1000, "STALENESS": 2},
+        }
+
+    Every shared value has random stamp kept under separate key. Near
+    entry is used without checks for STALENESS seconds, then its stamp is
+    compared with the shared one, so change made by any process is seen
+    by all others within STALENESS seconds and unchanged big values are
+    not loaded again.
+    """
+
+    def __init__(self, location: str, params: Dict[str, Any]) -> None:
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.shared_alias = location
+        self.staleness = options.get("STALENESS", 2)
+        self.lock = threading.Lock()
+        self.near: "OrderedDict[str, Tuple[Any, str, Optional[float], float]]" = (
+            OrderedDict()
+        )
+        self.stats = {
+            NEAR: {"hits": 0, "misses": 0},
+            SHARED: {"hits": 0, "misses": 0},
+        }
+
+    @property
+    def shared(self) -> BaseCache:
+        return caches[self.shared_alias]
+
+    def count(self, tier: str, hit: bool) -> None:
+        with self.lock:
+            self.stats[tier]["hits" if hit else "misses"] += 1
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns hit and miss numbers of both tiers in this process.
+        """
+        with self.lock:
+            stats = {tier: dict(numbers) for tier, numbers in self.stats.items()}
+            stats[NEAR]["entries"] = len(self.near)
+        return stats
+
+    def get_expiry(self, timeout: Any) -> Optional[float]:
+        timeout = self.get_backend_timeout(timeout)
+        return None if timeout is None else time.time() + timeout
+
+    def remember(
+        self, key: str, value: Any, stamp: str, expiry: Optional[float]
+    ) -> None:
+        with self.lock:
+            self.near[key] = (value, stamp, expiry, time.monotonic())
+            self.near.move_to_end(key)
+            while len(self.near) > self._max_entries:
+                self.near.popitem(last=False)
+
+    def forget(self, key: str) -> None:
+        with self.lock:
+            self.near.pop(key, None)
+
+    def get_shared(self, key: str, version: Optional[int]) -> Optional[Tuple]:
+        """
+        Returns (value, stamp, expiry) from shared tier and keeps it in
+        the near tier.
+        """
+        entry = self.shared.get(key, version=version)
+        self.count(SHARED, entry is not None)
+        if entry is None:
+            return None
+        stamp, expiry, value = entry
+        if expiry is not None and expiry <= time.time():
+            return None
+        self.remember(self.make_and_validate_key(key, version), value, stamp, expiry)
+        return value, stamp, expiry
+
+    def get_near(self, key: str, version: Optional[int]) -> Tuple[bool, Any]:
+        """
+        Returns (found, value) of the near tier, revalidating entry older
+        than STALENESS by the shared stamp.
+        """
+        near_key = self.make_and_validate_key(key, version)
+        with self.lock:
+            entry = self.near.get(near_key)
+            if entry is not None:
+                self.near.move_to_end(near_key)
+        if entry is None:
+            self.count(NEAR, False)
+            return False, None
+        value, stamp, expiry, checked_at = entry
+        if expiry is not None and expiry <= time.time():
+            self.forget(near_key)
+            self.count(NEAR, False)
+            return False, None
+        if time.monotonic() - checked_at < self.staleness:
+            self.count(NEAR, True)
+            return True, value
+        if self.shared.get(key + STAMP_SUFFIX, version=version) != stamp:
+            self.forget(near_key)
+            self.count(NEAR, False)
+            return False, None
+        self.remember(near_key, value, stamp, expiry)
+        self.count(NEAR, True)
+        return True, value
+
+    def get(self, key: str, default: Any = None, version: Optional[int] = None) -> Any:
+        found, value = self.get_near(key, version)
+        if found:
+            return value
+        entry = self.get_shared(key, version)
+        return default if entry is None else entry[0]
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        timeout: Any = DEFAULT_TIMEOUT,
+        version: Optional[int] = None,
+    ) -> None:
+        stamp, expiry = uuid.uuid4().hex, self.get_expiry(timeout)
+        self.shared.set_many(
+            {key: (stamp, expiry, value), key + STAMP_SUFFIX: stamp},
+            timeout,
+            version=version,
+        )
+        self.remember(self.make_and_validate_key(key, version), value, stamp, expiry)
+
+    def add(
+        self,
+        key: str,
+        value: Any,
+        timeout: Any = DEFAULT_TIMEOUT,
+        version: Optional[int] = None,
+    ) -> bool:
+        stamp, expiry = uuid.uuid4().hex, self.get_expiry(timeout)
+        if not self.shared.add(key, (stamp, expiry, value), timeout, version=version):
+            return False
+        self.shared.set(key + STAMP_SUFFIX, stamp, timeout, version=version)
+        self.remember(self.make_and_validate_key(key, version), value, stamp, expiry)
+        return True
+
+    def touch(
+        self, key: str, timeout: Any = DEFAULT_TIMEOUT, version: Optional[int] = None
+    ) -> bool:
+        entry = self.get_shared(key, version)
+        if entry is None:
+            return False
+        self.set(key, entry[0], timeout, version=version)
+        return True
+
+    def incr(self, key: str, delta: int = 1, version: Optional[int] = None) -> int:
+        """
+        Increments shared value, ignoring possibly stale near entry.
+        Like file based cache, it is not atomic between processes, so
+        shared counters are kept in shop.counters instead.
+        """
+        entry = self.get_shared(key, version)
+        if entry is None:
+            raise ValueError(f"Key '{key}' not found")
+        value, stamp, expiry = entry
+        timeout = None if expiry is None else max(expiry - time.time(), 0.001)
+        self.set(key, value + delta, timeout, version=version)
+        return value + delta
+
+    def delete(self, key: str, version: Optional[int] = None) -> bool:
+        self.forget(self.make_and_validate_key(key, version))
+        self.shared.delete(key + STAMP_SUFFIX, version=version)
+        return self.shared.delete(key, version=version)
+
+    def has_key(self, key: str, version: Optional[int] = None) -> bool:
+        return self.get(key, version=version) is not None
+
+    def clear(self) -> None:
+        with self.lock:
+            self.near.clear()
+        self.shared.clear()
@@ -0,0 +1,71 @@
+import random
+import time
+from typing import Any, Callable, Optional
+
+from django.core.cache import cache
+
+LOCK_KEY = "{}:lock"
+LOCK_TIMEOUT = 30
+WAIT_TIMEOUT = 2
+WAIT_STEP = 0.05
+JITTER = 0.1
+
+
+def get_fresh_until(timeout: int) -> float:
+    """
+    Returns time when value computed now becomes stale. Timeout is
+    shortened by up to JITTER, so values computed together do not expire
+    together.
+    """
+    return time.time() + timeout * (1 - random.random() * JITTER)
+
+
+def store(key: str, value: Any, timeout: int, stale_timeout: int) -> None:
+    cache.set(key, (get_fresh_until(timeout), value), timeout + stale_timeout)
+
+
+def wait_for_value(key: str) -> Optional[tuple]:
+    """
+    Polls cache for entry computed by lock owner, returns None if it is
+    not there in WAIT_TIMEOUT.
+    """
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_STEP)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def cached_compute(
+    key: str,
+    compute: Callable[[], Any],
+    timeout: int,
+    stale_timeout: Optional[int] = None,
+) -> Any:
+    """
+    Returns cached value of compute() under the key. Only the worker
+    holding the key lock recomputes: for stale_timeout (timeout by
+    default) after value became stale others get the stale value, on
+    miss they wait for the new one. Callers put versions in keys, so
+    invalidated values are never served stale.
+    """
+    stale_timeout = timeout if stale_timeout is None else stale_timeout
+    entry = cache.get(key)
+    if entry is not None and entry[0] > time.time():
+        return entry[1]
+    lock_key = LOCK_KEY.format(key)
+    if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        if entry is not None:
+            return entry[1]
+        entry = wait_for_value(key)
+        if entry is not None:
+            return entry[1]
+        return compute()
+    try:
+        value = compute()
+        store(key, value, timeout, stale_timeout)
+    finally:
+        cache.delete(lock_key)
+    return value
@@ -0,0 +1,148 @@
+from typing import Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+
+from .models import Brand, Category, Product, ProductCard, ProductImage
+from .ratings import reconcile_ratings
+from .templatetags.shop_tags import hide_brackets
+
+
+def first_image_subquery() -> Subquery:
+    """
+    Returns subquery selecting path of the first product image for
+    the outer product.
+    """
+    return Subquery(
+        ProductImage.objects.filter(product=OuterRef("pk"))
+        .order_by("pk")
+        .values("image")[:1]
+    )
+
+
+CARD_FIELDS = [
+    "name",
+    "price",
+    "sold",
+    "image",
+    "category_name",
+    "category_slug",
+    "brand_name",
+    "url",
+    "access_number",
+]
+
+
+def get_card_data(product: Product, image: Optional[str]) -> Dict:
+    """
+    Creates ProductCard field values for given product with loaded
+    category and brand.
+    """
+    return {
+        "name": hide_brackets(product.name),
+        "price": product.price,
+        "sold": product.sold,
+        "image": image or "",
+        "category_name": product.category.name,
+        "category_slug": product.category.slug,
+        "brand_name": product.brand.name if product.brand else "",
+        "url": product.get_absolute_url(),
+        "access_number": product.access_number,
+    }
+
+
+def refresh_product_card(product_id: int) -> Optional[ProductCard]:
+    """
+    Creates or updates card for the product with given id. Deletes
+    card if product does not exist anymore.
+    """
+    product = (
+        Product.objects.filter(pk=product_id)
+        .select_related("category", "brand")
+        .annotate(first_image=first_image_subquery())
+        .first()
+    )
+    if not product:
+        ProductCard.objects.filter(pk=product_id).delete()
+        return None
+    card, created = ProductCard.objects.update_or_create(
+        product_id=product_id, defaults=get_card_data(product, product.first_image)
+    )
+    if created:
+        reconcile_ratings([product_id])
+    return card
+
+
+def refresh_card_image(product_id: int) -> None:
+    """
+    Updates first image path on the card of the product with given id.
+    """
+    image = (
+        ProductImage.objects.filter(product_id=product_id)
+        .order_by("pk")
+        .values_list("image", flat=True)
+        .first()
+    )
+    ProductCard.objects.filter(pk=product_id).update(image=image or "")
+
+
+def refresh_category_cards(category: Category) -> None:
+    """
+    Updates category data on the cards of all category products.
+    """
+    ProductCard.objects.filter(product__category=category).update(
+        category_name=category.name, category_slug=category.slug
+    )
+
+
+def refresh_brand_cards(brand: Brand) -> None:
+    """
+    Updates brand name on the cards of all brand products.
+    """
+    ProductCard.objects.filter(product__brand=brand).update(brand_name=brand.name)
+
+
+def rebuild_product_cards(
+    product_ids: Optional[Iterable[int]] = None, batch_size: int = 500
+) -> int:
+    """
+    Rebuilds cards for given products or for the whole catalog in batches
+    with their ratings, returns number of written cards.
+    """
+    products = Product.objects.select_related("category", "brand").annotate(
+        first_image=first_image_subquery()
+    )
+    if product_ids is not None:
+        product_ids = list(product_ids)
+        products = products.filter(pk__in=product_ids)
+    cards, number = [], 0
+    for product in products.order_by("pk").iterator(chunk_size=batch_size):
+        cards.append(
+            ProductCard(product=product, **get_card_data(product, product.first_image))
+        )
+        if len(cards) >= batch_size:
+            number += write_cards(cards)
+            cards = []
+    number += write_cards(cards)
+    reconcile_ratings(product_ids, batch_size)
+    return number
+
+
+def write_cards(cards: List[ProductCard]) -> int:
+    """
+    Updates product fields of stored cards and creates missing ones in
+    one transaction, keeping trending score and rating counters.
+    """
+    stored = set(
+        ProductCard.objects.filter(pk__in=[card.pk for card in cards]).values_list(
+            "pk", flat=True
+        )
+    )
+    with transaction.atomic():
+        ProductCard.objects.bulk_update(
+            [card for card in cards if card.pk in stored], CARD_FIELDS
+        )
+        ProductCard.objects.bulk_create(
+            [card for card in cards if card.pk not in stored], ignore_conflicts=True
+        )
+    return len(cards)
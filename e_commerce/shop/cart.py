@@ -0,0 +1,350 @@
+import datetime
+import json
+import uuid
+from array import array
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+
+from .models import AnonymousCart, Buyer, Order, OrderItem
+
+CART_COOKIE = "cart_id"
+LEGACY_CART_COOKIE = "cart"
+CART_KEY = "shop:cart:{}"
+CART_SALT = "shop.cart"
+CART_ATTRIBUTE = "_shop_cart"
+
+
+def get_cart_timeout() -> int:
+    return getattr(settings, "SHOP_CART_TIMEOUT", 60 * 60 * 24 * 30)
+
+
+class Cart:
+    """
+    Quantities of products in cart, kept as two parallel arrays of
+    product ids and quantities. Version changes on every save.
+    """
+
+    __slots__ = ("key", "version", "product_ids", "quantities", "modified")
+
+    def __init__(
+        self,
+        key: Optional[str] = None,
+        version: str = "",
+        product_ids: Iterable[int] = (),
+        quantities: Iterable[int] = (),
+    ) -> None:
+        self.key = key
+        self.version = version
+        self.product_ids = array("q", product_ids)
+        self.quantities = array("q", quantities)
+        self.modified = False
+
+    def __len__(self) -> int:
+        return len(self.product_ids)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.product_ids, self.quantities)
+
+    def get(self, product_id: int) -> int:
+        try:
+            return self.quantities[self.product_ids.index(product_id)]
+        except ValueError:
+            return 0
+
+    def set(self, product_id: int, quantity: int) -> None:
+        """
+        Sets quantity of the product, removing it for zero quantity.
+        """
+        try:
+            index = self.product_ids.index(product_id)
+        except ValueError:
+            if quantity > 0:
+                self.product_ids.append(product_id)
+                self.quantities.append(quantity)
+                self.modified = True
+            return
+        if quantity > 0:
+            self.quantities[index] = quantity
+        else:
+            del self.product_ids[index]
+            del self.quantities[index]
+        self.modified = True
+
+    def add(self, product_id: int, quantity: int = 1) -> None:
+        self.set(product_id, self.get(product_id) + quantity)
+
+    def replace(self, quantities: Dict[int, int]) -> None:
+        quantities = {key: value for key, value in quantities.items() if value > 0}
+        self.product_ids = array("q", quantities)
+        self.quantities = array("q", quantities.values())
+        self.modified = True
+
+    def clear(self) -> None:
+        self.replace({})
+
+    @property
+    def total_quantity(self) -> int:
+        return sum(self.quantities)
+
+    def as_dict(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns cart in format of former cart cookie.
+        """
+        return {
+            str(product_id): {"quantity": quantity} for product_id, quantity in self
+        }
+
+    def dump(self) -> Tuple[str, bytes, bytes]:
+        return self.version, self.product_ids.tobytes(), self.quantities.tobytes()
+
+    @classmethod
+    def load(cls, key: str, entry: Tuple[str, bytes, bytes]) -> "Cart":
+        cart = cls(key, entry[0])
+        cart.product_ids.frombytes(entry[1])
+        cart.quantities.frombytes(entry[2])
+        return cart
+
+
+def parse_legacy_cart(value: str) -> Dict[int, int]:
+    """
+    Parses cart cookie written by former cart script, skipping broken
+    items.
+    """
+    try:
+        data = json.loads(value.replace("'", '"'))
+    except ValueError:
+        return {}
+    quantities = {}
+    if isinstance(data, dict):
+        for product_id, item in data.items():
+            try:
+                quantities[int(product_id)] = int(item["quantity"])
+            except (KeyError, TypeError, ValueError):
+                pass
+    return quantities
+
+
+def get_user_cart_key(user_id: int) -> str:
+    return CART_KEY.format(f"user:{user_id}")
+
+
+def get_anonymous_cart_key(cart_id: str) -> str:
+    return CART_KEY.format(f"anonymous:{cart_id}")
+
+
+def get_signer() -> signing.Signer:
+    return signing.Signer(salt=CART_SALT)
+
+
+def get_cart_id(request: HttpRequest) -> Optional[str]:
+    try:
+        return get_signer().unsign(request.COOKIES.get(CART_COOKIE, ""))
+    except signing.BadSignature:
+        return None
+
+
+def load_buyer_cart(user_id: int) -> Dict[int, int]:
+    """
+    Reads cart of the buyer from items of the last not completed order.
+    """
+    order = Order.objects.filter(buyer__user=user_id, complete=False).last()
+    if order is None:
+        return {}
+    items = OrderItem.objects.filter(order=order, quantity__gt=0)
+    return dict(items.order_by("pk").values_list("product", "quantity"))
+
+
+def write_buyer_cart(user_id: int, cart: Cart) -> None:
+    """
+    Makes items of not completed order of the buyer match the cart.
+    """
+    with transaction.atomic():
+        order = Order.objects.filter(buyer__user=user_id, complete=False).last()
+        if order is None:
+            if not cart:
+                return
+            buyer, created = Buyer.objects.get_or_create(user_id=user_id)
+            order = Order.objects.create(buyer=buyer, complete=False)
+        items = OrderItem.objects.filter(order=order)
+        items.exclude(product__in=list(cart.product_ids)).delete()
+        existing = {item.product_id: item for item in items}
+        created, changed = [], []
+        for product_id, quantity in cart:
+            item = existing.get(product_id)
+            if item is None:
+                created.append(
+                    OrderItem(order=order, product_id=product_id, quantity=quantity)
+                )
+            elif item.quantity != quantity:
+                item.quantity = quantity
+                changed.append(item)
+        OrderItem.objects.bulk_create(created)
+        OrderItem.objects.bulk_update(changed, ["quantity"])
+
+
+def load_anonymous_cart(key: str) -> Optional[Cart]:
+    """
+    Reads anonymous cart through the cache from its table row.
+    """
+    entry = cache.get(key)
+    if entry is None:
+        row = (
+            AnonymousCart.objects.filter(key=key)
+            .values_list("version", "product_ids", "quantities")
+            .first()
+        )
+        if row is None:
+            return None
+        entry = (row[0], bytes(row[1]), bytes(row[2]))
+        cache.set(key, entry, get_cart_timeout())
+    return Cart.load(key, entry)
+
+
+def write_anonymous_cart(cart: Cart) -> None:
+    """
+    Stores anonymous cart in its table row, removing the row of empty
+    cart.
+    """
+    if not cart:
+        AnonymousCart.objects.filter(key=cart.key).delete()
+        return
+    version, product_ids, quantities = cart.dump()
+    AnonymousCart.objects.update_or_create(
+        key=cart.key,
+        defaults={
+            "version": version,
+            "product_ids": product_ids,
+            "quantities": quantities,
+        },
+    )
+
+
+def forget_stored_cart(key: str) -> None:
+    AnonymousCart.objects.filter(key=key).delete()
+    cache.delete(key)
+
+
+def remove_expired_carts() -> int:
+    """
+    Deletes anonymous carts not changed for SHOP_CART_TIMEOUT seconds,
+    returns number of deleted carts.
+    """
+    moment = timezone.now() - datetime.timedelta(seconds=get_cart_timeout())
+    carts = AnonymousCart.objects.filter(updated_at__lt=moment)
+    return carts.delete()[1].get(AnonymousCart._meta.label, 0)
+
+
+def get_anonymous_cart(request: HttpRequest) -> Cart:
+    """
+    Returns cart of the cart id cookie. Without stored cart, imports
+    the cart cookie of former cart script.
+    """
+    cart_id = get_cart_id(request)
+    if cart_id is not None:
+        cart = load_anonymous_cart(get_anonymous_cart_key(cart_id))
+        if cart is not None:
+            return cart
+    cart = Cart(get_anonymous_cart_key(cart_id or uuid.uuid4().hex))
+    legacy = request.COOKIES.get(LEGACY_CART_COOKIE)
+    if legacy:
+        cart.replace(parse_legacy_cart(legacy))
+    return cart
+
+
+def get_buyer_cart(user_id: int) -> Cart:
+    key = get_user_cart_key(user_id)
+    entry = cache.get(key)
+    if entry is not None:
+        return Cart.load(key, entry)
+    quantities = load_buyer_cart(user_id)
+    cart = Cart(key, uuid.uuid4().hex, quantities, quantities.values())
+    cache.set(key, cart.dump(), get_cart_timeout())
+    return cart
+
+
+def get_cart(request: HttpRequest) -> Cart:
+    """
+    Returns cart of the request, loaded once per request. Carts of
+    authenticated users are stored in orders, carts of anonymous users
+    in AnonymousCart rows under signed id from cookie, both read through
+    the cache.
+    """
+    cart = getattr(request, CART_ATTRIBUTE, None)
+    if cart is None:
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            cart = get_buyer_cart(user.pk)
+        else:
+            cart = get_anonymous_cart(request)
+        setattr(request, CART_ATTRIBUTE, cart)
+    return cart
+
+
+def save_cart(request: HttpRequest, response: HttpResponse) -> None:
+    """
+    Stores modified cart of the request. Carts of authenticated users
+    are written through to their orders, anonymous users get signed
+    cart id cookie.
+    """
+    cart = get_cart(request)
+    if not cart.modified:
+        return
+    cart.version = uuid.uuid4().hex
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        write_buyer_cart(user.pk, cart)
+    else:
+        write_anonymous_cart(cart)
+        cart_id = cart.key.rpartition(":")[2]
+        response.set_cookie(
+            CART_COOKIE,
+            get_signer().sign(cart_id),
+            max_age=get_cart_timeout(),
+            httponly=True,
+            samesite="Lax",
+        )
+        if LEGACY_CART_COOKIE in request.COOKIES:
+            response.delete_cookie(LEGACY_CART_COOKIE)
+    cache.set(cart.key, cart.dump(), get_cart_timeout())
+    cart.modified = False
+
+
+def move_anonymous_cart(request: HttpRequest, user_id: int) -> Cart:
+    """
+    Makes cart of anonymous request the cart of the user who has just
+    logged in. Empty cart leaves cart of the user as it is.
+    """
+    cart = get_anonymous_cart(request)
+    if cart:
+        forget_stored_cart(cart.key)
+        cart.key = get_user_cart_key(user_id)
+        cart.version = uuid.uuid4().hex
+        write_buyer_cart(user_id, cart)
+        cache.set(cart.key, cart.dump(), get_cart_timeout())
+    else:
+        forget_buyer_cart(user_id)
+    if hasattr(request, CART_ATTRIBUTE):
+        delattr(request, CART_ATTRIBUTE)
+    return cart
+
+
+def forget_buyer_cart(user_id: int) -> None:
+    """
+    Drops cached cart of the user after its order was changed directly.
+    """
+    cache.delete(get_user_cart_key(user_id))
+
+
+def forget_anonymous_cart(request: HttpRequest, response: HttpResponse) -> None:
+    cart_id = get_cart_id(request)
+    if cart_id is not None:
+        forget_stored_cart(get_anonymous_cart_key(cart_id))
+    for name in (CART_COOKIE, LEGACY_CART_COOKIE):
+        if name in request.COOKIES:
+            response.delete_cookie(name)
@@ -0,0 +1,148 @@
+import hashlib
+import uuid
+from datetime import datetime
+from typing import Any, Iterable, List, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from .cart import CART_COOKIE, LEGACY_CART_COOKIE, get_cart
+
+STAMP_KEY = "shop:stamp:{}"
+NAVIGATION_STAMP = "navigation"
+PAGES_STAMP = "pages"
+HOME_STAMP = "home"
+
+
+class Stamp(NamedTuple):
+    """
+    Random version of a resource and time of its last change.
+    """
+
+    version: str
+    modified: datetime
+
+
+def new_stamp() -> Stamp:
+    return Stamp(uuid.uuid4().hex, timezone.now().replace(microsecond=0))
+
+
+def get_category_stamp_name(slug: str) -> str:
+    return f"category:{slug}"
+
+
+def get_stamps(*names: str) -> List[Stamp]:
+    """
+    Returns stamps of given names in one cache request, creating
+    missing ones.
+    """
+    keys = [STAMP_KEY.format(name) for name in names]
+    stamps = cache.get_many(keys)
+    return [stamps.get(key) or cache.get_or_set(key, new_stamp, None) for key in keys]
+
+
+def bump_stamps(*names: str) -> None:
+    cache.set_many({STAMP_KEY.format(name): new_stamp() for name in names}, None)
+
+
+def record_page_stamps(
+    request: HttpRequest, names: Iterable[str], stamps: Iterable[Stamp]
+) -> None:
+    """
+    Remembers stamps the page is rendered with, so cached page is used
+    only while none of them changed.
+    """
+    request.page_stamps = [(name, stamp.version) for name, stamp in zip(names, stamps)]
+
+
+def get_user_cookies() -> List[str]:
+    return [
+        settings.SESSION_COOKIE_NAME,
+        settings.CSRF_COOKIE_NAME,
+        CART_COOKIE,
+        LEGACY_CART_COOKIE,
+    ]
+
+
+def get_etag(request: HttpRequest, stamps: List[Stamp]) -> str:
+    """
+    Combines stamp versions with cookies and cart version the page
+    depends on. Pages cached for all anonymous users depend on neither.
+    """
+    parts = [stamp.version for stamp in stamps]
+    if not getattr(request, "page_cache", False):
+        parts.extend(request.COOKIES.get(name, "") for name in get_user_cookies())
+        parts.append(get_cart(request).version)
+    return quote_etag(hashlib.md5("|".join(parts).encode()).hexdigest())
+
+
+def get_last_modified(request: HttpRequest, stamps: List[Stamp]) -> Optional[int]:
+    """
+    Returns time of the last stamp change for pages cached for all
+    anonymous users. Other pages also change with cookies and cart,
+    which have no modification time, so they are validated by ETag only.
+    """
+    if not getattr(request, "page_cache", False):
+        return None
+    return int(max(stamp.modified for stamp in stamps).timestamp())
+
+
+def set_validators(
+    response: HttpResponse, etag: str, last_modified: Optional[int]
+) -> None:
+    if response.status_code == 200:
+        response.headers.setdefault("ETag", etag)
+        if last_modified is not None:
+            response.headers.setdefault("Last-Modified", http_date(last_modified))
+
+
+def get_cached_conditional_response(
+    request: HttpRequest, response: HttpResponse
+) -> HttpResponse:
+    """
+    Returns 304 response instead of cached page if validators stored
+    with it match the request.
+    """
+    last_modified = parse_http_date_safe(response.get("Last-Modified", ""))
+    response = get_conditional_response(
+        request, response.get("ETag"), last_modified, response
+    )
+    patch_vary_headers(response, ("Cookie",))
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    Answers GET and HEAD requests with 304 response when stamps of page
+    resources did not change, before the view does any work. Views
+    return names of the stamps from get_stamp_names(), views without
+    stamps are not validated.
+    """
+
+    def get_stamp_names(self) -> List[str]:
+        return []
+
+    def get_stamps(self) -> List[Stamp]:
+        return get_stamps(*self.get_stamp_names())
+
+    def dispatch(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)
+        stamps = self.get_stamps()
+        if not stamps:
+            return super().dispatch(request, *args, **kwargs)
+        record_page_stamps(request, self.get_stamp_names(), stamps)
+        etag = get_etag(request, stamps)
+        last_modified = get_last_modified(request, stamps)
+        response: Optional[HttpResponse] = get_conditional_response(
+            request, etag, last_modified
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            set_validators(response, etag, last_modified)
+        patch_vary_headers(response, ("Cookie",))
+        return response
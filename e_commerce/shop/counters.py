@@ -0,0 +1,23 @@
+from django.db import transaction
+from django.db.models import F
+
+from .models import SharedCounter
+
+
+def increment_counter(name: str, delta: int = 1) -> int:
+    """
+    Adds delta to the named counter and returns its new value. Row lock
+    taken by the update serializes concurrent increments, so every
+    caller gets its own value.
+    """
+    counters = SharedCounter.objects.filter(name=name)
+    with transaction.atomic():
+        if not counters.update(value=F("value") + delta):
+            SharedCounter.objects.get_or_create(name=name)
+            counters.update(value=F("value") + delta)
+        return counters.values_list("value", flat=True).get()
+
+
+def get_counter(name: str) -> int:
+    value = SharedCounter.objects.filter(name=name).values_list("value", flat=True)
+    return value.first() or 0
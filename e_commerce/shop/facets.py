@@ -0,0 +1,284 @@
+import hashlib
+import uuid
+from decimal import Decimal, InvalidOperation
+from functools import reduce
+from operator import and_, or_
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    Case,
+    CharField,
+    Count,
+    Exists,
+    F,
+    OuterRef,
+    Q,
+    QuerySet,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Concat
+from django.http import QueryDict
+
+from .cached_compute import cached_compute
+from .conditional import bump_stamps, get_category_stamp_name
+from .feature_index import match_products
+from .models import CategoryFeatures, ProductCard, ProductFeature
+
+FACETS_KEY = "shop:facets:{}:{}:{}"
+FACETS_VERSION_KEY = "shop:facets-version:{}"
+FACETS_TIMEOUT = 60 * 5
+BRAND, PRICE, FEATURE = "brand", "price", "feature:{}"
+
+
+class FilterState(NamedTuple):
+    brands: Tuple[str, ...] = ()
+    low: Optional[Decimal] = None
+    high: Optional[Decimal] = None
+    buckets: Tuple[int, ...] = ()
+    features: Tuple[Tuple[int, Tuple[str, ...]], ...] = ()
+
+    @property
+    def signature(self) -> str:
+        return hashlib.md5(repr(self).encode()).hexdigest()
+
+
+class Facets(NamedTuple):
+    brands: List[Tuple[str, int]]
+    prices: List[Tuple[int, int]]
+    features: List[Tuple[int, str, List[Tuple[str, int]]]]
+
+
+def get_price_bound(value: Optional[str]) -> Optional[Decimal]:
+    """
+    Converts price filter form value to Decimal, returns None for empty
+    or invalid value.
+    """
+    try:
+        return Decimal(value) if value else None
+    except InvalidOperation:
+        return None
+
+
+def get_price_buckets() -> List[Tuple[Decimal, Optional[Decimal]]]:
+    """
+    Returns price ranges [low, high) of price facet, the last one is open.
+    """
+    bounds = [
+        Decimal(bound)
+        for bound in getattr(
+            settings, "SHOP_PRICE_BUCKETS", (0, 500, 1000, 2000, 5000, 10000)
+        )
+    ]
+    return list(zip(bounds, [*bounds[1:], None]))
+
+
+def get_bucket_label(bucket: int) -> str:
+    low, high = get_price_buckets()[bucket]
+    return f"{low} – {high}" if high is not None else f"від {low}"
+
+
+def get_filter_state(data: Optional[QueryDict]) -> FilterState:
+    """
+    Parses category filter form data. Features are passed as
+    feature_<CategoryFeatures id> lists of values.
+    """
+    if not data:
+        return FilterState()
+    buckets = len(get_price_buckets())
+    features = []
+    for key in sorted(data):
+        feature_id = key[len("feature_") :]
+        if key.startswith("feature_") and feature_id.isdigit():
+            if values := tuple(sorted(set(data.getlist(key)))):
+                features.append((int(feature_id), values))
+    return FilterState(
+        brands=tuple(sorted(set(data.getlist("brand")))),
+        low=get_price_bound(data.get("low")),
+        high=get_price_bound(data.get("high")),
+        buckets=tuple(
+            sorted(
+                {
+                    int(bucket)
+                    for bucket in data.getlist("price")
+                    if bucket.isdigit() and int(bucket) < buckets
+                }
+            )
+        ),
+        features=tuple(features),
+    )
+
+
+def get_conditions(state: FilterState, prefix: str = "") -> Dict[str, Q]:
+    """
+    Creates filter condition of every facet for the rows which have
+    product card at prefix and product at "product" field.
+    """
+    conditions = {}
+    if state.brands:
+        conditions[BRAND] = Q(**{f"{prefix}brand_name__in": state.brands})
+    price = Q()
+    if state.low is not None:
+        price &= Q(**{f"{prefix}price__gte": state.low})
+    if state.high is not None:
+        price &= Q(**{f"{prefix}price__lte": state.high})
+    if state.buckets:
+        buckets = get_price_buckets()
+        price &= reduce(
+            or_,
+            (
+                Q(**{f"{prefix}price__gte": buckets[bucket][0]})
+                & (
+                    Q(**{f"{prefix}price__lt": buckets[bucket][1]})
+                    if buckets[bucket][1] is not None
+                    else Q()
+                )
+                for bucket in state.buckets
+            ),
+        )
+    if price:
+        conditions[PRICE] = price
+    for feature_id, values in state.features:
+        conditions[FEATURE.format(feature_id)] = Q(
+            Exists(
+                ProductFeature.objects.filter(
+                    product=OuterRef("product"),
+                    feature_name_id=feature_id,
+                    feature__in=values,
+                )
+            )
+        )
+    return conditions
+
+
+def combine(conditions: Dict[str, Q], exclude: Optional[str] = None) -> Q:
+    return reduce(
+        and_,
+        (condition for key, condition in conditions.items() if key != exclude),
+        Q(),
+    )
+
+
+def filter_products(
+    products: QuerySet, state: FilterState, slug: Optional[str] = None
+) -> QuerySet:
+    """
+    Applies all filters of the state to product cards queryset. Feature
+    filters of category products are answered by the category feature
+    index and applied as one id list.
+    """
+    if slug and state.features:
+        products = products.filter(pk__in=match_products(slug, state.features))
+        state = state._replace(features=())
+    return products.filter(combine(get_conditions(state)))
+
+
+def get_bucket_case(prefix: str = "") -> Case:
+    buckets = get_price_buckets()
+    return Case(
+        *(
+            When(**{f"{prefix}price__lt": high}, then=Value(number))
+            for number, (low, high) in enumerate(buckets[:-1])
+        ),
+        default=Value(len(buckets) - 1),
+    )
+
+
+def get_facets_queryset(slug: str, state: FilterState) -> QuerySet:
+    """
+    Creates single UNION ALL query of (facet, value, count) rows for brands,
+    price buckets and feature values of category products. Counts are
+    disjunctive: every facet is counted with filters of other facets only,
+    so all values of a facet stay selectable.
+    """
+    cards = ProductCard.objects.filter(category_slug=slug).order_by()
+    card_conditions = get_conditions(state)
+    brands = (
+        cards.exclude(brand_name="")
+        .values(facet=Value(BRAND), value=F("brand_name"))
+        .annotate(count=Count("pk", filter=combine(card_conditions, BRAND) or None))
+    )
+    prices = cards.values(
+        facet=Value(PRICE), value=Cast(get_bucket_case(), CharField())
+    ).annotate(count=Count("pk", filter=combine(card_conditions, PRICE) or None))
+    feature_conditions = get_conditions(state, prefix="product__card__")
+    selected = [feature_id for feature_id, values in state.features]
+    feature_filter = combine(feature_conditions)
+    if selected:
+        feature_filter = reduce(
+            or_,
+            (
+                Q(feature_name_id=feature_id)
+                & combine(feature_conditions, FEATURE.format(feature_id))
+                for feature_id in selected
+            ),
+            ~Q(feature_name_id__in=selected) & feature_filter,
+        )
+    features = (
+        ProductFeature.objects.filter(product__card__category_slug=slug)
+        .exclude(Q(feature__isnull=True) | Q(feature=""))
+        .order_by()
+        .values(
+            facet=Concat(
+                Value("feature:"),
+                Cast("feature_name_id", CharField()),
+                output_field=CharField(),
+            ),
+            value=F("feature"),
+        )
+        .annotate(count=Count("product", distinct=True, filter=feature_filter or None))
+    )
+    return brands.union(prices, features, all=True)
+
+
+def compute_facets(slug: str, state: FilterState) -> Facets:
+    brands, prices, features = [], [], {}
+    for row in get_facets_queryset(slug, state):
+        facet, value, count = row["facet"], row["value"], row["count"]
+        if facet == BRAND:
+            brands.append((value, count))
+        elif facet == PRICE:
+            prices.append((int(value), count))
+        else:
+            features.setdefault(int(facet.split(":")[1]), []).append((value, count))
+    names = dict(
+        CategoryFeatures.objects.filter(pk__in=features).values_list(
+            "pk", "feature_name"
+        )
+    )
+    return Facets(
+        brands=sorted(brands),
+        prices=sorted(prices),
+        features=[
+            (feature_id, names.get(feature_id, ""), sorted(values))
+            for feature_id, values in sorted(features.items())
+        ],
+    )
+
+
+def get_facets_version(slug: str) -> str:
+    return cache.get_or_set(
+        FACETS_VERSION_KEY.format(slug), lambda: uuid.uuid4().hex, None
+    )
+
+
+def bump_facets_version(slug: str) -> None:
+    """
+    Invalidates cached facets of the category and changes stamp of the
+    category page.
+    """
+    bump_stamps(get_category_stamp_name(slug))
+    cache.set(FACETS_VERSION_KEY.format(slug), uuid.uuid4().hex, None)
+
+
+def get_facets(slug: str, state: FilterState) -> Facets:
+    """
+    Returns facets of category for the filter state, cached per category
+    version and filter signature.
+    """
+    key = FACETS_KEY.format(slug, get_facets_version(slug), state.signature)
+    return Facets(
+        *cached_compute(key, lambda: tuple(compute_facets(slug, state)), FACETS_TIMEOUT)
+    )
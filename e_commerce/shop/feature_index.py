@@ -0,0 +1,176 @@
+import uuid
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.core.cache import cache
+
+from .models import CategoryFeatures, ProductFeature
+
+FEATURE_INDEX_KEY = "shop:feature-index:{}:{}"
+FEATURE_INDEX_VERSION_KEY = "shop:feature-index-version:{}"
+FEATURE_INDEX_LOCK_KEY = "shop:feature-index-lock:{}"
+FEATURE_INDEX_TIMEOUT = 60 * 60
+LOCK_TIMEOUT = 10
+
+
+def compress(bitset: int) -> bytes:
+    return zlib.compress(bitset.to_bytes((bitset.bit_length() + 7) // 8, "little"))
+
+
+def decompress(data: bytes) -> int:
+    return int.from_bytes(zlib.decompress(data), "little")
+
+
+def get_ids(bitset: int) -> List[int]:
+    """
+    Returns positions of set bits, which are product ids.
+    """
+    ids = []
+    for number, byte in enumerate(
+        bitset.to_bytes((bitset.bit_length() + 7) // 8, "little")
+    ):
+        while byte:
+            low = byte & -byte
+            ids.append(number * 8 + low.bit_length() - 1)
+            byte ^= low
+    return ids
+
+
+class FeatureIndex:
+    """
+    Inverted index of category products from (feature name id, value) to
+    zlib compressed bitset of product ids. Bitsets are decompressed only
+    for the features used by a query or an update.
+
+    Bit of a product is its id, so every decompressed bitset takes up to
+    max product id / 8 bytes, 125 KB for ids up to one million, however
+    few products have the value. Compressed bitsets of rare values stay
+    small, but the index is meant for catalogs with ids below millions.
+    """
+
+    def __init__(self, bitsets: Optional[Dict[int, Dict[str, bytes]]] = None) -> None:
+        self.bitsets = bitsets or {}
+
+    @classmethod
+    def build(cls, slug: str) -> "FeatureIndex":
+        bitsets: Dict[int, Dict[str, int]] = {}
+        rows = (
+            ProductFeature.objects.filter(feature_name__category__slug=slug)
+            .exclude(feature__isnull=True)
+            .exclude(feature="")
+            .values_list("feature_name_id", "feature", "product_id")
+        )
+        for feature_id, value, product_id in rows.iterator():
+            values = bitsets.setdefault(feature_id, {})
+            values[value] = values.get(value, 0) | 1 << product_id
+        return cls(
+            {
+                feature_id: {value: compress(bits) for value, bits in values.items()}
+                for feature_id, values in bitsets.items()
+            }
+        )
+
+    def get_bits(self, feature_id: int, value: str) -> int:
+        data = self.bitsets.get(feature_id, {}).get(value)
+        return decompress(data) if data else 0
+
+    def match(self, features: Iterable[Tuple[int, Iterable[str]]]) -> int:
+        """
+        Returns bitset of products having any of the values of every
+        given feature.
+        """
+        result = None
+        for feature_id, values in features:
+            bits = 0
+            for value in values:
+                bits |= self.get_bits(feature_id, value)
+            result = bits if result is None else result & bits
+            if not result:
+                return 0
+        return result or 0
+
+    def set_product(
+        self, product_id: int, feature_id: int, values: Iterable[str]
+    ) -> None:
+        """
+        Makes the product have exactly given values of the feature.
+        """
+        values, bit = set(values), 1 << product_id
+        current = self.bitsets.setdefault(feature_id, {})
+        for value in values | set(current):
+            bits = self.get_bits(feature_id, value)
+            updated = bits | bit if value in values else bits & ~bit
+            if updated == bits:
+                continue
+            if updated:
+                current[value] = compress(updated)
+            else:
+                del current[value]
+
+
+def get_feature_index_version(slug: str) -> str:
+    return cache.get_or_set(
+        FEATURE_INDEX_VERSION_KEY.format(slug), lambda: uuid.uuid4().hex, None
+    )
+
+
+def get_feature_index(slug: str) -> FeatureIndex:
+    """
+    Returns cached feature index of the category, builds it if missing.
+    """
+    key = FEATURE_INDEX_KEY.format(slug, get_feature_index_version(slug))
+    bitsets = cache.get(key)
+    if bitsets is None:
+        index = FeatureIndex.build(slug)
+        cache.set(key, index.bitsets, FEATURE_INDEX_TIMEOUT)
+        return index
+    return FeatureIndex(bitsets)
+
+
+def match_products(
+    slug: str, features: Iterable[Tuple[int, Iterable[str]]]
+) -> List[int]:
+    """
+    Returns ids of category products matching feature filter: any value
+    within a feature and all features.
+    """
+    return get_ids(get_feature_index(slug).match(features))
+
+
+def refresh_product_feature(product_id: int, feature_id: int) -> None:
+    """
+    Updates bits of the product in cached index of the feature category.
+    If other process is updating the index at the same time, version of
+    the index is changed instead, so its write goes to the key nobody
+    reads and the index is rebuilt.
+    """
+    slug = (
+        CategoryFeatures.objects.filter(pk=feature_id)
+        .values_list("category__slug", flat=True)
+        .first()
+    )
+    if slug is None:
+        return
+    lock_key = FEATURE_INDEX_LOCK_KEY.format(slug)
+    if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        cache.set(FEATURE_INDEX_VERSION_KEY.format(slug), uuid.uuid4().hex, None)
+        return
+    try:
+        key = FEATURE_INDEX_KEY.format(slug, get_feature_index_version(slug))
+        bitsets = cache.get(key)
+        if bitsets is None:
+            return
+        index = FeatureIndex(bitsets)
+        index.set_product(
+            product_id,
+            feature_id,
+            ProductFeature.objects.filter(
+                product_id=product_id, feature_name_id=feature_id
+            )
+            .exclude(feature__isnull=True)
+            .exclude(feature="")
+            .values_list("feature", flat=True),
+        )
+        cache.set(key, index.bitsets, FEATURE_INDEX_TIMEOUT)
+    finally:
+        cache.delete(lock_key)
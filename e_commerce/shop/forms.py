@@ -101,3 +101,25 @@ class PriceFilterForm(forms.Form):
         required=False,
         widget=forms.NumberInput(attrs={"style": "width:70px"}),
     )
+
+    def __init__(self, *args, buckets=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        if buckets:
+            self.fields["price"] = forms.MultipleChoiceField(
+                choices=buckets,
+                widget=forms.CheckboxSelectMultiple,
+                required=False,
+                label="Діапазон",
+            )
+
+
+class FeatureFilterForm(forms.Form):
+    def __init__(self, features, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for feature_id, name, choices in features:
+            self.fields[f"feature_{feature_id}"] = forms.MultipleChoiceField(
+                choices=choices,
+                widget=forms.CheckboxSelectMultiple,
+                required=False,
+                label=name,
+            )
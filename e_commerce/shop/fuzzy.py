@@ -0,0 +1,265 @@
+import heapq
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from typing import Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+from django.db.models import QuerySet
+
+from .models import Product, SearchTerm
+from .search import get_search_backend, get_words
+
+TERMS_VERSION_KEY = "shop:search-terms-version"
+MIN_TERM_LENGTH = 3
+
+
+def get_fuzzy_settings() -> Tuple[float, float, int]:
+    """
+    Returns similarity threshold, time budget in seconds for correcting
+    one query and number of hits below which search results are sparse.
+    """
+    return (
+        getattr(settings, "SHOP_FUZZY_SIMILARITY", 0.3),
+        getattr(settings, "SHOP_FUZZY_TIMEOUT_MS", 50) / 1000,
+        getattr(settings, "SHOP_FUZZY_MIN_HITS", 3),
+    )
+
+
+def trigrams(word: str) -> Set[str]:
+    """
+    Splits word to trigrams padded the same way as pg_trgm does.
+    """
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def is_term(word: str) -> bool:
+    return MIN_TERM_LENGTH <= len(word) <= 100 and not word.isdigit()
+
+
+def get_terms(text: Optional[str]) -> Set[str]:
+    """
+    Returns words of the text which are kept in the vocabulary.
+    """
+    return {word for word in get_words(text) if is_term(word)}
+
+
+def get_terms_version() -> str:
+    """
+    Returns random version of the vocabulary, so lost version key makes
+    all processes reload their trigram indexes.
+    """
+    return cache.get_or_set(TERMS_VERSION_KEY, lambda: uuid.uuid4().hex, None)
+
+
+def bump_terms_version() -> None:
+    cache.set(TERMS_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def index_terms(product_ids: Iterable[int]) -> int:
+    """
+    Adds words of names and brand names of given products to the
+    vocabulary, returns number of new words.
+    """
+    words = set()
+    for name, brand in Product.objects.filter(pk__in=list(product_ids)).values_list(
+        "name", "brand__name"
+    ):
+        words.update(get_terms(name), get_terms(brand))
+    words.difference_update(
+        SearchTerm.objects.filter(term__in=words).values_list("term", flat=True)
+    )
+    if words:
+        SearchTerm.objects.bulk_create(
+            [SearchTerm(term=word) for word in words], ignore_conflicts=True
+        )
+        bump_terms_version()
+    return len(words)
+
+
+def rebuild_terms(batch_size: int = 500) -> int:
+    """
+    Rebuilds the vocabulary from the whole catalog, returns its size.
+    """
+    words = set()
+    for name, brand in Product.objects.values_list("name", "brand__name").iterator(
+        chunk_size=batch_size
+    ):
+        words.update(get_terms(name), get_terms(brand))
+    with transaction.atomic():
+        SearchTerm.objects.all().delete()
+        SearchTerm.objects.bulk_create(
+            [SearchTerm(term=word) for word in words], batch_size=batch_size
+        )
+    bump_terms_version()
+    return len(words)
+
+
+class TrigramIndex:
+    """
+    In-memory inverted index from trigrams to vocabulary words. Similarity
+    is the share of common trigrams, as pg_trgm similarity().
+    """
+
+    def __init__(self, terms: Iterable[str]) -> None:
+        self.terms: List[str] = []
+        self.sizes: List[int] = []
+        self.postings = defaultdict(list)
+        for number, term in enumerate(terms):
+            term_trigrams = trigrams(term)
+            self.terms.append(term)
+            self.sizes.append(len(term_trigrams))
+            for trigram in term_trigrams:
+                self.postings[trigram].append(number)
+
+    def similar(
+        self, word: str, threshold: float, limit: int, deadline: float
+    ) -> List[Tuple[str, float]]:
+        word_trigrams, shared = trigrams(word), Counter()
+        for trigram in word_trigrams:
+            if time.monotonic() > deadline:
+                break
+            shared.update(self.postings.get(trigram, ()))
+        candidates = []
+        for number, count in shared.items():
+            similarity = count / (len(word_trigrams) + self.sizes[number] - count)
+            if similarity >= threshold:
+                candidates.append((similarity, self.terms[number]))
+        return [
+            (term, similarity) for similarity, term in heapq.nlargest(limit, candidates)
+        ]
+
+
+class TrigramBackend:
+    """
+    Finds vocabulary words similar to the given one within time budget.
+    """
+
+    def __init__(self, using: str = DEFAULT_DB_ALIAS) -> None:
+        self.using = using
+
+    def install(self) -> None:
+        pass
+
+    def similar(
+        self, word: str, threshold: float, limit: int, deadline: float
+    ) -> List[Tuple[str, float]]:
+        raise NotImplementedError
+
+
+class MemoryTrigramBackend(TrigramBackend):
+    """
+    Keeps process wide TrigramIndex, rebuilt when the vocabulary version
+    in cache changes. Used for databases without pg_trgm.
+    """
+
+    lock = threading.Lock()
+    index: Optional[TrigramIndex] = None
+    version: Optional[str] = None
+
+    def get_index(self) -> TrigramIndex:
+        version = get_terms_version()
+        with self.lock:
+            if MemoryTrigramBackend.version != version:
+                MemoryTrigramBackend.index = TrigramIndex(
+                    SearchTerm.objects.using(self.using)
+                    .values_list("term", flat=True)
+                    .iterator()
+                )
+                MemoryTrigramBackend.version = version
+            return MemoryTrigramBackend.index
+
+    def similar(
+        self, word: str, threshold: float, limit: int, deadline: float
+    ) -> List[Tuple[str, float]]:
+        return self.get_index().similar(word, threshold, limit, deadline)
+
+
+class PostgresTrigramBackend(TrigramBackend):
+    """
+    pg_trgm GIN index over vocabulary words. Every lookup runs with
+    statement timeout equal to the rest of the time budget.
+    """
+
+    index_name = "shop_search_term_trgm"
+
+    @property
+    def table(self) -> str:
+        return connections[self.using].ops.quote_name(SearchTerm._meta.db_table)
+
+    def install(self) -> None:
+        with connections[self.using].cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.index_name} "
+                f"ON {self.table} USING GIN (term gin_trgm_ops)"
+            )
+
+    def similar(
+        self, word: str, threshold: float, limit: int, deadline: float
+    ) -> List[Tuple[str, float]]:
+        timeout = int((deadline - time.monotonic()) * 1000)
+        if timeout <= 0:
+            return []
+        try:
+            with transaction.atomic(using=self.using):
+                with connections[self.using].cursor() as cursor:
+                    cursor.execute(
+                        "SELECT set_config('statement_timeout', %s, true), "
+                        "set_config('pg_trgm.similarity_threshold', %s, true)",
+                        [str(timeout), str(threshold)],
+                    )
+                    cursor.execute(
+                        f"SELECT term, similarity(term, %s) FROM {self.table} "
+                        "WHERE term %% %s ORDER BY 2 DESC, term LIMIT %s",
+                        [word, word, limit],
+                    )
+                    return cursor.fetchall()
+        except DatabaseError:
+            return []
+
+
+def get_trigram_backend(using: str = DEFAULT_DB_ALIAS) -> TrigramBackend:
+    """
+    Returns trigram backend for the database vendor of given connection.
+    """
+    if connections[using].vendor == "postgresql":
+        return PostgresTrigramBackend(using)
+    return MemoryTrigramBackend(using)
+
+
+def suggest_query(query: Optional[str]) -> Optional[str]:
+    """
+    Replaces unknown query words with the most similar vocabulary words.
+    Returns None if nothing was corrected or time budget is over.
+    """
+    threshold, budget, _ = get_fuzzy_settings()
+    deadline, backend = time.monotonic() + budget, get_trigram_backend()
+    words, corrected = get_words(query), False
+    for number, word in enumerate(words):
+        if not is_term(word):
+            continue
+        similar = backend.similar(word, threshold, 1, deadline)
+        if similar and similar[0][0] != word:
+            words[number], corrected = similar[0][0], True
+    if corrected and time.monotonic() <= deadline:
+        return " ".join(words)
+    return None
+
+
+def get_did_you_mean(query: Optional[str], products: QuerySet) -> Optional[str]:
+    """
+    Returns corrected query if search results are sparse and corrected
+    query finds something.
+    """
+    _, _, min_hits = get_fuzzy_settings()
+    if products[:min_hits].count() >= min_hits:
+        return None
+    suggestion = suggest_query(query)
+    if suggestion and get_search_backend().search(suggestion).exists():
+        return suggestion
+    return None
@@ -0,0 +1,182 @@
+import random
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import BigIntegerField, Case, F, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import Like, Review, ReviewCounterShard
+from .product_bundle import bump_bundle_versions
+
+
+def get_shard_settings() -> Tuple[int, int]:
+    """
+    Returns number of counter shards and number of votes after which
+    review counters are sharded. Zero shards disables sharding.
+    """
+    return (
+        getattr(settings, "SHOP_LIKE_COUNTER_SHARDS", 0),
+        getattr(settings, "SHOP_LIKE_SHARD_THRESHOLD", 1000),
+    )
+
+
+def insert_vote(review_id: int, author_id: int, like: bool) -> bool:
+    """
+    Inserts vote of the author in one statement, unless the author has
+    already voted for the review. Returns True if vote was inserted.
+    """
+    quote = connection.ops.quote_name
+    fields = [Like._meta.get_field(name) for name in ("review", "like_author")]
+    key = ", ".join(quote(field.column) for field in fields)
+    like_column = quote(Like._meta.get_field("like").column)
+    dislike_column = quote(Like._meta.get_field("dislike").column)
+    sql = (
+        f"INSERT INTO {quote(Like._meta.db_table)} "
+        f"({key}, {like_column}, {dislike_column}) VALUES (%s, %s, %s, %s) "
+        f"ON CONFLICT ({key}) DO NOTHING RETURNING {quote(Like._meta.pk.column)}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [review_id, author_id, like, not like])
+        return cursor.fetchone() is not None
+
+
+def add_to_counters(review_id: int, like: bool) -> Optional[int]:
+    """
+    Adds vote to counter columns of the review only. Returns product id
+    of the review, None if there is no such review.
+    """
+    quote = connection.ops.quote_name
+    name = "like_num" if like else "dislike_num"
+    counter, helpfulness, pk, product = (
+        quote(Review._meta.get_field(name).column)
+        for name in (name, "helpfulness", "id", "product")
+    )
+    sql = (
+        f"UPDATE {quote(Review._meta.db_table)} "
+        f"SET {counter} = COALESCE({counter}, 0) + 1, "
+        f"{helpfulness} = {helpfulness} + %s WHERE {pk} = %s RETURNING {product}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [1 if like else -1, review_id])
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def add_to_shard(review_id: int, like: bool, shards: int) -> None:
+    """
+    Adds vote to random counter shard of the review, so concurrent votes
+    for the same review do not wait for one row lock.
+    """
+    quote = connection.ops.quote_name
+    table = quote(ReviewCounterShard._meta.db_table)
+    review, shard, like_num, dislike_num = (
+        quote(ReviewCounterShard._meta.get_field(name).column)
+        for name in ("review", "shard", "like_num", "dislike_num")
+    )
+    sql = (
+        f"INSERT INTO {table} ({review}, {shard}, {like_num}, {dislike_num}) "
+        f"VALUES (%s, %s, %s, %s) ON CONFLICT ({review}, {shard}) DO UPDATE SET "
+        f"{like_num} = {table}.{like_num} + excluded.{like_num}, "
+        f"{dislike_num} = {table}.{dislike_num} + excluded.{dislike_num}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql, [review_id, random.randrange(shards), int(like), int(not like)]
+        )
+
+
+def is_sharded(review_id: int) -> bool:
+    shards, threshold = get_shard_settings()
+    if not shards:
+        return False
+    counters = (
+        Review.objects.filter(pk=review_id)
+        .values_list("like_num", "dislike_num")
+        .first()
+    )
+    return counters is not None and sum(filter(None, counters)) >= threshold
+
+
+def add_vote(review_id: int, author_id: int, like: bool) -> bool:
+    """
+    Records like or dislike of the author for the review, once per
+    author. Counters of reviews with many votes are sharded and become
+    visible after fold_counter_shards(). Returns True if vote was added.
+    """
+    with transaction.atomic():
+        if not insert_vote(review_id, author_id, like):
+            return False
+        if is_sharded(review_id):
+            add_to_shard(review_id, like, get_shard_settings()[0])
+            return True
+        product_id = add_to_counters(review_id, like)
+        if product_id is None:
+            transaction.set_rollback(True)
+            return False
+    bump_bundle_versions([product_id])
+    return True
+
+
+class UserVotes(NamedTuple):
+    """
+    Ids of reviews liked and disliked by a user.
+    """
+
+    likes: FrozenSet[int] = frozenset()
+    dislikes: FrozenSet[int] = frozenset()
+
+
+def get_user_votes(user_id: Optional[int], review_ids: Iterable[int]) -> UserVotes:
+    """
+    Returns votes of the user for given reviews in one query.
+    """
+    review_ids = list(review_ids)
+    if user_id is None or not review_ids:
+        return UserVotes()
+    votes = Like.objects.filter(like_author=user_id, review__in=review_ids)
+    likes, dislikes = set(), set()
+    for review_id, like in votes.values_list("review", "like"):
+        (likes if like else dislikes).add(review_id)
+    return UserVotes(frozenset(likes), frozenset(dislikes))
+
+
+def fold_counter_shards() -> int:
+    """
+    Moves votes from counter shards to review counters, one UPDATE for
+    all reviews. Returns number of updated reviews.
+    """
+    with transaction.atomic():
+        shards = list(
+            ReviewCounterShard.objects.select_for_update().values_list(
+                "pk", "review", "like_num", "dislike_num"
+            )
+        )
+        likes: Dict[int, int] = Counter()
+        dislikes: Dict[int, int] = Counter()
+        for _, review_id, like_num, dislike_num in shards:
+            likes[review_id] += like_num
+            dislikes[review_id] += dislike_num
+        if not shards:
+            return 0
+        ReviewCounterShard.objects.filter(
+            pk__in=[shard[0] for shard in shards]
+        ).delete()
+        like_delta, dislike_delta = (
+            Case(
+                *(When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()),
+                default=Value(0),
+                output_field=BigIntegerField(),
+            )
+            for deltas in (likes, dislikes)
+        )
+        reviews = Review.objects.filter(pk__in=list(likes))
+        reviews.update(
+            like_num=Coalesce(F("like_num"), 0) + like_delta,
+            dislike_num=Coalesce(F("dislike_num"), 0) + dislike_delta,
+            helpfulness=F("helpfulness") + like_delta - dislike_delta,
+        )
+        product_ids = set(reviews.values_list("product", flat=True))
+    bump_bundle_versions(product_ids)
+    return len(likes)
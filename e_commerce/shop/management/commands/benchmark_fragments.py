@@ -0,0 +1,65 @@
+import time
+from typing import Any, Dict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.http import HttpRequest
+from django.template.loader import get_template
+from django.test.utils import override_settings
+from shop.navigation import NavigationTree, get_navigation_tree
+
+FRAGMENTS = (
+    "a_shop/samples/navbar.html",
+    "a_shop/samples/offcanvas.html",
+    "a_shop/samples/right_bar.html",
+    "a_shop/samples/right_bar_small.html",
+)
+
+DUMMY_FRAGMENT_CACHE = {
+    "template_fragments": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+}
+
+
+def get_context(navigation: NavigationTree) -> Dict:
+    return {
+        "navigation": navigation,
+        "super_categories": navigation.super_categories,
+        "category_list": navigation.categories,
+        "super_category_flag": True,
+        "cartItem": 0,
+    }
+
+
+def render_fragments(context: Dict) -> float:
+    """
+    Renders navigation fragments once, returns time in seconds.
+    """
+    request = HttpRequest()
+    start = time.perf_counter()
+    for name in FRAGMENTS:
+        get_template(name).render(context, request)
+    return time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    help = "Measures render time of navigation fragments with and without cache."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--iterations", type=int, default=200)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        navigation, iterations = get_navigation_tree(), options["iterations"]
+        context = get_context(navigation)
+        with override_settings(CACHES={**settings.CACHES, **DUMMY_FRAGMENT_CACHE}):
+            uncached = sum(render_fragments(context) for _ in range(iterations))
+        render_fragments(context)
+        cached = sum(render_fragments(context) for _ in range(iterations))
+        uncached, cached = uncached / iterations * 1000, cached / iterations * 1000
+        self.stdout.write(
+            f"{len(navigation.categories)} categories, {iterations} iterations"
+        )
+        self.stdout.write(f"Without fragment cache: {uncached:.3f} ms per request")
+        self.stdout.write(f"With fragment cache: {cached:.3f} ms per request")
+        self.stdout.write(
+            self.style.SUCCESS(f"Saved: {uncached - cached:.3f} ms per request")
+        )
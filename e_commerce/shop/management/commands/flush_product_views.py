@@ -0,0 +1,12 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from shop.view_counter import view_counter
+
+
+class Command(BaseCommand):
+    help = "Writes product views left in the cache by stopped processes."
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        number = view_counter.flush()
+        self.stdout.write(self.style.SUCCESS(f"Updated views of {number} products"))
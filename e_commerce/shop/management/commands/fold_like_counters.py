@@ -0,0 +1,12 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from shop.likes import fold_counter_shards
+
+
+class Command(BaseCommand):
+    help = "Moves sharded like and dislike counters to reviews."
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        number = fold_counter_shards()
+        self.stdout.write(self.style.SUCCESS(f"Folded counters of {number} reviews"))
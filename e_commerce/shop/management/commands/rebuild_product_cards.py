@@ -0,0 +1,15 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from shop.cards import rebuild_product_cards
+
+
+class Command(BaseCommand):
+    help = "Rebuilds denormalized product cards used by listing pages."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        number = rebuild_product_cards(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {number} product cards"))
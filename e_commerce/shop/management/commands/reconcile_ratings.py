@@ -0,0 +1,15 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from shop.ratings import reconcile_ratings
+
+
+class Command(BaseCommand):
+    help = "Recomputes review counts and grades of product cards from reviews."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        number = reconcile_ratings(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Corrected {number} product cards"))
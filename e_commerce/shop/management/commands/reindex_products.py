@@ -0,0 +1,18 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from shop.fuzzy import rebuild_terms
+from shop.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Installs search indexes and reindexes all products and search terms."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        number = rebuild_search_index(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Reindexed {number} products"))
+        number = rebuild_terms(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {number} search terms"))
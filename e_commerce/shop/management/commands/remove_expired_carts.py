@@ -0,0 +1,12 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from shop.cart import remove_expired_carts
+
+
+class Command(BaseCommand):
+    help = "Deletes anonymous carts not changed for SHOP_CART_TIMEOUT seconds."
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        number = remove_expired_carts()
+        self.stdout.write(self.style.SUCCESS(f"Removed {number} carts"))
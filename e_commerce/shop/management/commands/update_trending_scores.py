@@ -0,0 +1,15 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from shop.trending import update_trending_scores
+
+
+class Command(BaseCommand):
+    help = "Adds queued product views and sales to trending scores of cards."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        number = update_trending_scores(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Processed {number} activity records"))
@@ -0,0 +1,49 @@
+from typing import Callable
+
+from django.db import DatabaseError
+from django.http import HttpRequest, HttpResponse
+
+from .page_cache import get_cached_page, is_cacheable, store_page
+from .view_counter import view_counter
+
+
+class ProductViewFlushMiddleware:
+    """
+    Writes buffered product views after the response is ready, at most
+    once per SHOP_VIEW_FLUSH_INTERVAL. Failed flush keeps views buffered
+    for the next one.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        response = self.get_response(request)
+        if view_counter.is_due():
+            try:
+                view_counter.flush()
+            except DatabaseError:
+                pass
+        return response
+
+
+class AnonymousPageCacheMiddleware:
+    """
+    Serves anonymous GET requests of SHOP_PAGE_CACHE_VIEWS pages from
+    cache by full path. Cached pages are rendered without cart counter
+    and CSRF tokens, page script loads them from user_fragment view.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not is_cacheable(request):
+            return self.get_response(request)
+        response = get_cached_page(request)
+        if response is not None:
+            return response
+        request.page_cache = True
+        response = self.get_response(request)
+        store_page(request, response)
+        return response
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-from typing import Union
+from typing import Any, Optional, Tuple, Union
 
 from django.contrib import admin
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
 from django.urls import reverse
 from slugify import slugify
 
@@ -181,6 +181,142 @@ class ProductImage(models.Model):
         verbose_name_plural = "Зображення товарів"
 
 
+class ProductCard(models.Model):
+    product = models.OneToOneField(
+        Product,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="card",
+        verbose_name="Товар",
+    )
+    name = models.CharField(max_length=150, verbose_name="Назва на картці")
+    price = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Ціна")
+    sold = models.BooleanField(default=True, verbose_name="Проданий")
+    image = models.ImageField(blank=True, max_length=200, verbose_name="Зображення")
+    category_name = models.CharField(max_length=100, verbose_name="Категорія")
+    category_slug = models.SlugField(
+        max_length=100, db_index=False, verbose_name="URL категорії"
+    )
+    brand_name = models.CharField(max_length=100, blank=True, verbose_name="Бренд")
+    url = models.CharField(max_length=200, verbose_name="URL товару")
+    access_number = models.PositiveBigIntegerField(
+        default=0, verbose_name="Кількість переглядів"
+    )
+    trending_score = models.FloatField(default=0, verbose_name="Рейтинг популярності")
+    review_count = models.PositiveIntegerField(
+        default=0, verbose_name="Кількість відгуків"
+    )
+    grade_sum = models.PositiveIntegerField(default=0, verbose_name="Сума оцінок")
+    grade_1_count = models.PositiveIntegerField(default=0, verbose_name="Оцінок 1")
+    grade_2_count = models.PositiveIntegerField(default=0, verbose_name="Оцінок 2")
+    grade_3_count = models.PositiveIntegerField(default=0, verbose_name="Оцінок 3")
+    grade_4_count = models.PositiveIntegerField(default=0, verbose_name="Оцінок 4")
+    grade_5_count = models.PositiveIntegerField(default=0, verbose_name="Оцінок 5")
+
+    def __str__(self) -> str:
+        return str(self.name)
+
+    def get_absolute_url(self) -> str:
+        return str(self.url)
+
+    class Meta:
+        verbose_name = "Картка товару"
+        verbose_name_plural = "Картки товарів"
+        indexes = [
+            models.Index(
+                fields=["category_slug", "product"], name="shop_card_category_idx"
+            ),
+            models.Index(
+                fields=["-access_number", "-product"], name="shop_card_popular_idx"
+            ),
+            models.Index(
+                fields=["-trending_score", "-product"],
+                name="shop_card_trending_idx",
+                include=[
+                    "name",
+                    "price",
+                    "sold",
+                    "image",
+                    "category_name",
+                    "category_slug",
+                    "url",
+                    "review_count",
+                    "grade_sum",
+                ],
+            ),
+        ]
+
+
+class ProductActivity(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, verbose_name="Товар")
+    views = models.PositiveIntegerField(default=0, verbose_name="Перегляди")
+    sales = models.PositiveIntegerField(default=0, verbose_name="Продажі")
+    created_at = models.DateTimeField(verbose_name="Час")
+
+    def __str__(self) -> str:
+        return f"{self.product_id}: {self.views}/{self.sales}"
+
+    class Meta:
+        verbose_name = "Активність товару"
+        verbose_name_plural = "Активність товарів"
+
+
+class ProductViewSpill(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, verbose_name="Товар")
+    views = models.PositiveIntegerField(verbose_name="Перегляди")
+    last_access_at = models.DateTimeField(verbose_name="Останній перегляд")
+
+    def __str__(self) -> str:
+        return f"{self.product_id}: {self.views}"
+
+    class Meta:
+        verbose_name = "Незаписані перегляди товару"
+        verbose_name_plural = "Незаписані перегляди товарів"
+
+
+class ProductSearchDocument(models.Model):
+    product = models.OneToOneField(
+        Product,
+        primary_key=True,
+        on_delete=models.CASCADE,
+        related_name="search_document",
+        verbose_name="Товар",
+    )
+    title = models.TextField(verbose_name="Назва, модель та артикул")
+    keywords = models.TextField(blank=True, verbose_name="Бренд та категорія")
+    body = models.TextField(blank=True, verbose_name="Опис")
+
+    def __str__(self) -> str:
+        return str(self.title)
+
+    class Meta:
+        verbose_name = "Пошуковий документ товару"
+        verbose_name_plural = "Пошукові документи товарів"
+
+
+class SearchTerm(models.Model):
+    term = models.CharField(max_length=100, unique=True, verbose_name="Слово")
+
+    def __str__(self) -> str:
+        return str(self.term)
+
+    class Meta:
+        verbose_name = "Пошукове слово"
+        verbose_name_plural = "Пошукові слова"
+
+
+class SharedCounter(models.Model):
+    name = models.CharField(max_length=100, unique=True, verbose_name="Назва")
+    value = models.BigIntegerField(default=0, verbose_name="Значення")
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.value}"
+
+    class Meta:
+        verbose_name = "Лічильник"
+        verbose_name_plural = "Лічильники"
+
+
 class Review(models.Model):
     MARKS = [(1, 1), (2, 2), (3, 3), (4, 4), (5, 5)]
     product = models.ForeignKey(
@@ -200,19 +336,60 @@ class Review(models.Model):
         blank=True,
         null=True,
     )
-    like_num = models.SmallIntegerField(
+    like_num = models.BigIntegerField(
         blank=True, null=True, verbose_name="Кількість лайків"
     )
-    dislike_num = models.SmallIntegerField(
+    dislike_num = models.BigIntegerField(
         blank=True, null=True, verbose_name="Кількість дизлайків"
     )
+    helpfulness = models.BigIntegerField(default=0, verbose_name="Корисність")
+
+    # (product id, grade) as stored in the database, None for new reviews
+    stored_rating: Optional[Tuple[int, int]] = None
 
     def __str__(self) -> str:
         return self.product.name + "-review"
 
+    @classmethod
+    def from_db(cls, db: Optional[str], field_names: Any, values: Any) -> Review:
+        instance = super().from_db(db, field_names, values)
+        product_id = instance.__dict__.get("product_id")
+        grade = instance.__dict__.get("grade")
+        if product_id is not None and grade is not None:
+            instance.stored_rating = (product_id, grade)
+        return instance
+
+    def get_stored_rating(self) -> Optional[Tuple[int, int]]:
+        if self.stored_rating is None and self.pk is not None:
+            return (
+                Review.objects.filter(pk=self.pk)
+                .values_list("product", "grade")
+                .first()
+            )
+        return self.stored_rating
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Saves review and moves its grade on the product card in the same
+        transaction.
+        """
+        from .ratings import move_review_rating
+
+        with transaction.atomic(using=kwargs.get("using")):
+            self.stored_rating = self.get_stored_rating()
+            super().save(*args, **kwargs)
+            move_review_rating(self.stored_rating, (self.product_id, self.grade))
+            self.stored_rating = (self.product_id, self.grade)
+
     class Meta:
         verbose_name = "Відгук"
         verbose_name_plural = "Відгуки"
+        indexes = [
+            models.Index(
+                fields=["product", "-helpfulness", "-id"],
+                name="shop_review_helpful_idx",
+            ),
+        ]
 
 
 class Like(models.Model):
@@ -233,6 +410,30 @@ class Like(models.Model):
     class Meta:
         verbose_name = "Лайк"
         verbose_name_plural = "Лайки"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["review", "like_author"], name="shop_like_unique_author"
+            ),
+        ]
+
+
+class ReviewCounterShard(models.Model):
+    review = models.ForeignKey(Review, on_delete=models.CASCADE, verbose_name="Відгук")
+    shard = models.PositiveSmallIntegerField(verbose_name="Номер частини")
+    like_num = models.BigIntegerField(default=0, verbose_name="Кількість лайків")
+    dislike_num = models.BigIntegerField(default=0, verbose_name="Кількість дизлайків")
+
+    def __str__(self) -> str:
+        return f"{self.review_id}-{self.shard}"
+
+    class Meta:
+        verbose_name = "Частина лічильника відгуку"
+        verbose_name_plural = "Частини лічильників відгуків"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["review", "shard"], name="shop_review_shard_unique"
+            ),
+        ]
 
 
 class Income(models.Model):
@@ -276,6 +477,23 @@ class Buyer(models.Model):
         return str(self.name)
 
 
+class AnonymousCart(models.Model):
+    key = models.CharField(max_length=100, unique=True, verbose_name="Ключ")
+    version = models.CharField(max_length=32, verbose_name="Версія")
+    product_ids = models.BinaryField(verbose_name="Товари")
+    quantities = models.BinaryField(verbose_name="Кількості")
+    updated_at = models.DateTimeField(
+        auto_now=True, db_index=True, verbose_name="Змінено"
+    )
+
+    class Meta:
+        verbose_name = "Кошик гостя"
+        verbose_name_plural = "Кошики гостей"
+
+    def __str__(self) -> str:
+        return str(self.key)
+
+
 class Order(models.Model):
     buyer = models.ForeignKey(
         Buyer,
@@ -0,0 +1,129 @@
+import threading
+import uuid
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .cached_compute import cached_compute
+from .conditional import NAVIGATION_STAMP, bump_stamps
+from .models import Category, SuperCategory
+
+NAVIGATION_KEY = "shop:navigation:{}"
+NAVIGATION_VERSION_KEY = "shop:navigation-version"
+NAVIGATION_TIMEOUT = 60 * 60
+
+
+def load_catalog() -> Tuple[Tuple[SuperCategory, ...], Tuple[Category, ...]]:
+    """
+    Returns super categories and categories with loaded super_category
+    and product_number.
+    """
+    super_categories = {
+        super_category.pk: super_category
+        for super_category in SuperCategory.objects.order_by("pk")
+    }
+    categories = list(
+        Category.objects.annotate(product_number=Count("product")).order_by("pk")
+    )
+    for category in categories:
+        category.super_category = super_categories[category.super_category_id]
+    return tuple(super_categories.values()), tuple(categories)
+
+
+class NavigationTree:
+    """
+    Immutable catalog tree: super categories with their categories, lookups
+    by slug and id and product numbers of categories. Categories have
+    super_category loaded, so templates do not make queries. Version is
+    used in keys of cached navigation fragments.
+    """
+
+    def __init__(
+        self,
+        super_categories: Tuple[SuperCategory, ...],
+        categories: Tuple[Category, ...],
+        version: str = "",
+    ) -> None:
+        self.version = version
+        self.super_categories = super_categories
+        self.categories = categories
+        self.by_slug: Mapping[str, Category] = MappingProxyType(
+            {category.slug: category for category in categories}
+        )
+        self.by_id: Mapping[int, Category] = MappingProxyType(
+            {category.pk: category for category in categories}
+        )
+        children = {super_category.pk: [] for super_category in super_categories}
+        for category in categories:
+            children[category.super_category_id].append(category)
+        self.children: Mapping[int, Tuple[Category, ...]] = MappingProxyType(
+            {pk: tuple(items) for pk, items in children.items()}
+        )
+        self.product_numbers: Mapping[int, int] = MappingProxyType(
+            {category.pk: category.product_number for category in categories}
+        )
+
+    @classmethod
+    def build(cls, version: str = "") -> "NavigationTree":
+        return cls(*load_catalog(), version)
+
+    def get_category(self, slug: str) -> Optional[Category]:
+        return self.by_slug.get(slug)
+
+    def get_categories(self, super_category_id: Optional[int]) -> Tuple[Category, ...]:
+        return self.children.get(super_category_id, ())
+
+    def get_siblings(self, slug: str) -> Tuple[Category, ...]:
+        """
+        Returns categories of the super category of category with given slug.
+        """
+        category = self.by_slug.get(slug)
+        return self.get_categories(category.super_category_id) if category else ()
+
+    def get_product_number(self, category_id: int) -> int:
+        return self.product_numbers.get(category_id, 0)
+
+
+def get_navigation_version() -> str:
+    """
+    Returns random version of the tree, so lost version key makes all
+    processes rebuild their trees.
+    """
+    return cache.get_or_set(NAVIGATION_VERSION_KEY, lambda: uuid.uuid4().hex, None)
+
+
+def bump_navigation_version() -> None:
+    cache.set(NAVIGATION_VERSION_KEY, uuid.uuid4().hex, None)
+    bump_stamps(NAVIGATION_STAMP)
+
+
+class NavigationCache:
+    """
+    Keeps process wide NavigationTree, rebuilt when its version in cache
+    changes. Catalog of the version is loaded from database by one worker
+    and shared with others through cache.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.tree: Optional[NavigationTree] = None
+        self.version: Optional[str] = None
+
+    def get(self) -> NavigationTree:
+        version = get_navigation_version()
+        with self.lock:
+            if self.tree is None or self.version != version:
+                catalog = cached_compute(
+                    NAVIGATION_KEY.format(version), load_catalog, NAVIGATION_TIMEOUT
+                )
+                self.tree, self.version = NavigationTree(*catalog, version), version
+            return self.tree
+
+
+navigation_cache = NavigationCache()
+
+
+def get_navigation_tree() -> NavigationTree:
+    return navigation_cache.get()
@@ -0,0 +1,102 @@
+import hashlib
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.urls import Resolver404, resolve
+
+from .conditional import get_cached_conditional_response, get_stamps
+from .view_counter import view_counter
+
+PAGE_KEY = "shop:page:{}"
+CSRF_PLACEHOLDER = "page-cache"
+VALIDATORS = ("ETag", "Last-Modified")
+
+
+def get_page_cache_settings() -> Tuple[Tuple[str, ...], int]:
+    """
+    Returns names of url patterns of cached pages and cache timeout.
+    """
+    return (
+        tuple(
+            getattr(
+                settings,
+                "SHOP_PAGE_CACHE_VIEWS",
+                ("home", "category", "super_category", "product"),
+            )
+        ),
+        getattr(settings, "SHOP_PAGE_CACHE_TIMEOUT", 60),
+    )
+
+
+def is_cacheable(request: HttpRequest) -> bool:
+    """
+    Checks that request is anonymous GET of cached page. Session is not
+    loaded, request without session cookie is anonymous.
+    """
+    if request.method != "GET" or settings.SESSION_COOKIE_NAME in request.COOKIES:
+        return False
+    try:
+        match = resolve(request.path_info)
+    except Resolver404:
+        return False
+    views, _ = get_page_cache_settings()
+    return match.url_name in views
+
+
+def get_page_key(request: HttpRequest) -> str:
+    return PAGE_KEY.format(hashlib.md5(request.get_full_path().encode()).hexdigest())
+
+
+def get_cached_page(request: HttpRequest) -> Optional[HttpResponse]:
+    """
+    Returns cached response for the request or 304 response if its
+    validators match, records product view of cached product page.
+    Page is used only while stamps it was rendered with did not change.
+    """
+    page = cache.get(get_page_key(request))
+    if page is None:
+        return None
+    content, content_type, product_id, validators, stamps = page
+    current = get_stamps(*(name for name, _ in stamps))
+    if [stamp.version for stamp in current] != [version for _, version in stamps]:
+        return None
+    if product_id is not None:
+        view_counter.record(product_id)
+    response = HttpResponse(content, content_type=content_type)
+    for header, value in validators:
+        response[header] = value
+    return get_cached_conditional_response(request, response)
+
+
+def store_page(request: HttpRequest, response: HttpResponse) -> None:
+    """
+    Caches successful response without per-user data and cookies
+    together with stamps of resources it was rendered from.
+    """
+    stamps = getattr(request, "page_stamps", None)
+    if (
+        response.status_code != 200
+        or response.streaming
+        or response.cookies
+        or not getattr(request, "page_cache", False)
+        or stamps is None
+    ):
+        return
+    _, timeout = get_page_cache_settings()
+    cache.set(
+        get_page_key(request),
+        (
+            response.content,
+            response["Content-Type"],
+            getattr(request, "viewed_product_id", None),
+            [
+                (header, response[header])
+                for header in VALIDATORS
+                if response.has_header(header)
+            ],
+            stamps,
+        ),
+        timeout,
+    )
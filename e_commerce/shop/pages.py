@@ -0,0 +1,177 @@
+import glob
+import os
+import threading
+import uuid
+from functools import lru_cache
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.contrib.auth.forms import AuthenticationForm
+from django.core.cache import cache
+from django.http import HttpRequest
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
+
+from .conditional import PAGES_STAMP, bump_stamps
+from .forms import CustomUserCreationForm
+from .models import PageData
+from .utils import DataMixin
+
+PAGES_VERSION_KEY = "shop:pages-version"
+CSRF_MARKER = "\ue002csrf\ue002"
+CART_MARKER = "\ue002cart\ue002"
+
+
+AUTH_MODALS = (
+    "a_shop/samples/login_modal.html",
+    "a_shop/samples/register_modal.html",
+)
+
+STATIC_PAGES = {
+    "about": "Про нас",
+    "terms": "Умови використання сайту",
+    "contact": "Контакти",
+    "help": "Допомога",
+    "delivery": "Доставка",
+    "credit": "Кредит",
+    "return": "Повернення товару",
+    "service": "Сервісні центри",
+    "partners": "Партнерам",
+}
+
+
+def get_pages_version() -> str:
+    return cache.get_or_set(PAGES_VERSION_KEY, lambda: uuid.uuid4().hex, None)
+
+
+def bump_pages_version() -> None:
+    """
+    Changes version of page data and of pre-rendered static pages, so
+    every process stops serving its static page files.
+    """
+    cache.set(PAGES_VERSION_KEY, uuid.uuid4().hex, None)
+    bump_stamps(PAGES_STAMP)
+
+
+class PageRegistry:
+    """
+    Process wide PageData objects by page name, reloaded when their
+    version in cache changes.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.pages: Optional[Dict[str, PageData]] = None
+        self.version: Optional[str] = None
+
+    def get(self, name: str) -> Optional[PageData]:
+        version = get_pages_version()
+        with self.lock:
+            if self.pages is None or self.version != version:
+                pages = {}
+                for page_data in PageData.objects.order_by("-pk"):
+                    pages[page_data.name] = page_data
+                self.pages, self.version = pages, version
+            return self.pages.get(name)
+
+
+page_registry = PageRegistry()
+
+
+def get_static_pages_dir() -> Optional[str]:
+    """
+    Returns directory of pre-rendered static pages, None if pages are
+    rendered on every request.
+    """
+    return getattr(settings, "SHOP_STATIC_PAGES_DIR", None)
+
+
+def get_static_page_path(name: str, version: str) -> Optional[str]:
+    directory = get_static_pages_dir()
+    return os.path.join(directory, f"{name}.{version}.html") if directory else None
+
+
+def is_anonymous(request: HttpRequest) -> bool:
+    """
+    Checks that request has no session, without loading one.
+    """
+    return settings.SESSION_COOKIE_NAME not in request.COOKIES
+
+
+def write_static_page(name: str, context: Dict, version: str) -> None:
+    """
+    Renders static page for anonymous user with placeholders of request
+    dependent parts and writes it to SHOP_STATIC_PAGES_DIR under pages
+    version, removing files of former versions of the page.
+    """
+    path = get_static_page_path(name, version)
+    if not path:
+        return
+    html = render_to_string(
+        "a_shop/about.html",
+        {**context, "csrf_token": CSRF_MARKER, "cartItem": CART_MARKER},
+    )
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{uuid.uuid4().hex}"
+    with open(temporary, "w", encoding="utf-8") as file:
+        file.write(html)
+    os.replace(temporary, path)
+    for former in glob.glob(
+        os.path.join(glob.escape(get_static_pages_dir()), f"{name}.*.html")
+    ):
+        if former != path:
+            try:
+                os.remove(former)
+            except FileNotFoundError:
+                pass
+
+
+def publish_static_page(name: str) -> None:
+    """
+    Writes pre-rendered static page if SHOP_STATIC_PAGES_DIR is set.
+    """
+    if not get_static_pages_dir() or name not in STATIC_PAGES:
+        return
+    version = get_pages_version()
+    page = DataMixin()
+    page.request = HttpRequest()
+    context = page.get_user_context(
+        title=STATIC_PAGES[name], page_data=page_registry.get(name)
+    )
+    write_static_page(name, context, version)
+
+
+def read_static_page(request: HttpRequest, name: str, cart_items: int) -> Optional[str]:
+    """
+    Returns pre-rendered page of current pages version for anonymous
+    request, None if there is no such page.
+    """
+    if not get_static_pages_dir() or not is_anonymous(request):
+        return None
+    path = get_static_page_path(name, get_pages_version())
+    try:
+        with open(path, encoding="utf-8") as file:
+            html = file.read()
+    except FileNotFoundError:
+        return None
+    return html.replace(CSRF_MARKER, get_token(request)).replace(
+        CART_MARKER, str(cart_items)
+    )
+
+
+@lru_cache(maxsize=None)
+def render_auth_modals() -> str:
+    """
+    Renders login and registration modals once per process, with marker
+    in place of CSRF token.
+    """
+    context = {
+        "user_login_form": AuthenticationForm(auto_id=False),
+        "user_creation_form": CustomUserCreationForm(auto_id=False),
+        "csrf_token": CSRF_MARKER,
+    }
+    return "".join(render_to_string(name, context) for name in AUTH_MODALS)
+
+
+def get_auth_modals(request: HttpRequest) -> str:
+    return render_auth_modals().replace(CSRF_MARKER, get_token(request))
@@ -0,0 +1,177 @@
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core import signing
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Model, Q, QuerySet
+from django.http import Http404
+
+NEXT, PREVIOUS = "n", "p"
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorSerializer:
+    """
+    Compact JSON serializer for cursor tokens, which keeps Decimal and
+    datetime sort keys.
+    """
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, cls=DjangoJSONEncoder, separators=(",", ":")).encode(
+            "latin-1"
+        )
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data.decode("latin-1"))
+
+
+class KeysetPage:
+    """
+    Page of keyset paginated objects. Provides the part of django Page
+    interface used by views and paginator template, without total count
+    and page numbers.
+    """
+
+    is_keyset = True
+    number = None
+
+    def __init__(
+        self,
+        object_list: List[Model],
+        paginator: "KeysetPaginator",
+        next_cursor: Optional[str],
+        previous_cursor: Optional[str],
+    ) -> None:
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self) -> str:
+        return f"<Keyset page of {len(self.object_list)} objects>"
+
+    def __len__(self) -> int:
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginates queryset by (sort key, id) values of the page boundary rows.
+    Every page costs one indexed range query of per_page + 1 rows no matter
+    how deep it is. Ordering must end with unique field to be total.
+    """
+
+    salt = "shop.pagination.cursor"
+
+    def __init__(
+        self, queryset: QuerySet, per_page: int, ordering: Sequence[str]
+    ) -> None:
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = [(name.lstrip("-"), name.startswith("-")) for name in ordering]
+        self.attnames = [self.get_attname(name) for name, _ in self.ordering]
+
+    def get_attname(self, name: str) -> str:
+        if name == "pk":
+            return self.queryset.model._meta.pk.attname
+        return self.queryset.model._meta.get_field(name).attname
+
+    def encode_cursor(self, obj: Model, direction: str) -> str:
+        values = [getattr(obj, attname) for attname in self.attnames]
+        return signing.dumps(
+            [direction, values], salt=self.salt, serializer=CursorSerializer
+        )
+
+    def decode_cursor(self, cursor: str) -> Tuple[str, List]:
+        try:
+            direction, values = signing.loads(
+                cursor, salt=self.salt, serializer=CursorSerializer
+            )
+        except (signing.BadSignature, ValueError, TypeError):
+            raise InvalidCursor(cursor)
+        if direction not in (NEXT, PREVIOUS) or len(values) != len(self.ordering):
+            raise InvalidCursor(cursor)
+        return direction, values
+
+    def get_boundary_filter(self, values: List, direction: str) -> Q:
+        """
+        Creates filter for rows placed after (or before) the row with given
+        sort key values: (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...
+        """
+        condition, equal = Q(), Q()
+        for (name, descending), value in zip(self.ordering, values):
+            forward = descending != (direction == PREVIOUS)
+            lookup = f"{name}__lt" if forward else f"{name}__gt"
+            condition |= equal & Q(**{lookup: value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def get_order_by(self, direction: str) -> List[str]:
+        reverse = direction == PREVIOUS
+        return [
+            f"-{name}" if descending != reverse else name
+            for name, descending in self.ordering
+        ]
+
+    def page(self, cursor: Optional[str] = None) -> KeysetPage:
+        direction, queryset = NEXT, self.queryset
+        if cursor:
+            direction, values = self.decode_cursor(cursor)
+            queryset = queryset.filter(self.get_boundary_filter(values, direction))
+        rows = list(
+            queryset.order_by(*self.get_order_by(direction))[: self.per_page + 1]
+        )
+        has_more, rows = len(rows) > self.per_page, rows[: self.per_page]
+        if direction == PREVIOUS:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, bool(cursor)
+        next_cursor = self.encode_cursor(rows[-1], NEXT) if rows and has_next else None
+        previous_cursor = (
+            self.encode_cursor(rows[0], PREVIOUS) if rows and has_previous else None
+        )
+        return KeysetPage(rows, self, next_cursor, previous_cursor)
+
+
+class KeysetPaginationMixin:
+    """
+    Opt-in keyset pagination for ListView. Enabled with keyset_pagination
+    view attribute or SHOP_KEYSET_PAGINATION setting, otherwise default
+    offset paginator is used.
+    """
+
+    keyset_pagination = None
+    keyset_ordering: Sequence[str] = ("pk",)
+    cursor_kwarg = "cursor"
+
+    def use_keyset_pagination(self) -> bool:
+        if self.keyset_pagination is None:
+            return getattr(settings, "SHOP_KEYSET_PAGINATION", False)
+        return self.keyset_pagination
+
+    def paginate_queryset(self, queryset: QuerySet, page_size: int) -> Tuple:
+        if not self.use_keyset_pagination() or not isinstance(queryset, QuerySet):
+            return super().paginate_queryset(queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size, self.keyset_ordering)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404("Invalid cursor")
+        return paginator, page, page.object_list, page.has_other_pages()
@@ -0,0 +1,98 @@
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+from django.db.models import OuterRef, Subquery
+
+from .models import Product, ProductImage
+
+
+class CartProduct:
+    """
+    Product fields shown in cart lines.
+    """
+
+    __slots__ = ("id", "name", "price", "sold", "image_url")
+
+    def __init__(
+        self, id: int, name: str, price: Decimal, sold: bool, image_url: str
+    ) -> None:
+        self.id = id
+        self.name = name
+        self.price = price
+        self.sold = sold
+        self.image_url = image_url
+
+
+class CartLine:
+    """
+    Quantity of cart product with its total price.
+    """
+
+    __slots__ = ("product", "quantity", "get_total")
+
+    def __init__(self, product: CartProduct, quantity: int) -> None:
+        self.product = product
+        self.quantity = quantity
+        self.get_total = product.price * quantity
+
+
+class PricedCart(NamedTuple):
+    lines: List[Any]
+    total_quantity: int
+    total: Decimal
+
+
+def get_image_url(name: str) -> str:
+    if not name:
+        return ""
+    return ProductImage._meta.get_field("image").storage.url(name)
+
+
+def get_cart_products(product_ids: Iterable[int]) -> Dict[int, CartProduct]:
+    """
+    Returns cart fields and first image of products in one query.
+    """
+    first_image = (
+        ProductImage.objects.filter(product=OuterRef("pk"))
+        .order_by("pk")
+        .values("image")[:1]
+    )
+    products = (
+        Product.objects.filter(pk__in=list(product_ids))
+        .order_by()
+        .annotate(first_image=Subquery(first_image))
+        .values_list("id", "name", "price", "sold", "first_image")
+    )
+    return {
+        pk: CartProduct(pk, name, price, sold, get_image_url(image))
+        for pk, name, price, sold, image in products
+    }
+
+
+def price_lines(lines: List[Any]) -> PricedCart:
+    """
+    Recomputes line totals and sums quantities and prices of the lines
+    in one pass.
+    """
+    total_quantity, total = 0, Decimal(0)
+    for line in lines:
+        line.get_total = line.product.price * line.quantity
+        total_quantity += line.quantity
+        total += line.get_total
+    return PricedCart(lines, total_quantity, total)
+
+
+def price_cart(quantities: Iterable[Tuple[int, int]]) -> PricedCart:
+    """
+    Prices product id and quantity pairs, skipping products which do
+    not exist any more.
+    """
+    quantities = list(quantities)
+    products = get_cart_products(product_id for product_id, _ in quantities)
+    return price_lines(
+        [
+            CartLine(products[product_id], quantity)
+            for product_id, quantity in quantities
+            if product_id in products
+        ]
+    )
@@ -0,0 +1,100 @@
+from typing import Iterable, NamedTuple, Optional, Tuple, Union
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .conditional import Stamp, bump_stamps, get_stamps
+from .models import Product, ProductCard, ProductFeature, Review
+from .querysets import querysets
+from .ratings import get_product_eval
+from .reviews import get_review_page
+
+BUNDLE_KEY = "shop:product-bundle:{}"
+
+
+def get_bundle_timeout() -> int:
+    return getattr(settings, "SHOP_PRODUCT_BUNDLE_TIMEOUT", 24 * 60 * 60)
+
+
+def get_product_stamp_name(product_id: int) -> str:
+    return f"product:{product_id}"
+
+
+def get_bundle_version(product_id: int) -> Stamp:
+    return get_stamps(get_product_stamp_name(product_id))[0]
+
+
+def bump_bundle_versions(product_ids: Iterable[int]) -> None:
+    """
+    Invalidates cached bundles of the products.
+    """
+    bump_stamps(*(get_product_stamp_name(product_id) for product_id in product_ids))
+
+
+class ProductBundle(NamedTuple):
+    """
+    Everything product page shows about the product. Cached bundles are
+    shared by requests of the process, so they are not changed.
+    """
+
+    version: Stamp
+    product: Product
+    features: Tuple[ProductFeature, ...]
+    image_urls: Tuple[str, ...]
+    reviews: Tuple[Review, ...]
+    reviews_cursor: Optional[str]
+    review_number: int
+    product_eval: Union[str, int]
+
+    @classmethod
+    def build(cls, product_id: int, version: Stamp) -> Optional["ProductBundle"]:
+        product = (
+            querysets.get_product_queryset_for_product_view()
+            .filter(pk=product_id)
+            .first()
+        )
+        if product is None:
+            return None
+        features = querysets.get_product_features_queryset_for_product_view(product)
+        images = querysets.get_product_image_queryset_for_product_view(
+            product
+        ).order_by("pk")
+        reviews = get_review_page(product)
+        rating = (
+            ProductCard.objects.filter(pk=product_id)
+            .values("review_count", "grade_sum")
+            .first()
+        ) or {"review_count": 0, "grade_sum": 0}
+        return cls(
+            version=version,
+            product=product,
+            features=tuple(features),
+            image_urls=tuple(image.image.url for image in images if image.image),
+            reviews=tuple(reviews),
+            reviews_cursor=reviews.next_cursor,
+            review_number=rating["review_count"],
+            product_eval=get_product_eval(rating["grade_sum"], rating["review_count"]),
+        )
+
+
+def get_product_bundle(slug: str) -> Optional[ProductBundle]:
+    """
+    Returns cached bundle of product with given slug, building it on
+    miss or when the product version changed. Returns None if there is
+    no such product.
+    """
+    key = BUNDLE_KEY.format(slug)
+    bundle = cache.get(key)
+    if (
+        bundle is not None
+        and bundle.product.slug == slug
+        and bundle.version == get_bundle_version(bundle.product.pk)
+    ):
+        return bundle
+    product_id = Product.objects.filter(slug=slug).values_list("pk", flat=True).first()
+    if product_id is None:
+        return None
+    bundle = ProductBundle.build(product_id, get_bundle_version(product_id))
+    if bundle is not None:
+        cache.set(key, bundle, get_bundle_timeout())
+    return bundle
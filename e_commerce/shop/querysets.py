@@ -1,42 +1,41 @@
+from typing import Optional
+
 from django.conf.global_settings import AUTH_USER_MODEL
-from django.db.models import OuterRef, Prefetch, QuerySet, Subquery
+from django.db.models import Prefetch, QuerySet
 from django.http import QueryDict
 
+from .facets import filter_products, get_filter_state
 from .models import (
-    Category,
     Order,
     OrderItem,
     Product,
+    ProductCard,
     ProductFeature,
     ProductImage,
     Review,
     Sale,
-    SuperCategory,
 )
+from .search import get_search_backend
 
 
 class ShopQuerySets:
     @staticmethod
-    def get_product_queryset_for_shop_home_view() -> QuerySet:
-        return (
-            Product.objects.only("id", "name", "price", "sold")
-            .order_by("access_number")
-            .select_related("category")
-            .only("category__name", "category__slug")
-            .prefetch_related(
-                Prefetch(
-                    "productimage_set",
-                    queryset=ProductImage.objects.filter(
-                        id__in=Subquery(
-                            ProductImage.objects.filter(
-                                product=OuterRef("product_id")
-                            ).values_list("id", flat=True)[:1]
-                        )
-                    ),
-                )
-            )
-            .reverse()[:100]
+    def get_product_queryset_for_shop_home_view(
+        limit: Optional[int] = 100,
+    ) -> QuerySet:
+        products = ProductCard.objects.order_by("-trending_score", "-product").only(
+            "name",
+            "price",
+            "sold",
+            "image",
+            "category_name",
+            "category_slug",
+            "url",
+            "trending_score",
+            "review_count",
+            "grade_sum",
         )
+        return products[:limit] if limit else products
 
     @staticmethod
     def get_order_queryset_for_user_account_view(user: AUTH_USER_MODEL) -> QuerySet:
@@ -62,14 +61,13 @@ class ShopQuerySets:
         )
 
     @staticmethod
-    def get_product_queryset_for_category_view(slug: str) -> QuerySet:
-        return (
-            Product.objects.filter(category__slug=slug)
-            .select_related("category", "brand", "category__super_category")
-            .only("name", "price", "brand", "category")
-            .defer("category__slug", "brand__slug")
-            .prefetch_related("productimage_set")
-        )
+    def get_product_queryset_for_category_view(
+        slug: str, data: Optional[QueryDict] = None
+    ) -> QuerySet:
+        products = ProductCard.objects.filter(category_slug=slug).order_by("product")
+        if data:
+            products = filter_products(products, get_filter_state(data), slug)
+        return products
 
     @staticmethod
     def get_product_queryset_for_product_view() -> QuerySet:
@@ -77,12 +75,14 @@ class ShopQuerySets:
             "category", "category__super_category"
         ).only(
             "name",
+            "slug",
             "description",
             "category",
             "vendor_code",
             "price",
             "sold",
             "category__name",
+            "category__slug",
             "category__super_category",
             "category__super_category__name",
         )
@@ -112,32 +112,17 @@ class ShopQuerySets:
                 "review_author",
                 "like_num",
                 "dislike_num",
+                "helpfulness",
                 "review_author__username",
             )
         )
 
     @staticmethod
-    def get_product_for_search_result_view(query: QueryDict) -> QuerySet:
-        return (
-            Product.objects.filter(name__icontains=query)
-            .only(
-                "name",
-                "price",
-            )
-            .prefetch_related("productimage_set")
-            .order_by("access_number")
-            .reverse()[:100]
-        )
-
-    @staticmethod
-    def get_super_category_queryset_for_data_mixin() -> QuerySet:
-        return SuperCategory.objects.all().prefetch_related(
-            Prefetch("category_set", queryset=Category.objects.defer("slug"))
-        )
-
-    @staticmethod
-    def get_category_queryset_for_data_mixin() -> QuerySet:
-        return Category.objects.defer("slug").select_related("super_category")
+    def get_product_for_search_result_view(
+        query: str, limit: Optional[int] = 100
+    ) -> QuerySet:
+        products = get_search_backend().search(query)
+        return products[:limit] if limit else products
 
 
 querysets = ShopQuerySets()
@@ -0,0 +1,107 @@
+import math
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+
+from .models import ProductCard, Review
+
+GRADES = range(1, 6)
+GRADE_FIELDS = {grade: f"grade_{grade}_count" for grade in GRADES}
+RATING_FIELDS = ("review_count", "grade_sum", *GRADE_FIELDS.values())
+
+
+def get_product_eval(grade_sum: Optional[int], review_count: int) -> Union[str, int]:
+    """
+    Calculates product evaluation from 0 to 10 shown by star rating.
+    """
+    if not review_count:
+        return 0
+    return str(int(math.ceil(2 * (grade_sum or 0) / review_count)))
+
+
+def get_rating_changes(grade: int, sign: int) -> Dict[str, int]:
+    """
+    Returns changes of card rating fields made by adding (sign 1) or
+    removing (sign -1) review with the grade.
+    """
+    changes = {"review_count": sign, "grade_sum": sign * grade}
+    if grade in GRADE_FIELDS:
+        changes[GRADE_FIELDS[grade]] = sign
+    return changes
+
+
+def apply_rating_changes(product_id: int, changes: Dict[str, int]) -> None:
+    changes = {name: value for name, value in changes.items() if value}
+    if changes:
+        ProductCard.objects.filter(pk=product_id).update(
+            **{name: F(name) + value for name, value in changes.items()}
+        )
+
+
+def add_review(product_id: int, grade: int) -> None:
+    apply_rating_changes(product_id, get_rating_changes(grade, 1))
+
+
+def remove_review(product_id: int, grade: int) -> None:
+    apply_rating_changes(product_id, get_rating_changes(grade, -1))
+
+
+def move_review_rating(
+    previous: Optional[Tuple[int, int]], current: Tuple[int, int]
+) -> None:
+    """
+    Moves grade of saved review given as (product id, grade) pairs between
+    products or grades, previous is None for a new review.
+    """
+    if previous is None:
+        add_review(*current)
+        return
+    if previous == current:
+        return
+    with transaction.atomic():
+        if previous[0] == current[0]:
+            changes = get_rating_changes(previous[1], -1)
+            for name, value in get_rating_changes(current[1], 1).items():
+                changes[name] = changes.get(name, 0) + value
+            apply_rating_changes(current[0], changes)
+        else:
+            remove_review(*previous)
+            add_review(*current)
+
+
+def get_rating_aggregates() -> Dict:
+    aggregates = {"review_count": Count("pk"), "grade_sum": Coalesce(Sum("grade"), 0)}
+    for grade, name in GRADE_FIELDS.items():
+        aggregates[name] = Count("pk", filter=Q(grade=grade))
+    return aggregates
+
+
+def reconcile_ratings(
+    product_ids: Optional[Iterable[int]] = None, batch_size: int = 500
+) -> int:
+    """
+    Recomputes rating fields of given or all cards from reviews, returns
+    number of corrected cards.
+    """
+    reviews = Review.objects.order_by().values("product")
+    cards = ProductCard.objects.only("product", *RATING_FIELDS).order_by("pk")
+    if product_ids is not None:
+        product_ids = list(product_ids)
+        reviews = reviews.filter(product__in=product_ids)
+        cards = cards.filter(pk__in=product_ids)
+    ratings = {
+        rating.pop("product"): rating
+        for rating in reviews.annotate(**get_rating_aggregates())
+    }
+    empty = dict.fromkeys(RATING_FIELDS, 0)
+    changed = []
+    for card in cards.iterator(chunk_size=batch_size):
+        rating = ratings.get(card.pk, empty)
+        if any(getattr(card, name) != value for name, value in rating.items()):
+            for name, value in rating.items():
+                setattr(card, name, value)
+            changed.append(card)
+    ProductCard.objects.bulk_update(changed, RATING_FIELDS, batch_size=batch_size)
+    return len(changed)
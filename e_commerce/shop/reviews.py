@@ -0,0 +1,57 @@
+from typing import Optional, Union
+
+from django.conf import settings
+from django.db.models import Expression, Value
+from django.db.models.expressions import Combinable
+from django.db.models.functions import Coalesce
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from .models import Product, Review
+from .pagination import KeysetPage, KeysetPaginator
+from .querysets import querysets
+
+REVIEW_ORDERING = ("-helpfulness", "-pk")
+
+
+def get_review_page_size() -> int:
+    return getattr(settings, "SHOP_PRODUCT_REVIEWS_PAGE_SIZE", 20)
+
+
+def get_helpfulness(review: Review) -> Union[int, Expression]:
+    """
+    Returns like_num - dislike_num of the review. Counters changed with
+    F() expressions give expression evaluated by the same update.
+    """
+    like_num, dislike_num = review.like_num, review.dislike_num
+    if not isinstance(like_num, Combinable) and not isinstance(dislike_num, Combinable):
+        return (like_num or 0) - (dislike_num or 0)
+    return Coalesce(get_operand(like_num), 0) - Coalesce(get_operand(dislike_num), 0)
+
+
+def get_operand(value: Union[None, int, Combinable]) -> Union[Combinable, Value]:
+    return value if isinstance(value, Combinable) else Value(value or 0)
+
+
+def get_review_page(product: Product, cursor: Optional[str] = None) -> KeysetPage:
+    """
+    Returns page of product reviews, most helpful first, after the cursor.
+    Raises InvalidCursor for broken cursor.
+    """
+    paginator = KeysetPaginator(
+        querysets.get_review_queryset_for_product_view(product),
+        get_review_page_size(),
+        REVIEW_ORDERING,
+    )
+    return paginator.page(cursor)
+
+
+def get_reviews_url(slug: str, cursor: Optional[str]) -> Optional[str]:
+    """
+    Returns URL of product reviews page after the cursor, None if there
+    are no more reviews.
+    """
+    if not cursor:
+        return None
+    url = reverse("shop:product_reviews", kwargs={"product_slug": slug})
+    return f"{url}?{urlencode({'cursor': cursor})}"
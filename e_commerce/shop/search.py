@@ -0,0 +1,424 @@
+import re
+import unicodedata
+from functools import reduce
+from operator import and_, or_
+from typing import Dict, Iterable, List, Optional
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import FloatField, Q, QuerySet, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import escape, strip_tags
+from django.utils.safestring import SafeString, mark_safe
+
+from .models import Product, ProductCard, ProductSearchDocument
+
+APOSTROPHES = re.compile("['’ʼ`´‘]")
+STRESS_MARK = "\u0301"
+WORD = re.compile(r"[^\W_]+")
+CYRILLIC = re.compile("[а-яіїєґ]")
+MIN_STEM_LENGTH = 3
+MAX_QUERY_TERMS = 8
+UKRAINIAN_SUFFIXES = sorted(
+    (
+        "ами",
+        "ями",
+        "ими",
+        "іми",
+        "ого",
+        "ому",
+        "ої",
+        "ах",
+        "ях",
+        "ів",
+        "їв",
+        "ам",
+        "ям",
+        "ом",
+        "ем",
+        "єм",
+        "ою",
+        "ею",
+        "єю",
+        "ий",
+        "ій",
+        "им",
+        "ім",
+        "их",
+        "іх",
+        "а",
+        "я",
+        "е",
+        "є",
+        "і",
+        "ї",
+        "и",
+        "у",
+        "ю",
+        "о",
+        "ь",
+    ),
+    key=len,
+    reverse=True,
+)
+HIGHLIGHT_START, HIGHLIGHT_STOP = "\ue000", "\ue001"
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """
+    Brings text to the form stored in search documents: NFKC normalized,
+    without stress marks and apostrophes, so "м'ясо" and "мʼясо" match.
+    """
+    text = unicodedata.normalize("NFKC", APOSTROPHES.sub("", text or ""))
+    return text.replace(STRESS_MARK, "")
+
+
+def stem(word: str) -> str:
+    """
+    Light Ukrainian stemmer, cuts off the longest inflection ending if
+    enough of the word remains. Stems are searched as prefixes.
+    """
+    if not CYRILLIC.search(word):
+        return word
+    for suffix in UKRAINIAN_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            return word[: -len(suffix)]
+    return word
+
+
+def get_words(text: Optional[str]) -> List[str]:
+    """
+    Splits text to normalized lowercase words.
+    """
+    return WORD.findall(normalize_text(text).casefold())
+
+
+def get_query_terms(query: Optional[str]) -> List[str]:
+    """
+    Splits search query to unique stemmed terms.
+    """
+    terms = [stem(word) for word in get_words(query)]
+    return list(dict.fromkeys(terms))[:MAX_QUERY_TERMS]
+
+
+def highlight_snippet(snippet: Optional[str]) -> SafeString:
+    """
+    Escapes search snippet and turns backend highlight markers into <mark>.
+    """
+    text = escape(snippet or "")
+    return mark_safe(
+        text.replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_STOP, "</mark>")
+    )
+
+
+def get_document_data(product: Product) -> Dict:
+    """
+    Creates search document field values for given product with loaded
+    category and brand.
+    """
+    return {
+        "title": normalize_text(
+            " ".join((product.name, product.model, product.vendor_code))
+        ),
+        "keywords": normalize_text(
+            " ".join(
+                (product.brand.name if product.brand else "", product.category.name)
+            )
+        ),
+        "body": normalize_text(strip_tags(product.description)),
+    }
+
+
+class SearchBackend:
+    """
+    Base search backend. Keeps the database index of search documents
+    and returns matching product cards annotated with rank. Snippets are
+    added only to the shown page, so counting results does not build them.
+    """
+
+    def __init__(self, using: str = DEFAULT_DB_ALIAS) -> None:
+        self.using = using
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    @property
+    def document_table(self) -> str:
+        return self.connection.ops.quote_name(ProductSearchDocument._meta.db_table)
+
+    @property
+    def card_column(self) -> str:
+        return "{}.{}".format(
+            self.connection.ops.quote_name(ProductCard._meta.db_table),
+            self.connection.ops.quote_name(ProductCard._meta.pk.column),
+        )
+
+    def install(self) -> None:
+        pass
+
+    def index(self, documents: List[ProductSearchDocument]) -> None:
+        pass
+
+    def remove(self, product_ids: List[int]) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def filter(self, terms: List[str]) -> QuerySet:
+        raise NotImplementedError
+
+    def get_snippet(self, terms: List[str]) -> Optional[RawSQL]:
+        return None
+
+    def search(self, query: Optional[str]) -> QuerySet:
+        terms = get_query_terms(query)
+        if not terms:
+            return ProductCard.objects.none()
+        return self.filter(terms).order_by("-rank", "-access_number", "-product")
+
+    def add_snippets(self, query: Optional[str], cards: Iterable[ProductCard]) -> None:
+        """
+        Sets highlighted snippet on given cards of a search results page.
+        """
+        cards = list(cards)
+        terms = get_query_terms(query)
+        snippet = self.get_snippet(terms) if terms and cards else None
+        if snippet is None:
+            return
+        snippets = dict(
+            ProductCard.objects.filter(pk__in=[card.pk for card in cards])
+            .annotate(snippet=snippet)
+            .values_list("pk", "snippet")
+        )
+        for card in cards:
+            card.snippet = snippets.get(card.pk, "")
+
+
+class SimpleSearchBackend(SearchBackend):
+    """
+    Fallback for databases without full-text search, matches all terms
+    in any document field and ranks by popularity only.
+    """
+
+    fields = ("title", "keywords", "body")
+
+    def filter(self, terms: List[str]) -> QuerySet:
+        condition = reduce(
+            and_,
+            (
+                reduce(
+                    or_,
+                    (
+                        Q(**{f"product__search_document__{field}__icontains": term})
+                        for field in self.fields
+                    ),
+                )
+                for term in terms
+            ),
+        )
+        return ProductCard.objects.filter(condition).annotate(
+            rank=Value(0.0, output_field=FloatField())
+        )
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Weighted tsvector column generated from search document fields and
+    GIN index over it. Text is normalized before storing, so 'simple'
+    configuration is used and stems are matched as prefixes.
+    """
+
+    index_name = "shop_search_document_gin"
+    headline_options = (
+        f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, "
+        "MaxWords=25, MinWords=10, MaxFragments=2"
+    )
+
+    def install(self) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"ALTER TABLE {self.document_table} ADD COLUMN IF NOT EXISTS "
+                "document tsvector GENERATED ALWAYS AS ("
+                "setweight(to_tsvector('simple', title), 'A') || "
+                "setweight(to_tsvector('simple', keywords), 'B') || "
+                "setweight(to_tsvector('simple', body), 'C')) STORED"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.index_name} "
+                f"ON {self.document_table} USING GIN (document)"
+            )
+
+    @property
+    def document(self) -> str:
+        return f"FROM {self.document_table} WHERE product_id = {self.card_column}"
+
+    @staticmethod
+    def get_tsquery(terms: List[str]) -> str:
+        return " & ".join(f"{term}:*" for term in terms)
+
+    def filter(self, terms: List[str]) -> QuerySet:
+        tsquery = self.get_tsquery(terms)
+        return ProductCard.objects.filter(
+            pk__in=RawSQL(
+                f"SELECT product_id FROM {self.document_table} "
+                "WHERE document @@ to_tsquery('simple', %s)",
+                [tsquery],
+            )
+        ).annotate(
+            rank=RawSQL(
+                f"SELECT ts_rank(document, to_tsquery('simple', %s)) {self.document}",
+                [tsquery],
+                output_field=FloatField(),
+            )
+        )
+
+    def get_snippet(self, terms: List[str]) -> RawSQL:
+        return RawSQL(
+            "SELECT ts_headline('simple', title || '. ' || body, "
+            f"to_tsquery('simple', %s), %s) {self.document}",
+            [self.get_tsquery(terms), self.headline_options],
+            output_field=TextField(),
+        )
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    FTS5 table with product id as rowid, for local development and tests.
+    """
+
+    table = "shop_product_fts"
+    weights = (10.0, 4.0, 1.0)
+
+    def install(self) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING "
+                "fts5(title, keywords, body, tokenize='unicode61 remove_diacritics 2')"
+            )
+
+    def index(self, documents: List[ProductSearchDocument]) -> None:
+        self.remove([document.pk for document in documents])
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, title, keywords, body) "
+                "VALUES (%s, %s, %s, %s)",
+                [
+                    (document.pk, document.title, document.keywords, document.body)
+                    for document in documents
+                ],
+            )
+
+    def remove(self, product_ids: List[int]) -> None:
+        if not product_ids:
+            return
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE rowid IN "
+                f"({', '.join(['%s'] * len(product_ids))})",
+                product_ids,
+            )
+
+    def clear(self) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+
+    @property
+    def document(self) -> str:
+        return (
+            f"FROM {self.table} WHERE {self.table} MATCH %s "
+            f"AND rowid = {self.card_column}"
+        )
+
+    @staticmethod
+    def get_match(terms: List[str]) -> str:
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def filter(self, terms: List[str]) -> QuerySet:
+        match = self.get_match(terms)
+        return ProductCard.objects.filter(
+            pk__in=RawSQL(
+                f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", [match]
+            )
+        ).annotate(
+            rank=RawSQL(
+                f"SELECT -bm25({self.table}, %s, %s, %s) {self.document}",
+                [*self.weights, match],
+                output_field=FloatField(),
+            )
+        )
+
+    def get_snippet(self, terms: List[str]) -> RawSQL:
+        return RawSQL(
+            f"SELECT snippet({self.table}, -1, %s, %s, '…', 16) {self.document}",
+            [HIGHLIGHT_START, HIGHLIGHT_STOP, self.get_match(terms)],
+            output_field=TextField(),
+        )
+
+
+SEARCH_BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+
+def get_search_backend(using: str = DEFAULT_DB_ALIAS) -> SearchBackend:
+    """
+    Returns search backend for the database vendor of given connection.
+    """
+    backend_class = SEARCH_BACKENDS.get(connections[using].vendor, SimpleSearchBackend)
+    return backend_class(using)
+
+
+def index_products(
+    product_ids: Optional[Iterable[int]] = None, batch_size: int = 500
+) -> int:
+    """
+    Creates or updates search documents for given products or for the
+    whole catalog in batches, returns number of indexed products.
+    """
+    products = Product.objects.select_related("category", "brand")
+    if product_ids is not None:
+        products = products.filter(pk__in=list(product_ids))
+    documents, number = [], 0
+    for product in products.order_by("pk").iterator(chunk_size=batch_size):
+        documents.append(
+            ProductSearchDocument(product=product, **get_document_data(product))
+        )
+        if len(documents) >= batch_size:
+            number += write_documents(documents)
+            documents = []
+    return number + write_documents(documents)
+
+
+def write_documents(documents: List[ProductSearchDocument]) -> int:
+    """
+    Replaces stored search documents with given ones and indexes them
+    in one transaction.
+    """
+    with transaction.atomic():
+        ProductSearchDocument.objects.filter(
+            pk__in=[document.pk for document in documents]
+        ).delete()
+        ProductSearchDocument.objects.bulk_create(documents)
+        get_search_backend().index(documents)
+    return len(documents)
+
+
+def remove_products(product_ids: List[int]) -> None:
+    """
+    Removes products from the search index, documents are deleted
+    with products by cascade.
+    """
+    get_search_backend().remove(product_ids)
+
+
+def rebuild_search_index(batch_size: int = 500) -> int:
+    """
+    Installs search index if needed and reindexes the whole catalog.
+    """
+    backend = get_search_backend()
+    backend.install()
+    with transaction.atomic():
+        backend.clear()
+        return index_products(batch_size=batch_size)
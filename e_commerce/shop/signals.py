@@ -0,0 +1,203 @@
+from typing import Any, Optional
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .autocomplete import BRAND, CATEGORY, PRODUCT, autocomplete_index
+from .cards import (
+    refresh_brand_cards,
+    refresh_card_image,
+    refresh_category_cards,
+    refresh_product_card,
+)
+from .conditional import HOME_STAMP, bump_stamps, get_category_stamp_name
+from .facets import bump_facets_version
+from .feature_index import refresh_product_feature
+from .fuzzy import get_trigram_backend, index_terms
+from .models import (
+    Brand,
+    Category,
+    PageData,
+    Product,
+    ProductCard,
+    ProductFeature,
+    ProductImage,
+    Review,
+    Sale,
+    SuperCategory,
+)
+from .navigation import bump_navigation_version
+from .pages import bump_pages_version, publish_static_page
+from .product_bundle import bump_bundle_versions
+from .ratings import remove_review
+from .reviews import get_helpfulness
+from .search import get_search_backend, index_products, remove_products
+from .trending import record_order_sales
+
+
+def get_card_category_slug(product_id: int) -> Optional[str]:
+    return (
+        ProductCard.objects.filter(pk=product_id)
+        .values_list("category_slug", flat=True)
+        .first()
+    )
+
+
+def bump_product_category_stamp(product_id: int) -> None:
+    """
+    Changes stamp of the page of the category shown on product card.
+    """
+    slug = get_card_category_slug(product_id)
+    if slug:
+        bump_stamps(get_category_stamp_name(slug))
+
+
+@receiver(post_save, sender=Product)
+def product_saved(
+    sender: type, instance: Product, created: bool, **kwargs: Any
+) -> None:
+    bump_stamps(HOME_STAMP)
+    bump_bundle_versions([instance.pk])
+    previous = (
+        ProductCard.objects.filter(pk=instance.pk)
+        .values_list("category_slug", "sold")
+        .first()
+    )
+    if previous and previous[0] != instance.category.slug:
+        bump_facets_version(previous[0])
+    refresh_product_card(instance.pk)
+    index_products([instance.pk])
+    index_terms([instance.pk])
+    autocomplete_index.record_change(PRODUCT, instance.pk)
+    bump_facets_version(instance.category.slug)
+    if previous != (instance.category.slug, instance.sold):
+        bump_navigation_version()
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender: type, instance: Product, **kwargs: Any) -> None:
+    bump_stamps(HOME_STAMP)
+    bump_bundle_versions([instance.pk])
+    bump_navigation_version()
+    remove_products([instance.pk])
+    autocomplete_index.record_change(PRODUCT, instance.pk)
+    bump_facets_version(instance.category.slug)
+
+
+@receiver(post_save, sender=ProductFeature)
+@receiver(post_delete, sender=ProductFeature)
+def product_feature_changed(
+    sender: type, instance: ProductFeature, **kwargs: Any
+) -> None:
+    bump_bundle_versions([instance.product_id])
+    slug = get_card_category_slug(instance.product_id)
+    if slug:
+        bump_facets_version(slug)
+    refresh_product_feature(instance.product_id, instance.feature_name_id)
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def product_image_changed(sender: type, instance: ProductImage, **kwargs: Any) -> None:
+    bump_stamps(HOME_STAMP)
+    bump_bundle_versions([instance.product_id])
+    refresh_card_image(instance.product_id)
+    bump_product_category_stamp(instance.product_id)
+
+
+@receiver(post_save, sender=Category)
+def category_saved(
+    sender: type, instance: Category, created: bool, **kwargs: Any
+) -> None:
+    autocomplete_index.record_change(CATEGORY, instance.pk)
+    bump_navigation_version()
+    bump_pages_version()
+    if not created:
+        refresh_category_cards(instance)
+        bump_bundle_versions(instance.product_set.values_list("pk", flat=True))
+        index_products(instance.product_set.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Brand)
+def brand_saved(sender: type, instance: Brand, created: bool, **kwargs: Any) -> None:
+    bump_stamps(HOME_STAMP)
+    autocomplete_index.record_change(BRAND, instance.pk)
+    if not created:
+        refresh_brand_cards(instance)
+        for slug in set(instance.product_set.values_list("category__slug", flat=True)):
+            bump_facets_version(slug)
+        product_ids = list(instance.product_set.values_list("pk", flat=True))
+        bump_bundle_versions(product_ids)
+        index_products(product_ids)
+        index_terms(product_ids)
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender: type, instance: Category, **kwargs: Any) -> None:
+    autocomplete_index.record_change(CATEGORY, instance.pk)
+    bump_navigation_version()
+    bump_pages_version()
+
+
+@receiver(post_save, sender=SuperCategory)
+@receiver(post_delete, sender=SuperCategory)
+def super_category_changed(
+    sender: type, instance: SuperCategory, **kwargs: Any
+) -> None:
+    bump_bundle_versions(
+        Product.objects.filter(category__super_category=instance).values_list(
+            "pk", flat=True
+        )
+    )
+    bump_navigation_version()
+    bump_pages_version()
+
+
+@receiver(post_save, sender=PageData)
+@receiver(post_delete, sender=PageData)
+def page_data_changed(sender: type, instance: PageData, **kwargs: Any) -> None:
+    bump_pages_version()
+    publish_static_page(instance.name)
+
+
+@receiver(post_delete, sender=Brand)
+def brand_deleted(sender: type, instance: Brand, **kwargs: Any) -> None:
+    bump_stamps(HOME_STAMP)
+    autocomplete_index.record_change(BRAND, instance.pk)
+
+
+@receiver(pre_save, sender=Review)
+def review_saving(sender: type, instance: Review, **kwargs: Any) -> None:
+    instance.helpfulness = get_helpfulness(instance)
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender: type, instance: Review, created: bool, **kwargs: Any) -> None:
+    bump_stamps(HOME_STAMP)
+    # Review.save moves the grade on cards, stored rating is still previous here
+    previous = instance.stored_rating
+    if previous is not None and previous[0] != instance.product_id:
+        bump_bundle_versions([previous[0]])
+        bump_product_category_stamp(previous[0])
+    bump_bundle_versions([instance.product_id])
+    bump_product_category_stamp(instance.product_id)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender: type, instance: Review, **kwargs: Any) -> None:
+    bump_stamps(HOME_STAMP)
+    remove_review(instance.product_id, instance.grade)
+    bump_bundle_versions([instance.product_id])
+    bump_product_category_stamp(instance.product_id)
+
+
+@receiver(post_save, sender=Sale)
+def sale_saved(sender: type, instance: Sale, created: bool, **kwargs: Any) -> None:
+    if created and instance.order_id:
+        record_order_sales(instance.order_id, timezone.now())
+
+
+def install_search_index(using: str, **kwargs: Any) -> None:
+    get_search_backend(using).install()
+    get_trigram_backend(using).install()
@@ -0,0 +1,32 @@
+var authModals = document.getElementById('auth-modals')
+var authModalsRequest = null
+
+function loadAuthModals(){
+    if (!authModalsRequest){
+        authModalsRequest = fetch(authModals.dataset.url, {credentials: 'same-origin'})
+            .then(function(response){
+                return response.text()
+            })
+            .then(function(html){
+                authModals.innerHTML = html
+            })
+    }
+    return authModalsRequest
+}
+
+if (authModals){
+    document.addEventListener('click', function(event){
+        var trigger = event.target.closest(
+            '[data-bs-target="#loginModal"], [data-bs-target="#registerModal"]'
+        )
+        if (!trigger || authModals.children.length){
+            return
+        }
+        event.preventDefault()
+        event.stopPropagation()
+        loadAuthModals().then(function(){
+            var modal = document.querySelector(trigger.dataset.bsTarget)
+            bootstrap.Modal.getOrCreateInstance(modal).show()
+        })
+    }, true)
+}
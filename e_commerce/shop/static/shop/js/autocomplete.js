@@ -0,0 +1,57 @@
+var searchInput = document.getElementById('search-input')
+var searchSuggestions = document.getElementById('search-suggestions')
+var searchTimer
+var searchController
+
+if (searchInput && searchSuggestions){
+    searchInput.addEventListener('input', function(){
+        window.clearTimeout(searchTimer)
+        searchTimer = window.setTimeout(loadSuggestions, 150)
+    })
+    searchInput.addEventListener('blur', function(){
+        window.setTimeout(hideSuggestions, 200)
+    })
+}
+
+function hideSuggestions(){
+    searchSuggestions.classList.remove('show')
+}
+
+function loadSuggestions(){
+    var query = searchInput.value.trim()
+    if (searchController){
+        searchController.abort()
+    }
+    if (query.length < 2){
+        hideSuggestions()
+        return
+    }
+    searchController = new AbortController()
+    var url = searchInput.dataset.autocompleteUrl + '?q=' + encodeURIComponent(query)
+
+    fetch(url, {signal: searchController.signal})
+
+    .then((response) => {
+        return response.json()
+    })
+
+    .then((data) => {
+        showSuggestions(data.results)
+    })
+
+    .catch(() => {})
+}
+
+function showSuggestions(results){
+    searchSuggestions.replaceChildren()
+    for (let i = 0; i < results.length; i++){
+        var item = document.createElement('li')
+        var link = document.createElement('a')
+        link.className = 'dropdown-item text-truncate'
+        link.href = results[i].url
+        link.textContent = results[i].label
+        item.appendChild(link)
+        searchSuggestions.appendChild(item)
+    }
+    searchSuggestions.classList.toggle('show', results.length > 0)
+}
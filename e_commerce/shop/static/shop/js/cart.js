@@ -1,14 +1,12 @@
 var updateBtn = document.getElementsByClassName('product-basket-button')
-var basketFlag
 for (let i = 0; i < updateBtn.length; i++){
     updateBtn[i].addEventListener('click', function(){
         var productId = this.dataset.product
         var action = this.dataset.action
         var sold = this.dataset.sold
-        basketFlag = true
         if (sold == 'False'){
             document.getElementById('product-in-cart').style.display = 'flex'
-            addCookieItem(productId, action)
+            updateCart(productId, action, true)
         }
     })
 }
@@ -19,12 +17,7 @@ for (let i = 0; i < quantityBtn.length; i++){
     quantityBtn[i].addEventListener('click', function(){
         var productId = this.dataset.product
         var action = this.dataset.action
-        basketFlag = false
-        if(user === 'AnonymousUser'){
-            addCookieItem(productId, action)
-        }else{
-            updateUserOrder(productId, action)
-        }
+        updateCart(productId, action, false)
     })
 }
 
@@ -32,35 +25,7 @@ function reload(){
     location.reload()
 }
 
-function addCookieItem(productId, action){
-    if(action == 'add'){
-        if(cart[productId] == undefined){
-            cart[productId] = {'quantity': 1}
-        }else{
-            cart[productId]['quantity'] += 1
-        }
-    }
-
-    if(action == 'remove'){
-        cart[productId]['quantity'] -= 1
-        if(cart[productId]['quantity'] <= 0){
-            console.log('Item should be deleted')
-            delete cart[productId];
-        }
-    }
-    console.log('Cart:', cart)
-    document.cookie = 'cart=' + JSON.stringify(cart) + ";domain=;path=/"
-    if(basketFlag){
-        window.setTimeout(reload, 3000)
-    }else{
-        reload()
-    }
-}
-
-function updateUserOrder(productId, action){
-    console.log('User is logged in, sending data..')
-
-    addCookieItem(productId, action)
+function updateCart(productId, action, basketFlag){
     var url = '/update_item/'
 
     fetch(url, {
@@ -77,18 +42,17 @@ function updateUserOrder(productId, action){
     })
 
     .then((data) => {
-        console.log('data:', data)
+        if(basketFlag){
+            window.setTimeout(reload, 3000)
+        }else{
+            reload()
+        }
     })
 }
 
 var messageDiv = document.getElementById('cart-message')
 var messageWarn = document.getElementById('cart-warning')
 
-if(messageDiv) {
-    cartJson = JSON.parse(document.getElementById('cartJson').textContent)
-    cart = JSON.parse(cartJson)
-    document.cookie = 'cart=' + JSON.stringify(cart) + ";domain=;path=/"
-    if(!messageWarn){
-        window.setTimeout(reload, 10000)
-        }
-}
\ No newline at end of file
+if(messageDiv && !messageWarn) {
+    window.setTimeout(reload, 10000)
+}
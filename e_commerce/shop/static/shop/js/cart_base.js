@@ -34,11 +34,3 @@ function getCookie(name){
     // return null if not found
     return null;
 }
-var cart = JSON.parse(getCookie('cart'));
-
-if(cart == undefined){
-    cart = {}
-    console.log('Cart was created!')
-    document.cookie = 'cart=' + JSON.stringify(cart) + ";domain=;path=/"
-}
-console.log('Cart:', cart)
\ No newline at end of file
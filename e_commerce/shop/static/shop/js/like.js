@@ -1,11 +1,10 @@
-var likeBtn = document.getElementsByClassName('like-button')
-
 if(user != 'AnonymousUser'){
-for (let i = 0; i < likeBtn.length; i++){
-    likeBtn[i].addEventListener('click', function(){
-        addLike(this.dataset.review, this.dataset.author, this.dataset.like)
+    document.addEventListener('click', function(event){
+        var button = event.target.closest('.like-button')
+        if (button){
+            addLike(button.dataset.review, button.dataset.author, button.dataset.like)
+        }
     })
-    }
 }
 
 function addLike(review, author, like){
@@ -27,4 +26,4 @@ function addLike(review, author, like){
     .then((data) => {
         reload()
     })
-}
\ No newline at end of file
+}
@@ -0,0 +1,17 @@
+var pageCacheScript = document.getElementById('page-cache-script')
+
+if (pageCacheScript){
+    fetch(pageCacheScript.dataset.url, {credentials: 'same-origin'})
+        .then(function(response){
+            return response.json()
+        })
+        .then(function(data){
+            csrftoken = data.csrfToken
+            document.querySelectorAll('input[name="csrfmiddlewaretoken"]').forEach(function(input){
+                input.value = data.csrfToken
+            })
+            document.querySelectorAll('.cart-basket-item').forEach(function(item){
+                item.textContent = data.cartItem
+            })
+        })
+}
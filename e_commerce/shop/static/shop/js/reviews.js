@@ -0,0 +1,20 @@
+document.addEventListener('click', function(event){
+    var button = event.target.closest('.more-reviews-button')
+    if (!button || button.disabled){
+        return
+    }
+    button.disabled = true
+    fetch(button.dataset.url, {credentials: 'same-origin'})
+        .then(function(response){
+            return response.json()
+        })
+        .then(function(data){
+            button.previousElementSibling.insertAdjacentHTML('beforeend', data.html)
+            if (data.next){
+                button.dataset.url = data.next
+                button.disabled = false
+            } else {
+                button.remove()
+            }
+        })
+})
@@ -1,6 +1,8 @@
 import re
 
 from django import template
+from shop.ratings import get_product_eval
+from shop.search import highlight_snippet
 
 register = template.Library()
 
@@ -13,3 +15,13 @@ def hide_brackets(value):
 @register.filter(name="get_range")
 def get_range(value):
     return range(value)
+
+
+@register.filter(name="highlight")
+def highlight(value):
+    return highlight_snippet(value)
+
+
+@register.filter(name="product_eval")
+def product_eval(card):
+    return get_product_eval(card.grade_sum, card.review_count)
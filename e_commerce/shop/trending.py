@@ -0,0 +1,130 @@
+import datetime
+import math
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+
+from .autocomplete import autocomplete_index
+from .models import OrderItem, ProductActivity, ProductCard
+
+TRENDING_EPOCH = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def get_trending_settings() -> Tuple[float, float, float]:
+    """
+    Returns score half-life in seconds, weight of one view and weight
+    of one sold item.
+    """
+    return (
+        getattr(settings, "SHOP_TRENDING_HALF_LIFE_HOURS", 48) * 60 * 60,
+        getattr(settings, "SHOP_TRENDING_VIEW_WEIGHT", 1),
+        getattr(settings, "SHOP_TRENDING_SALE_WEIGHT", 10),
+    )
+
+
+def add_log2(first: float, second: float) -> float:
+    """
+    Returns log2(2 ** first + 2 ** second) without overflow.
+    """
+    high, low = max(first, second), min(first, second)
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def get_event_score(
+    moment: datetime.datetime, views: int, sales: int
+) -> Optional[float]:
+    """
+    Returns log2 of activity weight grown by 2 every half-life since
+    TRENDING_EPOCH. Adding such scores instead of decaying old ones
+    keeps order of products equal to the order by decayed weight.
+    """
+    half_life, view_weight, sale_weight = get_trending_settings()
+    weight = views * view_weight + sales * sale_weight
+    if weight <= 0:
+        return None
+    return math.log2(weight) + (moment - TRENDING_EPOCH).total_seconds() / half_life
+
+
+def record_activity(
+    moment: datetime.datetime,
+    views: Optional[Dict[int, int]] = None,
+    sales: Optional[Dict[int, int]] = None,
+) -> None:
+    """
+    Queues views and sold quantities of products for the next
+    update_trending_scores().
+    """
+    views, sales = views or {}, sales or {}
+    ProductActivity.objects.bulk_create(
+        [
+            ProductActivity(
+                product_id=product_id,
+                views=views.get(product_id, 0),
+                sales=sales.get(product_id, 0),
+                created_at=moment,
+            )
+            for product_id in {*views, *sales}
+        ]
+    )
+
+
+def record_order_sales(order_id: int, moment: datetime.datetime) -> None:
+    sales: Dict[int, int] = {}
+    for product_id, quantity in OrderItem.objects.filter(
+        order_id=order_id, product__isnull=False, quantity__gt=0
+    ).values_list("product_id", "quantity"):
+        sales[product_id] = sales.get(product_id, 0) + quantity
+    record_activity(moment, sales=sales)
+
+
+def apply_scores(scores: Dict[int, float]) -> None:
+    cards = list(ProductCard.objects.filter(pk__in=list(scores)).only("trending_score"))
+    for card in cards:
+        card.trending_score = add_log2(card.trending_score, scores[card.pk])
+    ProductCard.objects.bulk_update(cards, ["trending_score"])
+
+
+def get_scores(
+    rows: Iterable[Tuple[int, datetime.datetime, int, int]]
+) -> Dict[int, float]:
+    scores: Dict[int, float] = {}
+    for product_id, moment, views, sales in rows:
+        score = get_event_score(moment, views, sales)
+        if score is None:
+            continue
+        current = scores.get(product_id)
+        scores[product_id] = score if current is None else add_log2(current, score)
+    return scores
+
+
+def update_trending_scores(batch_size: int = 1000) -> int:
+    """
+    Adds queued activity to trending scores of product cards and removes
+    it from the queue. Only cards with new activity are updated, and
+    autocomplete popularity is refreshed after them. Returns number of
+    processed activity rows. Runs must not overlap.
+    """
+    last = ProductActivity.objects.aggregate(last=Max("pk"))["last"]
+    if last is None:
+        return 0
+    processed, start = 0, 0
+    while start < last:
+        with transaction.atomic():
+            rows = list(
+                ProductActivity.objects.filter(pk__gt=start, pk__lte=last)
+                .order_by("pk")
+                .values_list("pk", "product_id", "created_at", "views", "sales")[
+                    :batch_size
+                ]
+            )
+            if not rows:
+                break
+            apply_scores(get_scores(row[1:] for row in rows))
+            start = rows[-1][0]
+            ProductActivity.objects.filter(pk__lte=start).delete()
+        processed += len(rows)
+    if processed:
+        autocomplete_index.record_refresh()
+    return processed
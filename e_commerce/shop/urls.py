@@ -47,16 +47,36 @@ urlpatterns = [
         name="super_category",
     ),
     path("search/", SearchResultView.as_view(), name="search_results"),
-    path("about", AboutView.as_view(), name="about"),
-    path("terms/", TermsView.as_view(), name="terms"),
-    path("contacts/", ContactView.as_view(), name="contacts"),
-    path("help/", HelpView.as_view(), name="help"),
-    path("delivery/", DeliveryView.as_view(), name="delivery"),
-    path("credit/", CreditView.as_view(), name="credit"),
-    path("return-products/", ReturnProductsView.as_view(), name="return_products"),
-    path("service-centers/", ServiceCentersView.as_view(), name="service_centers"),
-    path("for-partners/", ForPartnersView.as_view(), name="for_partners"),
+    path("autocomplete/", autocomplete, name="autocomplete"),
+    path("user-fragment/", user_fragment, name="user_fragment"),
+    path("auth-modals/", auth_modals, name="auth_modals"),
+    path("about", PageDataView.as_view(page_name="about"), name="about"),
+    path("terms/", PageDataView.as_view(page_name="terms"), name="terms"),
+    path("contacts/", PageDataView.as_view(page_name="contact"), name="contacts"),
+    path("help/", PageDataView.as_view(page_name="help"), name="help"),
+    path("delivery/", PageDataView.as_view(page_name="delivery"), name="delivery"),
+    path("credit/", PageDataView.as_view(page_name="credit"), name="credit"),
+    path(
+        "return-products/",
+        PageDataView.as_view(page_name="return"),
+        name="return_products",
+    ),
+    path(
+        "service-centers/",
+        PageDataView.as_view(page_name="service"),
+        name="service_centers",
+    ),
+    path(
+        "for-partners/",
+        PageDataView.as_view(page_name="partners"),
+        name="for_partners",
+    ),
     path("product/<slug:product_slug>/", ProductView.as_view(), name="product"),
+    path(
+        "product/<slug:product_slug>/reviews/",
+        product_reviews,
+        name="product_reviews",
+    ),
     path(
         "product-form/<slug:product_slug>/",
         ReviewFormView.as_view(),
@@ -1,32 +1,22 @@
-import json
-import math
-from types import SimpleNamespace
+from decimal import Decimal
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 from django.conf.global_settings import AUTH_USER_MODEL
 from django.contrib.auth.backends import ModelBackend, UserModel
-from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.models import AnonymousUser, User
-from django.core.cache import cache
 from django.core.exceptions import MultipleObjectsReturned, ObjectDoesNotExist
-from django.db.models import F, Q, QuerySet
-from django.http import HttpRequest, HttpResponseRedirect, JsonResponse, QueryDict
+from django.db.models import Q, QuerySet
+from django.http import HttpRequest, HttpResponseRedirect, JsonResponse
 from django.utils.translation import gettext_lazy as _
 
-from .forms import CheckoutForm, CustomUserCreationForm
-from .models import (
-    Buyer,
-    Category,
-    Like,
-    Order,
-    OrderItem,
-    Product,
-    ProductImage,
-    Review,
-    Sale,
-    Stock,
-)
-from .querysets import querysets
+from .cart import get_cart, move_anonymous_cart
+from .facets import Facets, get_bucket_label
+from .forms import CheckoutForm
+from .likes import add_vote
+from .models import Buyer, Category, Order, OrderItem, Product, Sale, Stock
+from .navigation import NavigationTree, get_navigation_tree
+from .page_cache import CSRF_PLACEHOLDER
+from .pricing import CartLine, price_cart, price_lines
 
 
 class EmailBackend(ModelBackend):
@@ -68,52 +58,31 @@ class EmailBackend(ModelBackend):
 class DataMixin:
     def get_user_context(self, **kwargs: Any) -> Dict:
         """
-        Method for obtaining lists of super_categories and categories,
-        putting them in context dictionary and file cash.
-        Additionally puts user_creation_form, user_login_form in context dictionary
-        to make it accessible from every view using DataMixin.
-        Also puts in context dictionary cartItem data received
-        from request cookies.
+        Method for obtaining lists of super_categories and categories
+        from the navigation tree, putting them in context dictionary.
+        Also puts in context dictionary cartItem data of the request
+        cart, except pages cached for all anonymous users.
+        Login and registration modals are loaded by auth_modals view.
         """
         context = kwargs
-        context["user_creation_form"] = CustomUserCreationForm(auto_id=False)
-        context["user_login_form"] = AuthenticationForm(auto_id=False)
-        context["cartItem"] = get_cart_item_quantity(
-            json.loads(self.request.COOKIES.get("cart", "{}"))
-        )
-        super_categories = cache.get("super_categories")
-        category_list = cache.get("category_list")
-        if not super_categories:
-            super_categories = querysets.get_super_category_queryset_for_data_mixin()
-            cache.set("super_categories", super_categories, 1000)
-        if not category_list:
-            category_list = querysets.get_category_queryset_for_data_mixin()
-            cache.set("category_list", category_list, 1000)
-        context["super_categories"] = super_categories
-        context["category_list"] = category_list
+        if getattr(self.request, "page_cache", False):
+            context["page_cache"] = True
+            context["cartItem"] = ""
+            context["csrf_token"] = CSRF_PLACEHOLDER
+        else:
+            context["cartItem"] = get_cart(self.request).total_quantity
+        navigation = get_navigation_tree()
+        context["navigation"] = navigation
+        context["super_categories"] = navigation.super_categories
+        context["category_list"] = navigation.categories
         return context
 
 
-class NestedNamespace(SimpleNamespace):
-    """
-    Creates a dictionary like object with dot notation.
-    Nested construction can be accessed via dot notation too.
-    """
-
-    def __init__(self, dictionary, **kwargs):
-        super().__init__(**kwargs)
-        for key, value in dictionary.items():
-            if isinstance(value, dict):
-                self.__setattr__(key, NestedNamespace(value))
-            else:
-                self.__setattr__(key, value)
-
-
 def check_quantity_in_stock(
-    items: List[NestedNamespace],
-) -> Tuple[str, List[NestedNamespace]]:
+    items: List[CartLine],
+) -> Tuple[str, List[CartLine]]:
     """
-    Takes as an argument list of NestedNamespace objects, checks quantity of
+    Takes as an argument list of cart lines, checks quantity of
     products, which is mentioned in items, in stock, and if there is no such
     amount, decreases appropriate item quantity, adding special message to mention
     about it. If everything ok, the message is empty.
@@ -168,144 +137,44 @@ def decreasing_stock_items(items: List[OrderItem]) -> None:
             item.product.save()
 
 
-def create_item(
-    product: Product,
-    image: Optional[ProductImage],
-    cart: Dict[Union[int, str], Dict[str, int]],
-    index: str,
-) -> NestedNamespace:
-    """
-    Returns created NestedNamespace object with appropriate characteristics.
-    """
-    return NestedNamespace(
-        {
-            "product": {
-                "id": product.pk,
-                "name": product.name,
-                "price": product.price,
-                "productimage": {"image": image},
-            },
-            "quantity": cart[index]["quantity"],
-            "get_total": cart[index]["quantity"] * product.price,
-        }
-    )
-
-
-def define_cart_from_cookies(request: HttpRequest) -> Dict[int, Dict[str, int]]:
-    """
-    Defines cart from request cookies returning empty dictionary in case of
-    its absence and returns it.
-    """
-    try:
-        cart = json.loads(request.COOKIES["cart"].replace("'", '''"'''))
-    except KeyError:
-        cart = {}
-    return cart
-
-
 def get_cookies_cart(
     request: HttpRequest,
-) -> Tuple[List[NestedNamespace], Dict[str, int], int]:
+) -> Tuple[List[CartLine], Dict[str, Decimal], int]:
     """
-    Creates cart dictionary from request cookies, creates cart items number,
-    creates items list with NestedNamespace objects in it. The constructions
-    are used for cart templates info transfer.
+    Prices cart of the request with one query, returns cart lines,
+    order totals and cart items number used for cart templates info
+    transfer.
     """
-    cart = define_cart_from_cookies(request)
-    items, order = [], {"get_order_total": 0, "get_order_items": 0}
-    cartItems = order["get_order_items"]
-    products = Product.objects.filter(id__in=cart.keys()).prefetch_related(
-        "productimage_set"
-    )
-    for product in products:
-        try:
-            i = str(product.id)
-            cartItems += cart[i]["quantity"]
-            total = product.price * cart[i]["quantity"]
-            order["get_order_total"] += total
-            order["get_order_items"] += cart[i]["quantity"]
-            try:
-                image = product.productimage_set.first()
-            except (AttributeError, IndexError):
-                image = None
-            items.append(create_item(product, image, cart, i))
-        except ObjectDoesNotExist:
-            pass
-    return items, order, cartItems
+    priced = price_cart(get_cart(request))
+    order = {
+        "get_order_total": priced.total,
+        "get_order_items": priced.total_quantity,
+    }
+    return priced.lines, order, priced.total_quantity
 
 
 def correct_cart_order(
-    items: List[NestedNamespace],
-) -> Tuple[Dict[int, Dict[str, int]], Dict[str, int]]:
+    items: List[CartLine],
+) -> Tuple[Dict[int, Dict[str, int]], Dict[str, Decimal]]:
     """
-    Takes NestedNamespace objects list as argument
-    and corrects cart and order data.
+    Takes cart lines as argument and corrects cart and order data.
     """
-    cart, number, total, order = {}, 0, 0, {}
-    for item in items:
-        if item.quantity:
-            number += item.quantity
-            item.get_total = item.quantity * item.product.price
-            total += item.get_total
-            cart[item.product.id] = {"quantity": item.quantity}
-    order["get_order_items"] = number
-    order["get_order_total"] = total
+    priced = price_lines(items)
+    cart = {
+        item.product.id: {"quantity": item.quantity} for item in items if item.quantity
+    }
+    order = {
+        "get_order_items": priced.total_quantity,
+        "get_order_total": priced.total,
+    }
     return cart, order
 
 
-def handling_brand_price_form(
-    data: QueryDict, product_list: List[Tuple[Product, str]]
-) -> List[Tuple[Product, str]]:
-    """
-    Creates filter logic. Filter uses brand and prise as parameters
-    for filtering output product list.
-    """
-    filtered_brand_set = {}
-    if data:
-        filtered_brand_set = set(data.getlist("brand"))
-        low = int(data["low"]) if data.get("low") else 0
-        high = int(data["high"]) if data.get("high") else 100000000
-        product_list = list(filter(lambda x: (low <= x[0].price <= high), product_list))
-        if filtered_brand_set:
-            product_list = list(
-                filter(
-                    lambda x: (str(x[0].brand.name) in filtered_brand_set), product_list
-                )
-            )
-    return product_list
-
-
-def get_product_list(products: QuerySet) -> List[Tuple[Product, str]]:
-    """
-    Creates list of tuple with product and images objects.
-    """
-    product_list = []
-    for product in products:
-        image = product.productimage_set.first()
-        image = None if not image else image.image
-        product_list.append((product, image))
-    return product_list
-
-
-def get_cart_item_quantity(data: Dict[int, Dict[str, int]]) -> int:
-    """
-    Gets quantity of elements in items.
-    """
-    quantity = 0
-    for item in data.values():
-        quantity += int(list(item.values())[0])
-    return quantity
-
-
-def create_cookie_cart(items: QuerySet) -> Dict[int, Dict[str, int]]:
+def get_cart_quantities(items: List[CartLine]) -> Dict[int, int]:
     """
-    Creates cart for coolies from QuerySet objects list.
+    Returns quantities of products in items list.
     """
-    cart = {}
-    for item in items:
-        if item.quantity:
-            cart[item.product.id] = {"quantity": item.quantity}
-    return cart
+    return {item.product.id: item.quantity for item in items}
 
 
 def cart_authorization_handler(
@@ -314,54 +183,22 @@ def cart_authorization_handler(
     user: AUTH_USER_MODEL,
 ) -> HttpResponseRedirect:
     """
-    Gets cart data from cookies, checks if authenticated buyer has
-    not completed order, deletes this order and its data,
-    creates new order using cookies cart data.
+    Makes cart of anonymous request the cart of the logged in user,
+    replacing items of not completed order of the buyer.
     If cart is empty, return flag in cookies with 1 sec lifetime.
     """
-    cart = request.COOKIES.get("cart")
-    cookie_cart = json.loads(cart) if cart else None
-    if cookie_cart:
-        buyer, created = Buyer.objects.get_or_create(user=user)
-        order, created = Order.objects.get_or_create(buyer=buyer, complete=False)
-        if not created:
-            items = OrderItem.objects.filter(order=order)
-            for item in items:
-                item.delete()
-        for key, value in cookie_cart.items():
-            OrderItem.objects.create(
-                product=Product.objects.get(id=int(key)),
-                order=order,
-                quantity=int(value.get("quantity")),
-            )
-    else:
+    if not move_anonymous_cart(request, user.pk):
         response.set_cookie("flag", "1", max_age=1)
     return response
 
 
-def define_cart(
-    flag: Union[bool, str], user: Union[AUTH_USER_MODEL, AnonymousUser]
-) -> Dict[int, Dict[str, int]]:
-    """
-    If cookies cart is empty after login buyer creates cart from existing
-    order data. It uses flag var from cookies. With empty flag returns
-    empty cart.
-    """
-    cart = {}
-    if flag and not isinstance(user, AnonymousUser):
-        order = Order.objects.filter(buyer__user=user).last()
-        if order and not order.complete:
-            items = OrderItem.objects.filter(order=order)
-            cart = create_cookie_cart(items)
-    return cart
-
-
 def define_page_range(context: Dict) -> Optional[Dict]:
     """
-    Define page range from paginator in context data.
+    Define page range from paginator in context data. Keyset paginated
+    pages have no page numbers, so there is no range for them.
     """
     page_range = None
-    if context["is_paginated"]:
+    if context["is_paginated"] and not getattr(context["page_obj"], "is_keyset", False):
         page_range = context["paginator"].get_elided_page_range(
             context["page_obj"].number, on_each_side=1, on_ends=1
         )
@@ -421,84 +258,73 @@ def define_buyer_data(
 
 
 def define_category_with_super_category(
-    categories: QuerySet, sc_id: int
-) -> List[Category]:
+    navigation: NavigationTree, sc_id: int
+) -> Tuple[Category, ...]:
     """
     Defines category list for given super category id.
     """
-    category_list = []
-    for category in categories:
-        if category.super_category.id == sc_id:
-            category_list.append(category)
-    return category_list
+    return navigation.get_categories(sc_id)
 
 
-def define_category_list(slug: str, categories: QuerySet) -> List[Category]:
+def define_category_list(slug: str, navigation: NavigationTree) -> Tuple[Category, ...]:
     """
-    Finds out super category id and defines category list
-    for this id.
+    Defines category list of the super category of category
+    with given slug.
     """
-    super_category_id = None
-    for category in categories:
-        if category.slug == slug:
-            super_category_id = category.super_category.id
-            break
-    return define_category_with_super_category(categories, super_category_id)
+    return navigation.get_siblings(slug)
 
 
-def define_brand_list(products: QuerySet) -> List[Tuple[str, str]]:
+def define_brand_choices(facets: Facets) -> List[Tuple[str, str]]:
     """
-    Defines unique tuple list with double brand name for
-    products in given queryset.
+    Defines brand filter choices labeled with product counts.
     """
-    return list({(product.brand.name, product.brand.name) for product in products})
+    return [(brand, f"{brand} ({count})") for brand, count in facets.brands]
 
 
-def define_category_title_product_list(
-    products: QuerySet, slug: str, categories: QuerySet
-) -> Tuple[Category, str, List[Tuple[Product, str]]]:
+def define_price_choices(facets: Facets) -> List[Tuple[str, str]]:
     """
-    Defines category, title name and product list from given data.
+    Defines price bucket filter choices labeled with product counts.
     """
-    try:
-        category = products[0].category if products else categories.get(slug=slug)
-        product_list, title = get_product_list(products), category.name
-    except ObjectDoesNotExist:
-        category, title, product_list = categories[0], categories[0].name, []
-    return category, title, product_list
+    return [
+        (str(bucket), f"{get_bucket_label(bucket)} ({count})")
+        for bucket, count in facets.prices
+    ]
 
 
-def define_product_eval(product_review: QuerySet) -> Union[str, int]:
+def define_feature_choices(facets: Facets) -> List[Tuple[int, str, List]]:
     """
-    Calculates product evaluation.
+    Defines feature filter choices labeled with product counts.
     """
-    product_eval = 0
-    for review in product_review:
-        product_eval += review.grade
-    product_eval = (
-        str(int(math.ceil(2 * product_eval / product_review.count())))
-        if product_review.count()
-        else 0
-    )
-    return product_eval
+    return [
+        (feature_id, name, [(value, f"{value} ({count})") for value, count in values])
+        for feature_id, name, values in facets.features
+    ]
+
+
+def define_category_title_product_list(
+    products: QuerySet, slug: str, navigation: NavigationTree
+) -> Tuple[Category, str, QuerySet]:
+    """
+    Defines category, title name and not evaluated product card queryset
+    from given data.
+    """
+    category = navigation.get_category(slug)
+    if category:
+        product_list, title = products, category.name
+    else:
+        category = navigation.categories[0]
+        title, product_list = category.name, products.none()
+    return category, title, product_list
 
 
 def modify_like_with_response(
-    review: Review, author: User, like: bool, dislike: bool
+    review_id: int, author_id: int, like: bool, dislike: bool
 ) -> JsonResponse:
     """
-    Creates Like objects if not exists, modifies and saves like
-    data. If Like objects exists for this author, nothing happens.
+    Adds like or dislike of the author to the review. If the author
+    has already voted for this review, nothing happens.
     """
-    if not Like.objects.filter(review=review, like_author=author).count():
-        Like.objects.create(
-            review=review, like_author=author, like=like, dislike=dislike
-        )
-        if like:
-            review.like_num = F("like_num") + 1 if review.like_num else 1
-        else:
-            review.dislike_num = F("dislike_num") + 1 if review.dislike_num else 1
-        review.save()
+    if add_vote(review_id, author_id, like):
         return JsonResponse("Like was added", safe=False)
     return JsonResponse("Like was not added", safe=False)
 
@@ -516,26 +342,6 @@ def check_buyer_existence(user: AUTH_USER_MODEL) -> Optional[Buyer]:
     return buyer
 
 
-def perform_orderItem_actions(product_id: int, action: str, buyer: Buyer) -> None:
-    """
-    Modifies order items data in dependence from command.
-    """
-    product = Product.objects.get(id=product_id)
-    if not product.sold:
-        order, created = Order.objects.get_or_create(buyer=buyer, complete=False)
-        orderItem, created = OrderItem.objects.get_or_create(
-            order=order, product=product
-        )
-        if action == "add":
-            orderItem.quantity = F("quantity") + 1
-        elif action == "remove":
-            orderItem.quantity = F("quantity") - 1
-        orderItem.save()
-        orderItem.refresh_from_db()
-        if orderItem.quantity <= 0:
-            orderItem.delete()
-
-
 def get_order_with_cleaning(user: AUTH_USER_MODEL) -> Order:
     """
     Gets or creates order. If order was got and not completed,
@@ -578,9 +384,9 @@ def get_order(user: Union[AUTH_USER_MODEL, AnonymousUser], data: Dict) -> Order:
     return Order.objects.create(buyer=buyer, complete=True)
 
 
-def get_order_items_list(items: List[NestedNamespace], order: Order) -> List[OrderItem]:
+def get_order_items_list(items: List[CartLine], order: Order) -> List[OrderItem]:
     """
-    Creates order items list from NestedNamespace objects
+    Creates order items list from cart lines
     list for specific order.
     """
     order_item_list = []
@@ -617,7 +423,7 @@ def get_checkout_form(user: Union[AUTH_USER_MODEL, AnonymousUser]) -> CheckoutFo
 def get_response_dict_with_sale_creation(
     form: CheckoutForm,
     user: Union[AUTH_USER_MODEL, AnonymousUser],
-    items: List[NestedNamespace],
+    items: List[CartLine],
 ) -> Dict[str, Union[str, List, Dict[str, int]]]:
     """
     Creates response dict with Sale creation after
@@ -639,14 +445,13 @@ def get_response_dict_with_sale_creation(
         "order": {"get_order_total": 0, "get_order_items": 0},
         "message": message,
         "warning": warning,
-        "cartJson": json.dumps({}),
     }
 
 
 def get_updated_response_dict(
     context: Dict,
     message: Optional[str],
-    items: List[NestedNamespace],
+    items: List[CartLine],
     checkout_form: CheckoutForm,
 ) -> Dict:
     """
@@ -655,12 +460,11 @@ def get_updated_response_dict(
     updates cart in accordance with available amount of
     products.
     """
-    cart, order = correct_cart_order(items)
+    _, order = correct_cart_order(items)
     context.update(
         {
             "checkout_form": checkout_form,
             "message": message,
-            "cartJson": json.dumps(cart),
             "order": order,
         }
     )
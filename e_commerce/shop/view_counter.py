@@ -0,0 +1,165 @@
+import atexit
+import datetime
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Dict, Tuple
+
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, transaction
+from django.db.models import Case, DateTimeField, F, IntegerField, Value, When
+from django.utils import timezone
+
+from .models import Product, ProductCard, ProductViewSpill
+from .trending import record_activity
+
+logger = logging.getLogger(__name__)
+
+
+def get_counter_settings() -> Tuple[float, int]:
+    """
+    Returns seconds between flushes and number of buffered products
+    which makes flush due earlier.
+    """
+    return (
+        getattr(settings, "SHOP_VIEW_FLUSH_INTERVAL", 10),
+        getattr(settings, "SHOP_VIEW_FLUSH_SIZE", 1000),
+    )
+
+
+def take_spills(deltas: Counter, accessed: Dict[int, datetime.datetime]) -> None:
+    """
+    Adds spilled views to deltas and deletes them. Runs in the
+    transaction which writes the views, so spills are applied once.
+    """
+    spills = ProductViewSpill.objects.select_for_update().values_list(
+        "pk", "product", "views", "last_access_at"
+    )
+    spill_ids = []
+    for pk, product_id, views, moment in spills:
+        spill_ids.append(pk)
+        deltas[product_id] += views
+        accessed[product_id] = max(moment, accessed.get(product_id, moment))
+    if spill_ids:
+        ProductViewSpill.objects.filter(pk__in=spill_ids).delete()
+
+
+def write_views(deltas: Counter, accessed: Dict[int, datetime.datetime]) -> int:
+    """
+    Adds view deltas and spilled views to products and their cards, one
+    UPDATE per table, and queues them for trending scores. Views of
+    products deleted since they were recorded are dropped. Returns
+    number of updated products.
+    """
+    deltas, accessed = Counter(deltas), dict(accessed)
+    with transaction.atomic():
+        take_spills(deltas, accessed)
+        existing = set(
+            Product.objects.filter(pk__in=list(deltas)).values_list("pk", flat=True)
+        )
+        deltas = Counter({pk: deltas[pk] for pk in deltas if pk in existing})
+        accessed = {pk: accessed[pk] for pk in deltas}
+        if not deltas:
+            return 0
+        number = Case(
+            *(When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+        last_access_at = Case(
+            *(When(pk=pk, then=Value(moment)) for pk, moment in accessed.items()),
+            output_field=DateTimeField(),
+        )
+        Product.objects.filter(pk__in=list(deltas)).update(
+            access_number=F("access_number") + number, last_access_at=last_access_at
+        )
+        ProductCard.objects.filter(pk__in=list(deltas)).update(
+            access_number=F("access_number") + number
+        )
+        record_activity(max(accessed.values()), views=deltas)
+    return len(deltas)
+
+
+class ViewCounter:
+    """
+    Process buffer of product page views. Recording a view only touches
+    a dict under lock; buffered views are written by flush() with bulk
+    UPDATE statements. Views which could not be written are kept in the
+    buffer, or spilled to ProductViewSpill rows when the process exits,
+    and picked up by the next flush of any process.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.deltas: Counter = Counter()
+        self.accessed: Dict[int, datetime.datetime] = {}
+        self.flushed_at = time.monotonic()
+
+    def record(self, product_id: int) -> None:
+        now = timezone.now()
+        with self.lock:
+            self.deltas[product_id] += 1
+            self.accessed[product_id] = now
+
+    def is_due(self) -> bool:
+        interval, size = get_counter_settings()
+        return bool(self.deltas) and (
+            len(self.deltas) >= size or time.monotonic() - self.flushed_at >= interval
+        )
+
+    def take(self) -> Tuple[Counter, Dict[int, datetime.datetime]]:
+        with self.lock:
+            deltas, accessed = self.deltas, self.accessed
+            self.deltas, self.accessed = Counter(), {}
+            self.flushed_at = time.monotonic()
+        return deltas, accessed
+
+    def merge(self, deltas: Counter, accessed: Dict[int, datetime.datetime]) -> None:
+        with self.lock:
+            self.deltas.update(deltas)
+            for pk, moment in accessed.items():
+                self.accessed[pk] = max(moment, self.accessed.get(pk, moment))
+
+    def flush(self) -> int:
+        """
+        Writes buffered and spilled views, returns number of updated
+        products. Keeps views in the buffer if database is unavailable,
+        drops them if they can not be written at all.
+        """
+        deltas, accessed = self.take()
+        try:
+            return write_views(deltas, accessed)
+        except IntegrityError:
+            logger.exception("Dropped views of %d products", len(deltas))
+            return 0
+        except DatabaseError:
+            self.merge(deltas, accessed)
+            raise
+
+    def spill(self) -> None:
+        """
+        Flushes the buffer on process exit, stores views as spill rows
+        if the update failed. Views recorded since the last flush are
+        lost if the process is killed, at most SHOP_VIEW_FLUSH_INTERVAL
+        seconds of them.
+        """
+        if not self.deltas:
+            return
+        try:
+            self.flush()
+        except DatabaseError:
+            deltas, accessed = self.take()
+            try:
+                ProductViewSpill.objects.bulk_create(
+                    ProductViewSpill(
+                        product_id=pk, views=views, last_access_at=accessed[pk]
+                    )
+                    for pk, views in deltas.items()
+                )
+            except DatabaseError:
+                logger.exception("Lost views of %d products", len(deltas))
+
+
+view_counter = ViewCounter()
+atexit.register(view_counter.spill)
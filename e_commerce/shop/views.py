@@ -1,12 +1,11 @@
-import datetime
 import json
 from abc import ABC
 from typing import Any, Dict, List, Optional, Union
 
+from django.conf import settings
 from django.contrib.auth import login
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.mixins import UserPassesTestMixin
-from django.contrib.auth.models import User
 from django.contrib.auth.views import (
     LoginView,
     PasswordChangeView,
@@ -15,16 +14,19 @@ from django.contrib.auth.views import (
     PasswordResetDoneView,
     PasswordResetView,
 )
-from django.db.models import F, QuerySet
+from django.db.models import QuerySet
 from django.http import (
+    Http404,
     HttpRequest,
     HttpResponse,
     HttpResponseNotFound,
     HttpResponseRedirect,
     JsonResponse,
 )
+from django.middleware.csrf import get_token
+from django.template.loader import render_to_string
 from django.urls import reverse, reverse_lazy
-from django.utils import timezone
+from django.views.decorators.cache import cache_control, never_cache
 from django.views.generic import (
     CreateView,
     DetailView,
@@ -33,16 +35,45 @@ from django.views.generic import (
     TemplateView,
 )
 
+from .autocomplete import autocomplete_index
+from .cart import forget_anonymous_cart, forget_buyer_cart, get_cart, save_cart
+from .conditional import (
+    HOME_STAMP,
+    NAVIGATION_STAMP,
+    PAGES_STAMP,
+    ConditionalGetMixin,
+    Stamp,
+    get_category_stamp_name,
+    get_stamps,
+    record_page_stamps,
+)
+from .facets import get_facets, get_filter_state
 from .forms import (
     BrandFilterForm,
     BuyerAccountForm,
     CheckoutForm,
     CustomUserCreationForm,
+    FeatureFilterForm,
     PriceFilterForm,
     ReviewForm,
 )
-from .models import Buyer, Category, PageData, Product, Review
+from .fuzzy import get_did_you_mean
+from .likes import get_user_votes
+from .models import Buyer, Category, Product, ProductCard
+from .pages import (
+    STATIC_PAGES,
+    get_auth_modals,
+    get_static_pages_dir,
+    is_anonymous,
+    page_registry,
+    publish_static_page,
+    read_static_page,
+)
+from .pagination import InvalidCursor, KeysetPaginationMixin
+from .product_bundle import get_product_bundle, get_product_stamp_name
 from .querysets import querysets
+from .reviews import get_review_page, get_reviews_url
+from .search import get_search_backend
 from .utils import (
     DataMixin,
     cart_authorization_handler,
@@ -50,53 +81,55 @@ from .utils import (
     check_quantity_in_stock,
     clear_not_completed_order,
     correct_cart_order,
-    define_brand_list,
+    define_brand_choices,
     define_buyer_data,
-    define_cart,
     define_category_list,
     define_category_title_product_list,
     define_category_with_super_category,
+    define_feature_choices,
     define_order_list,
     define_page_range,
-    define_product_eval,
+    define_price_choices,
+    get_cart_quantities,
     get_checkout_form,
     get_cookies_cart,
-    get_product_list,
     get_response_dict_with_sale_creation,
     get_updated_response_dict,
-    handling_brand_price_form,
     modify_like_with_response,
-    perform_orderItem_actions,
 )
+from .view_counter import view_counter
 
 
 def page_not_found(request, exception):
     return HttpResponseNotFound("<h1>Page not found</h1>")
 
 
-class ShopHome(DataMixin, ListView):
+class ShopHome(DataMixin, KeysetPaginationMixin, ListView):
     paginate_by = 20
     template_name = "a_shop/home.html"
     context_object_name = "products"
+    keyset_ordering = ("-trending_score", "-pk")
+    stamp_names = (HOME_STAMP, NAVIGATION_STAMP, PAGES_STAMP)
 
-    def get_queryset(self) -> List:
-        return get_product_list(querysets.get_product_queryset_for_shop_home_view())
+    def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        record_page_stamps(request, self.stamp_names, get_stamps(*self.stamp_names))
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self) -> QuerySet:
+        limit = None if self.use_keyset_pagination() else 100
+        return querysets.get_product_queryset_for_shop_home_view(limit)
 
     def get_context_data(
         self, *, object_list: Union[QuerySet, List] = None, **kwargs: Any
     ) -> Dict:
         context = super().get_context_data(**kwargs)
         page_range = define_page_range(context)
-        flag = self.request.COOKIES.get("flag")
-        cart = define_cart(flag, self.request.user)
-        page_data = PageData.objects.filter(name="home").first()
+        page_data = page_registry.get("home")
         context.update(
             {
                 **self.get_user_context(title="АМУНІЦІЯ ДЛЯ СВОЇХ"),
                 "page_range": page_range,
                 "super_category_flag": True,
-                "cartJson": json.dumps(cart),
-                "flag": flag,
                 "page_data": page_data,
             }
         )
@@ -147,9 +180,8 @@ class AdminLoginView(DataMixin, LoginView):
         response = super().form_valid(form)
         buyer = check_buyer_existence(user)
         clear_not_completed_order(buyer)
-        cart = json.loads(self.request.COOKIES.get("cart"))
-        if cart:
-            response.delete_cookie("cart")
+        forget_buyer_cart(user.pk)
+        forget_anonymous_cart(self.request, response)
         return response
 
     def get_context_data(self, **kwargs: Any) -> Dict:
@@ -242,7 +274,7 @@ class UserAccount(DataMixin, UserPassesTestMixin, FormView, ABC):
         return super().form_valid(form)
 
 
-class CategoryView(DataMixin, ListView):
+class CategoryView(ConditionalGetMixin, DataMixin, KeysetPaginationMixin, ListView):
     model = Product
     paginate_by = 20
     template_name = "a_shop/category.html"
@@ -252,18 +284,28 @@ class CategoryView(DataMixin, ListView):
         super().__init__(*args, **kwargs)
         self.object_list = None
 
+    def get_stamp_names(self) -> List[str]:
+        return [
+            get_category_stamp_name(self.kwargs["category_slug"]),
+            NAVIGATION_STAMP,
+            PAGES_STAMP,
+        ]
+
     def get_context_data(self, *, object_list: QuerySet = None, **kwargs: Any) -> Dict:
         data_context = self.get_user_context()
-        categories, slug = data_context["category_list"], self.kwargs["category_slug"]
-        page_data = PageData.objects.filter(name="category").first()
-        category_list = define_category_list(slug, data_context["category_list"])
-        products = querysets.get_product_queryset_for_category_view(slug)
-        brands = define_brand_list(products)
-
+        navigation, slug = data_context["navigation"], self.kwargs["category_slug"]
+        page_data = page_registry.get("category")
+        category_list = define_category_list(slug, navigation)
+        facets = get_facets(slug, get_filter_state(self.request.POST))
+        brands = define_brand_choices(facets)
+        prices = define_price_choices(facets)
+        features = define_feature_choices(facets)
+        products = querysets.get_product_queryset_for_category_view(
+            slug, self.request.POST
+        )
         category, title, product_list = define_category_title_product_list(
-            products, slug, categories
+            products, slug, navigation
         )
-        product_list = handling_brand_price_form(self.request.POST, product_list)
 
         context = super().get_context_data(object_list=product_list, **kwargs)
         category_list = (
@@ -273,12 +315,16 @@ class CategoryView(DataMixin, ListView):
         new_context = {
             "title": title,
             "category": category,
+            "category_slug": slug,
             "categories": category_list,
             "category_flag": True,
             "brand_filter_form": BrandFilterForm(brands, auto_id=False),
-            "price_filter_form": PriceFilterForm(auto_id=False),
+            "price_filter_form": PriceFilterForm(buckets=prices, auto_id=False),
+            "feature_filter_form": FeatureFilterForm(features, auto_id=False),
             "page_range": page_range,
             "brands": brands,
+            "prices": prices,
+            "features": features,
             "page_data": page_data,
         }
         context.update({**data_context, **new_context})
@@ -290,37 +336,54 @@ class CategoryView(DataMixin, ListView):
         context["brand_filter_form"] = BrandFilterForm(
             context["brands"], self.request.POST, auto_id=False
         )
-        context["price_filter_form"] = PriceFilterForm(self.request.POST, auto_id=False)
+        context["price_filter_form"] = PriceFilterForm(
+            self.request.POST, buckets=context["prices"], auto_id=False
+        )
+        context["feature_filter_form"] = FeatureFilterForm(
+            context["features"], self.request.POST, auto_id=False
+        )
         return self.render_to_response(context)
 
 
-class ProductView(DataMixin, DetailView):
+class ProductView(ConditionalGetMixin, DataMixin, DetailView):
     model = Product
     slug_url_kwarg = "product_slug"
     template_name = "a_shop/product.html"
     context_object_name = "product"
-    queryset = querysets.get_product_queryset_for_product_view()
+
+    def get_stamps(self) -> List[Stamp]:
+        """
+        Loads product bundle and records product view, which is counted
+        for 304 responses too.
+        """
+        self.bundle = get_product_bundle(self.kwargs[self.slug_url_kwarg])
+        if self.bundle is None:
+            raise Http404("No product found matching the query")
+        view_counter.record(self.bundle.product.pk)
+        return [self.bundle.version, *get_stamps(NAVIGATION_STAMP)]
+
+    def get_stamp_names(self) -> List[str]:
+        return [get_product_stamp_name(self.bundle.product.pk), NAVIGATION_STAMP]
+
+    def get_object(self, queryset: Optional[QuerySet] = None) -> Product:
+        return self.bundle.product
 
     def get_context_data(self, **kwargs: Any) -> Dict:
         context = super().get_context_data(**kwargs)
         product = context["product"]
-        product.last_accessed = datetime.datetime.now(tz=timezone.utc)
-        product.access_number = F("access_number") + 1
-        product.save()
-        title = product.name
-        product_features = querysets.get_product_features_queryset_for_product_view(
-            product=product
-        )
-        product_images = querysets.get_product_image_queryset_for_product_view(product)
-        product_review = querysets.get_review_queryset_for_product_view(product)
-        product_eval = define_product_eval(product_review)
+        self.request.viewed_product_id = product.pk
         new_context = {
-            "product_features": product_features,
-            "product_images": product_images,
-            "product_review": product_review,
-            "title": title,
+            "product_features": self.bundle.features,
+            "product_images": self.bundle.image_urls,
+            "product_review": self.bundle.reviews,
+            "user_votes": get_user_votes(
+                self.request.user.pk, [review.pk for review in self.bundle.reviews]
+            ),
+            "reviews_url": get_reviews_url(product.slug, self.bundle.reviews_cursor),
+            "review_number": self.bundle.review_number,
+            "title": product.name,
             "review_form": ReviewForm,
-            "product_eval": product_eval,
+            "product_eval": self.bundle.product_eval,
             "super_category": product.category.super_category,
         }
         context.update({**self.get_user_context(), **new_context})
@@ -349,24 +412,28 @@ class ReviewFormView(FormView):
 
 def updateLike(request: HttpRequest) -> JsonResponse:
     data = json.loads(request.body)
-    review = Review.objects.get(id=int(data["review"]))
-    author = User.objects.get(id=int(data["author"]))
     like = True if data["like"] == "True" else False
     dislike = False if like else True
-    return modify_like_with_response(review, author, like, dislike)
+    return modify_like_with_response(
+        int(data["review"]), int(data["author"]), like, dislike
+    )
 
 
-class SuperCategoryView(DataMixin, ListView):
+class SuperCategoryView(ConditionalGetMixin, DataMixin, ListView):
     model = Category
     paginate_by = 20
     template_name = "a_shop/super_category.html"
     context_object_name = "categories"
 
+    def get_stamp_names(self) -> List[str]:
+        return [NAVIGATION_STAMP, PAGES_STAMP]
+
     def get_context_data(self, *, object_list: QuerySet = None, **kwargs: Any) -> Dict:
         pk = self.kwargs["super_category_pk"]
         context_data = self.get_user_context()
-        categories = context_data["category_list"]
-        category_list = define_category_with_super_category(categories, pk)
+        category_list = define_category_with_super_category(
+            context_data["navigation"], pk
+        )
         title = (
             "Загальна категорія"
             if not category_list
@@ -374,7 +441,7 @@ class SuperCategoryView(DataMixin, ListView):
         )
         context = super().get_context_data(object_list=category_list, **kwargs)
         page_range = define_page_range(context)
-        page_data = PageData.objects.filter(name="super_category").first()
+        page_data = page_registry.get("super_category")
         new_context = {
             "title": title,
             "super_category_flag": True,
@@ -390,146 +457,144 @@ class SearchResultView(DataMixin, ListView):
     paginate_by = 20
     context_object_name = "products"
 
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.suggestion, self.corrected = None, False
+
     def get_queryset(self) -> QuerySet:
-        if self.request.GET.get("q"):
-            return querysets.get_product_for_search_result_view(self.request.GET.get("q"))
-        return Product.objects.none()
+        if query := self.request.GET.get("q"):
+            products = querysets.get_product_for_search_result_view(query)
+            self.suggestion = get_did_you_mean(query, products)
+            if self.suggestion and not products.exists():
+                self.corrected = True
+                return querysets.get_product_for_search_result_view(self.suggestion)
+            return products
+        return ProductCard.objects.none()
 
     def get_context_data(self, *, object_list: QuerySet = None, **kwargs: Any) -> Dict:
-        object_list = get_product_list(self.get_queryset())
-        context = super().get_context_data(object_list=object_list, **kwargs)
+        context = super().get_context_data(**kwargs)
+        query = self.suggestion if self.corrected else self.request.GET.get("q")
+        get_search_backend().add_snippets(query, context["products"])
         page_range = define_page_range(context)
-        page_data = PageData.objects.filter(name="search").first()
+        page_data = page_registry.get("search")
         context.update(
             {
                 **self.get_user_context(title="Пошук"),
                 "page_range": page_range,
                 "query": self.request.GET.get("q"),
+                "suggestion": self.suggestion,
+                "corrected": self.corrected,
                 "page_data": page_data,
             }
         )
         return context
 
 
-class AboutView(DataMixin, TemplateView):
-    template_name = "a_shop/about.html"
+class PageDataView(DataMixin, TemplateView):
+    """
+    Static page with content of PageData object of page_name. With
+    SHOP_STATIC_PAGES_DIR set, pages are pre-rendered on publish and
+    anonymous requests are served from files.
+    """
 
-    def get_context_data(self, **kwargs: Any) -> Dict:
-        context = super().get_context_data(**kwargs)
-        page_data = PageData.objects.filter(name="about").first()
-        context.update(
-            {**self.get_user_context(title="Про нас"), "page_data": page_data}
-        )
-        return context
-
-
-class TermsView(DataMixin, TemplateView):
     template_name = "a_shop/about.html"
+    page_name = "about"
+
+    def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        cart_items = get_cart(request).total_quantity
+        if html := read_static_page(request, self.page_name, cart_items):
+            return HttpResponse(html)
+        response = super().get(request, *args, **kwargs)
+        if get_static_pages_dir() and is_anonymous(request):
+            publish_static_page(self.page_name)
+        return response
 
     def get_context_data(self, **kwargs: Any) -> Dict:
         context = super().get_context_data(**kwargs)
-        page_data = PageData.objects.filter(name="terms").first()
         context.update(
             {
-                **self.get_user_context(title="Умови використання сайту"),
-                "page_data": page_data,
+                **self.get_user_context(title=STATIC_PAGES[self.page_name]),
+                "page_data": page_registry.get(self.page_name),
             }
         )
         return context
 
 
-class ContactView(DataMixin, TemplateView):
-    template_name = "a_shop/about.html"
-
-    def get_context_data(self, **kwargs: Any) -> Dict:
-        context = super().get_context_data(**kwargs)
-        page_data = PageData.objects.filter(name="contact").first()
-        context.update(
-            {**self.get_user_context(title="Контакти"), "page_data": page_data}
-        )
-        return context
-
-
-class HelpView(DataMixin, TemplateView):
-    template_name = "a_shop/about.html"
-
-    def get_context_data(self, **kwargs: Any) -> Dict:
-        context = super().get_context_data(**kwargs)
-        page_data = PageData.objects.filter(name="help").first()
-        context.update(
-            {**self.get_user_context(title="Допомога"), "page_data": page_data}
-        )
-        return context
-
-
-class DeliveryView(DataMixin, TemplateView):
-    template_name = "a_shop/about.html"
-
-    def get_context_data(self, **kwargs: Any) -> Dict:
-        context = super().get_context_data(**kwargs)
-        page_data = PageData.objects.filter(name="delivery").first()
-        context.update(
-            {**self.get_user_context(title="Доставка"), "page_data": page_data}
-        )
-        return context
-
-
-class CreditView(DataMixin, TemplateView):
-    template_name = "a_shop/about.html"
-
-    def get_context_data(self, **kwargs: Any) -> Dict:
-        context = super().get_context_data(**kwargs)
-        page_data = PageData.objects.filter(name="credit").first()
-        context.update(
-            {**self.get_user_context(title="Кредит"), "page_data": page_data}
-        )
-        return context
-
-
-class ReturnProductsView(DataMixin, TemplateView):
-    template_name = "a_shop/about.html"
-
-    def get_context_data(self, **kwargs: Any) -> Dict:
-        context = super().get_context_data(**kwargs)
-        page_data = PageData.objects.filter(name="return").first()
-        context.update(
-            {**self.get_user_context(title="Повернення товару"), "page_data": page_data}
-        )
-        return context
-
-
-class ServiceCentersView(DataMixin, TemplateView):
-    template_name = "a_shop/about.html"
-
-    def get_context_data(self, **kwargs: Any) -> Dict:
-        context = super().get_context_data(**kwargs)
-        page_data = PageData.objects.filter(name="service").first()
-        context.update(
-            {**self.get_user_context(title="Сервісні центри"), "page_data": page_data}
-        )
-        return context
-
-
-class ForPartnersView(DataMixin, TemplateView):
-    template_name = "a_shop/about.html"
-
-    def get_context_data(self, **kwargs: Any) -> Dict:
-        context = super().get_context_data(**kwargs)
-        page_data = PageData.objects.filter(name="partners").first()
-        context.update(
-            {**self.get_user_context(title="Партнерам"), "page_data": page_data}
-        )
-        return context
+@cache_control(max_age=60)
+def autocomplete(request: HttpRequest) -> JsonResponse:
+    limit = getattr(settings, "SHOP_AUTOCOMPLETE_LIMIT", 10)
+    suggestions = autocomplete_index.lookup(request.GET.get("q"), limit)
+    return JsonResponse(
+        {
+            "results": [
+                {"kind": item.kind, "label": item.label, "url": item.url}
+                for item in suggestions
+            ]
+        }
+    )
+
+
+@never_cache
+def user_fragment(request: HttpRequest) -> JsonResponse:
+    """
+    Returns per-user parts of pages cached for anonymous users.
+    """
+    return JsonResponse(
+        {
+            "cartItem": get_cart(request).total_quantity,
+            "csrfToken": get_token(request),
+        }
+    )
+
+
+def product_reviews(request: HttpRequest, product_slug: str) -> JsonResponse:
+    """
+    Returns next page of product reviews as HTML fragment with URL of
+    the following page.
+    """
+    bundle = get_product_bundle(product_slug)
+    if bundle is None:
+        raise Http404("No product found matching the query")
+    try:
+        page = get_review_page(bundle.product, request.GET.get("cursor"))
+    except InvalidCursor:
+        raise Http404("Invalid cursor")
+    html = render_to_string(
+        "a_shop/samples/review_items.html",
+        {
+            "product_review": page.object_list,
+            "user_votes": get_user_votes(
+                request.user.pk, [review.pk for review in page.object_list]
+            ),
+        },
+        request,
+    )
+    return JsonResponse(
+        {"html": html, "next": get_reviews_url(product_slug, page.next_cursor)}
+    )
+
+
+@never_cache
+def auth_modals(request: HttpRequest) -> HttpResponse:
+    """
+    Returns pre-rendered login and registration modals with CSRF token
+    of the request, loaded by page script on first use.
+    """
+    return HttpResponse(get_auth_modals(request))
 
 
 def updateItem(request: HttpRequest) -> JsonResponse:
     data = json.loads(request.body)
-    productId = data["productId"]
+    productId = int(data["productId"])
     action = data["action"]
-    user = request.user
-    if buyer := check_buyer_existence(user):
-        perform_orderItem_actions(productId, action, buyer)
-        return JsonResponse("Item was added", safe=False)
+    cart = get_cart(request)
+    if action == "add" and Product.objects.filter(id=productId, sold=False).exists():
+        cart.add(productId)
+    elif action == "remove":
+        cart.add(productId, -1)
+    response = JsonResponse("Item was added", safe=False)
+    save_cart(request, response)
+    return response
 
 
 class CartView(DataMixin, TemplateView):
@@ -548,12 +613,13 @@ class CheckoutView(CartView):
 
     def get_context_data(self, **kwargs: Any) -> Dict:
         context = super().get_context_data(**kwargs)
-        user, cart = self.request.user, {}
+        user = self.request.user
         checkout_form = get_checkout_form(user)
         items, order = context["items"], context["order"]
         message, items = check_quantity_in_stock(items)
         if message:
             cart, order = correct_cart_order(items)
+            get_cart(self.request).replace(get_cart_quantities(items))
         context.update(
             {
                 "title": "Заказ",
@@ -562,24 +628,29 @@ class CheckoutView(CartView):
                 "message": message,
                 "items": items,
                 "order": order,
-                "cartJson": json.dumps(cart),
             }
         )
         return context
 
+    def render_to_response(self, context: Dict, **response_kwargs: Any) -> HttpResponse:
+        response = super().render_to_response(context, **response_kwargs)
+        save_cart(self.request, response)
+        return response
+
     def post(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
         user, args = self.request.user, self.request.POST
         checkout_form = CheckoutForm(args)
         items, order, cartItems = get_cookies_cart(request)
         message, items = check_quantity_in_stock(items)
         if checkout_form.is_valid() and not message:
-            return self.render_to_response(
-                {
-                    **self.get_context_data(),
-                    **get_response_dict_with_sale_creation(checkout_form, user, items),
-                }
+            response_dict = get_response_dict_with_sale_creation(
+                checkout_form, user, items
             )
+            get_cart(request).clear()
+            return self.render_to_response({**self.get_context_data(), **response_dict})
         else:
+            if message:
+                get_cart(request).replace(get_cart_quantities(items))
             return self.render_to_response(
                 get_updated_response_dict(
                     self.get_user_context(),
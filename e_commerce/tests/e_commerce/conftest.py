@@ -1,8 +1,9 @@
-from typing import Tuple, List, Union
+from typing import Dict, Tuple, List, Union
 from decimal import Decimal
 
 import pytest
-from shop.models import Category, Brand, SuperCategory, ProductImage, Product, OrderItem
+from django.test.utils import CaptureQueriesContext
+from shop.models import Category, Brand, SuperCategory, OrderItem
 from tests.e_commerce.factories import (
     SuperCategoryFactory,
     CategoryFactory,
@@ -13,7 +14,7 @@ from tests.e_commerce.factories import (
 
 
 @pytest.fixture(scope="function")
-def preparation_for_filter_testing() -> Tuple[str, str, List[Tuple[Product, str]]]:
+def preparation_for_filter_testing() -> Tuple[str, str, str]:
     super_category: SuperCategory = SuperCategoryFactory()
     category: Category = CategoryFactory(super_category=super_category)
     brand_1: Brand = BrandFactory()
@@ -27,13 +28,9 @@ def preparation_for_filter_testing() -> Tuple[str, str, List[Tuple[Product, str]
                        category=category, price=Decimal(i), brand=brand_2
                    ) for i in range(10, 60, 10)
                ]
-    [ProductImage(product=product) for product in products]
-    product_list = [
-        (
-            product, ProductImageFactory(product=product).image
-        ) for product in products
-    ]
-    return brand_1.name, brand_2.name, product_list
+    [ProductImageFactory(product=product) for product in products]
+    ProductFactory.create_batch(size=3, price=Decimal(30), brand=brand_1)
+    return brand_1.name, brand_2.name, category.slug
 
 
 def find_instance(
@@ -42,3 +39,7 @@ def find_instance(
     for elem in elements:
         if getattr(elem.product, attr) == value:
             return elem
+
+
+def get_db_queries(queries: CaptureQueriesContext) -> List[Dict]:
+    return [query for query in queries if 'shop_cache' not in query['sql']]
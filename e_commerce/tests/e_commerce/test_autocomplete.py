@@ -0,0 +1,152 @@
+import pytest
+from django.core.cache import cache
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from shop.autocomplete import (
+    CATEGORY,
+    CHANGE_KEY,
+    PRODUCT,
+    SEQUENCE_COUNTER,
+    PrefixIndex,
+    Suggestion,
+    autocomplete_index,
+    get_keys,
+)
+from shop.counters import get_counter
+from shop.models import Category, Product, ProductCard
+from shop.trending import record_activity, update_trending_scores
+from tests.e_commerce.factories import CategoryFactory, ProductFactory
+
+
+@pytest.fixture(autouse=True)
+def fresh_index() -> None:
+    autocomplete_index.invalidate()
+
+
+def test_get_keys() -> None:
+    assert get_keys("Тактичний рюкзак") == ["тактичний рюкзак", "рюкзак"]
+
+
+def test_prefix_index() -> None:
+    index = PrefixIndex(
+        [
+            Suggestion(PRODUCT, 1, "Тактичний рюкзак", "/1/", 5),
+            Suggestion(PRODUCT, 2, "Рюкзак штурмовий", "/2/", 10),
+            Suggestion(CATEGORY, 1, "Ремені", "/c/", 0),
+        ]
+    )
+    assert [item.pk for item in index.lookup("рюк", 10)] == [2, 1]
+    assert [item.pk for item in index.lookup("рюк", 1)] == [2]
+    assert [item.pk for item in index.lookup("тактичний р", 10)] == [1]
+    index.add(Suggestion(PRODUCT, 2, "Сумка", "/2/", 10))
+    assert [item.pk for item in index.lookup("рюк", 10)] == [1]
+    index.remove(PRODUCT, 1)
+    assert index.lookup("рюк", 10) == []
+    assert len(index) == 2
+
+
+def test_prefix_index_ranks_whole_prefix_range() -> None:
+    index = PrefixIndex(
+        [Suggestion(PRODUCT, pk, f"Рюкзак {pk:04}", "/", 1) for pk in range(2000)]
+    )
+    index.add(Suggestion(PRODUCT, 5000, "Рюкзак 9999", "/", 10))
+    assert [item.pk for item in index.lookup("р", 1)] == [5000]
+    assert [item.pk for item in index.lookup("рюкзак 9", 1)] == [5000]
+    index.add(Suggestion(PRODUCT, 7, "Рюкзак 0007", "/", 20))
+    expected_result = index.lookup("р", 2)
+    assert [item.pk for item in expected_result] == [7, 5000]
+
+
+@pytest.mark.django_db
+class TestAutocompleteIndex:
+    pytestmark = pytest.mark.django_db
+
+    def test_autocomplete_index_top_by_access_number(self) -> None:
+        category: Category = CategoryFactory(name="Спорядження")
+        first: Product = ProductFactory(name="Рюкзак малий", category=category)
+        second: Product = ProductFactory(name="Рюкзак великий", category=category)
+        ProductCard.objects.filter(pk=first.pk).update(access_number=1)
+        ProductCard.objects.filter(pk=second.pk).update(access_number=7)
+        autocomplete_index.invalidate()
+        expected_result = autocomplete_index.lookup("рюкзак", 2)
+        assert [(item.kind, item.pk) for item in expected_result] == [
+            (PRODUCT, second.pk),
+            (PRODUCT, first.pk),
+        ]
+
+    def test_autocomplete_index_incremental_update(self) -> None:
+        product: Product = ProductFactory(name="Рюкзак")
+        assert autocomplete_index.lookup("рюкз", 10)[0].pk == product.pk
+        product.name = "Підсумок"
+        product.save()
+        assert autocomplete_index.lookup("рюкз", 10) == []
+        assert autocomplete_index.lookup("підс", 10)[0].pk == product.pk
+        product.delete()
+        assert autocomplete_index.lookup("підс", 10) == []
+
+    def test_autocomplete_index_changes_of_other_process(self) -> None:
+        autocomplete_index.lookup("рюкз", 10)
+        sequence = autocomplete_index.sequence
+        product: Product = ProductFactory(name="Рюкзак")
+        autocomplete_index.index.remove(PRODUCT, product.pk)
+        autocomplete_index.sequence = sequence
+        autocomplete_index.checked_at = 0.0
+        assert autocomplete_index.lookup("рюкз", 10)[0].pk == product.pk
+
+    def test_autocomplete_index_expired_change(self) -> None:
+        autocomplete_index.lookup("рюкз", 10)
+        sequence = autocomplete_index.sequence
+        product: Product = ProductFactory(name="Рюкзак")
+        autocomplete_index.index.remove(PRODUCT, product.pk)
+        autocomplete_index.sequence = sequence
+        autocomplete_index.checked_at = 0.0
+        cache.delete(CHANGE_KEY.format(get_counter(SEQUENCE_COUNTER)))
+        assert autocomplete_index.lookup("рюкз", 10)[0].pk == product.pk
+
+    def test_autocomplete_index_checks_counter_once_per_interval(
+        self, settings, monkeypatch
+    ) -> None:
+        settings.SHOP_AUTOCOMPLETE_SYNC_INTERVAL = 60
+        calls = []
+        monkeypatch.setattr(
+            "shop.autocomplete.get_counter", lambda name: calls.append(name) or 0
+        )
+        autocomplete_index.lookup("рюкз", 10)
+        autocomplete_index.lookup("рюкза", 10)
+        assert calls == [SEQUENCE_COUNTER]
+        autocomplete_index.checked_at = 0.0
+        autocomplete_index.lookup("рюкзак", 10)
+        assert len(calls) == 2
+
+    def test_autocomplete_index_popularity_refreshed_by_trending_job(self) -> None:
+        first: Product = ProductFactory(name="Рюкзак малий")
+        second: Product = ProductFactory(name="Рюкзак великий")
+        ProductCard.objects.filter(pk=first.pk).update(access_number=5)
+        ProductCard.objects.filter(pk=second.pk).update(access_number=1)
+        autocomplete_index.invalidate()
+        assert autocomplete_index.lookup("рюкзак", 1)[0].pk == first.pk
+        ProductCard.objects.filter(pk=second.pk).update(access_number=10)
+        record_activity(timezone.now(), views={second.pk: 5})
+        update_trending_scores()
+        autocomplete_index.checked_at = 0.0
+        expected_result = autocomplete_index.lookup("рюкзак", 1)
+        assert expected_result[0].pk == second.pk
+
+
+@pytest.mark.django_db
+class TestAutocompleteView:
+    pytestmark = pytest.mark.django_db
+
+    def test_autocomplete_view(self) -> None:
+        product: Product = ProductFactory(name="Тактичний рюкзак (олива)")
+        response = Client().get(reverse("shop:autocomplete"), {"q": "Рюк"})
+        expected_result = response.json()["results"]
+        assert expected_result == [
+            {"kind": PRODUCT, "label": "Тактичний рюкзак ", "url": product.get_absolute_url()}
+        ]
+        assert "max-age=60" in response["Cache-Control"]
+
+    def test_autocomplete_view_empty_query(self) -> None:
+        response = Client().get(reverse("shop:autocomplete"), {"q": " "})
+        assert response.json() == {"results": []}
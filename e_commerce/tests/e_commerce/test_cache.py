@@ -0,0 +1,68 @@
+import pytest
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache
+from shop.cache import NEAR, SHARED, TwoTierCache
+
+
+@pytest.fixture
+def shared(settings) -> BaseCache:
+    settings.CACHES = {
+        **settings.CACHES,
+        "two-tier-shared": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "two-tier-shared",
+        },
+    }
+    caches["two-tier-shared"].clear()
+    return caches["two-tier-shared"]
+
+
+def get_cache(staleness: float = 60) -> TwoTierCache:
+    return TwoTierCache(
+        "two-tier-shared", {"OPTIONS": {"MAX_ENTRIES": 2, "STALENESS": staleness}}
+    )
+
+
+def test_two_tier_cache_near_hits(shared: BaseCache) -> None:
+    cache = get_cache()
+    cache.set("key", "value")
+    shared.clear()
+    assert cache.get("key") == "value"
+    expected_result = {
+        NEAR: {"hits": 1, "misses": 0, "entries": 1},
+        SHARED: {"hits": 0, "misses": 0},
+    }
+    assert cache.get_stats() == expected_result
+
+
+def test_two_tier_cache_lru(shared: BaseCache) -> None:
+    cache = get_cache()
+    for key in ("first", "second", "third"):
+        cache.set(key, key)
+    assert cache.get_stats()[NEAR]["entries"] == 2
+    assert cache.get("first") == "first"
+    assert cache.get_stats()[SHARED]["hits"] == 1
+
+
+def test_two_tier_cache_coherence(shared: BaseCache) -> None:
+    first, second = get_cache(0), get_cache(0)
+    first.set("key", 1)
+    assert second.get("key") == 1
+    first.set("key", 2)
+    assert second.get("key") == 2
+    assert second.incr("key") == 3
+    assert first.get("key") == 3
+    second.delete("key")
+    assert first.get("key") is None
+    assert first.add("key", 5) and not second.add("key", 6)
+    assert second.get("key") == 5
+
+
+def test_two_tier_cache_stale_within_window(shared: BaseCache) -> None:
+    first, second = get_cache(), get_cache()
+    first.set("key", 1)
+    assert second.get("key") == 1
+    first.set("key", 2)
+    assert second.get("key") == 1
+    second.staleness = 0
+    assert second.get("key") == 2
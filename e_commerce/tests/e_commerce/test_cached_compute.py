@@ -0,0 +1,48 @@
+import time
+
+import pytest
+from django.core.cache import cache
+from shop import cached_compute as compute_module
+from shop.cached_compute import LOCK_KEY, cached_compute, get_fresh_until
+
+
+@pytest.mark.django_db
+class TestCachedCompute:
+    pytestmark = pytest.mark.django_db
+
+    def test_cached_compute_computes_once(self) -> None:
+        calls = []
+
+        def compute() -> str:
+            calls.append(1)
+            return 'value'
+
+        for _ in range(3):
+            expected_result = cached_compute('test:once', compute, 60)
+        assert expected_result == 'value'
+        assert len(calls) == 1
+        assert not cache.get(LOCK_KEY.format('test:once'))
+
+    def test_stale_value_served_during_refresh(self) -> None:
+        cache.set('test:stale', (time.time() - 1, 'old'), 60)
+        cache.add(LOCK_KEY.format('test:stale'), 1, 60)
+        expected_result = cached_compute('test:stale', lambda: 'new', 60)
+        assert expected_result == 'old'
+
+    def test_stale_value_refreshed(self) -> None:
+        cache.set('test:refresh', (time.time() - 1, 'old'), 60)
+        assert cached_compute('test:refresh', lambda: 'new', 60) == 'new'
+        assert cached_compute('test:refresh', lambda: 'newer', 60) == 'new'
+
+    def test_miss_waits_for_lock_owner(self, monkeypatch) -> None:
+        cache.add(LOCK_KEY.format('test:wait'), 1, 60)
+        monkeypatch.setattr(compute_module, 'WAIT_TIMEOUT', 0.1)
+        expected_result = cached_compute('test:wait', lambda: 'value', 60)
+        assert expected_result == 'value'
+        assert cache.get('test:wait') is None
+
+    def test_get_fresh_until_jitter(self) -> None:
+        now = time.time()
+        expected_result = get_fresh_until(100)
+        assert now + 100 * (1 - compute_module.JITTER) <= expected_result
+        assert expected_result <= time.time() + 100
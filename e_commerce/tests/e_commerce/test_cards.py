@@ -0,0 +1,101 @@
+from typing import List
+
+import pytest
+from faker import Faker
+from shop.cards import rebuild_product_cards, refresh_product_card
+from shop.models import Brand, Category, Product, ProductCard, ProductImage
+from shop.templatetags.shop_tags import hide_brackets
+from tests.e_commerce.factories import (
+    BrandFactory,
+    CategoryFactory,
+    ProductFactory,
+    ProductImageFactory,
+)
+
+
+@pytest.mark.django_db
+class TestProductCardSignals:
+    pytestmark = pytest.mark.django_db
+
+    def test_product_card_created(self) -> None:
+        product: Product = ProductFactory(name="Plate carrier (olive)")
+        card = ProductCard.objects.get(pk=product.pk)
+        assert card.name == hide_brackets(product.name)
+        assert card.price == product.price
+        assert card.sold == product.sold
+        assert card.category_name == product.category.name
+        assert card.category_slug == product.category.slug
+        assert card.brand_name == product.brand.name
+        assert card.url == product.get_absolute_url()
+        assert not card.image
+
+    def test_product_card_updated(self, faker: Faker) -> None:
+        product: Product = ProductFactory()
+        product.price = faker.pydecimal(left_digits=5, right_digits=2, positive=True)
+        product.sold = not product.sold
+        product.save()
+        card = ProductCard.objects.get(pk=product.pk)
+        assert card.price == product.price
+        assert card.sold == product.sold
+
+    def test_product_card_image(self, faker: Faker) -> None:
+        product: Product = ProductFactory()
+        image: ProductImage = ProductImageFactory(product=product)
+        other_image = ProductImage.objects.create(product=product, image=faker.file_name())
+        assert ProductCard.objects.get(pk=product.pk).image == image.image.name
+        image.delete()
+        assert ProductCard.objects.get(pk=product.pk).image == other_image.image.name
+        other_image.delete()
+        assert not ProductCard.objects.get(pk=product.pk).image
+
+    def test_product_card_category_renamed(self, faker: Faker) -> None:
+        category: Category = CategoryFactory()
+        ProductFactory.create_batch(size=3, category=category)
+        category.name = faker.pystr(min_chars=1, max_chars=100)
+        category.save()
+        for card in ProductCard.objects.filter(product__category=category):
+            assert card.category_name == category.name
+
+    def test_product_card_brand_renamed(self, faker: Faker) -> None:
+        brand: Brand = BrandFactory()
+        ProductFactory.create_batch(size=3, brand=brand)
+        brand.name = faker.pystr(min_chars=1, max_chars=100)
+        brand.save()
+        for card in ProductCard.objects.filter(product__brand=brand):
+            assert card.brand_name == brand.name
+
+    def test_product_card_deleted(self) -> None:
+        product: Product = ProductFactory()
+        product_id = product.pk
+        product.delete()
+        assert not ProductCard.objects.filter(pk=product_id).exists()
+
+
+@pytest.mark.django_db
+class TestRefreshProductCard:
+    pytestmark = pytest.mark.django_db
+
+    def test_refresh_product_card_missing_product(self) -> None:
+        product: Product = ProductFactory()
+        product_id = product.pk
+        Product.objects.filter(pk=product_id).delete()
+        assert refresh_product_card(product_id) is None
+        assert not ProductCard.objects.filter(pk=product_id).exists()
+
+    def test_rebuild_product_cards(self) -> None:
+        products: List[Product] = ProductFactory.create_batch(size=5)
+        ProductCard.objects.all().delete()
+        assert rebuild_product_cards(batch_size=2) == 5
+        for product in products:
+            assert ProductCard.objects.get(pk=product.pk).name == hide_brackets(
+                product.name
+            )
+
+    def test_rebuild_product_cards_keeps_trending_score(self) -> None:
+        product: Product = ProductFactory()
+        Product.objects.filter(pk=product.pk).update(price=12)
+        ProductCard.objects.filter(pk=product.pk).update(trending_score=3.5)
+        assert rebuild_product_cards([product.pk]) == 1
+        expected_result = ProductCard.objects.get(pk=product.pk)
+        assert expected_result.trending_score == 3.5
+        assert expected_result.price == 12
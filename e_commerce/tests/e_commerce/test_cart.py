@@ -0,0 +1,138 @@
+import json
+
+import pytest
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from django.test import Client
+from django.urls import reverse
+from shop.cart import (
+    CART_COOKIE,
+    Cart,
+    get_cart,
+    move_anonymous_cart,
+    parse_legacy_cart,
+    remove_expired_carts,
+    save_cart,
+)
+from shop.models import AnonymousCart, Order, OrderItem, Product
+from tests.e_commerce.factories import BuyerFactory, ProductFactory, UserFactory
+
+
+class TestCartStructure:
+
+    def test_set_and_add(self) -> None:
+        cart = Cart()
+        cart.add(3)
+        cart.add(3)
+        cart.add(5, 4)
+        cart.add(3, -2)
+        expected_result = dict(cart)
+        assert expected_result == {5: 4}
+        assert cart.total_quantity == 4
+        assert cart.modified
+
+    def test_dump_and_load(self) -> None:
+        cart = Cart('key', 'version', [1, 2], [3, 4])
+        expected_result = Cart.load('key', cart.dump())
+        assert dict(expected_result) == {1: 3, 2: 4}
+        assert expected_result.version == 'version'
+        assert not expected_result.modified
+
+    def test_parse_legacy_cart(self) -> None:
+        value = "{'1': {'quantity': 2}, 'x': {'quantity': 1}, '3': {}}"
+        expected_result = parse_legacy_cart(value)
+        assert expected_result == {1: 2}
+        assert parse_legacy_cart('broken') == {}
+
+
+@pytest.mark.django_db
+class TestCart:
+    pytestmark = pytest.mark.django_db
+
+    def test_anonymous_cart(self) -> None:
+        request = HttpRequest()
+        request.COOKIES['cart'] = json.dumps({'7': {'quantity': 2}})
+        cart = get_cart(request)
+        assert get_cart(request) is cart
+        assert dict(cart) == {7: 2}
+        cart.add(8)
+        response = HttpResponse()
+        save_cart(request, response)
+        assert response.cookies['cart'].value == ''
+        next_request = HttpRequest()
+        next_request.COOKIES[CART_COOKIE] = response.cookies[CART_COOKIE].value
+        expected_result = get_cart(next_request)
+        assert dict(expected_result) == {7: 2, 8: 1}
+        assert expected_result.version == cart.version
+
+    def test_anonymous_cart_survives_cache_eviction(self) -> None:
+        request = HttpRequest()
+        get_cart(request).add(7, 2)
+        response = HttpResponse()
+        save_cart(request, response)
+        cache.clear()
+        next_request = HttpRequest()
+        next_request.COOKIES[CART_COOKIE] = response.cookies[CART_COOKIE].value
+        expected_result = get_cart(next_request)
+        assert dict(expected_result) == {7: 2}
+        expected_result.add(7, -2)
+        save_cart(next_request, HttpResponse())
+        assert not AnonymousCart.objects.exists()
+
+    def test_remove_expired_carts(self, settings) -> None:
+        request = HttpRequest()
+        get_cart(request).add(7)
+        save_cart(request, HttpResponse())
+        assert remove_expired_carts() == 0
+        settings.SHOP_CART_TIMEOUT = -1
+        expected_result = remove_expired_carts()
+        assert expected_result == 1
+
+    def test_forged_cart_id(self) -> None:
+        request = HttpRequest()
+        request.COOKIES[CART_COOKIE] = 'forged'
+        expected_result = get_cart(request)
+        assert not expected_result
+
+    def test_buyer_cart_write_through(self) -> None:
+        buyer = BuyerFactory()
+        product: Product = ProductFactory()
+        request = HttpRequest()
+        request.user = buyer.user
+        get_cart(request).add(product.pk, 3)
+        save_cart(request, HttpResponse())
+        item = OrderItem.objects.get(order__buyer=buyer, order__complete=False)
+        assert (item.product_id, item.quantity) == (product.pk, 3)
+        cache.clear()
+        request = HttpRequest()
+        request.user = buyer.user
+        expected_result = get_cart(request)
+        assert dict(expected_result) == {product.pk: 3}
+        expected_result.add(product.pk, -3)
+        save_cart(request, HttpResponse())
+        assert not OrderItem.objects.filter(order__buyer=buyer).exists()
+
+    def test_move_anonymous_cart(self) -> None:
+        user = UserFactory()
+        product: Product = ProductFactory()
+        request = HttpRequest()
+        request.COOKIES['cart'] = json.dumps({str(product.pk): {'quantity': 2}})
+        move_anonymous_cart(request, user.pk)
+        request.user = user
+        expected_result = get_cart(request)
+        assert dict(expected_result) == {product.pk: 2}
+        assert Order.objects.filter(buyer__user=user, complete=False).exists()
+
+    def test_update_item_view(self) -> None:
+        product: Product = ProductFactory(sold=False)
+        client = Client()
+        for action in ('add', 'add', 'remove', 'add'):
+            response = client.post(
+                reverse('shop:update_item'),
+                json.dumps({'productId': product.pk, 'action': action}),
+                content_type='application/json',
+            )
+            assert response.status_code == 200
+        response = client.get(reverse('shop:user_fragment'))
+        expected_result = response.json()['cartItem']
+        assert expected_result == 2
@@ -0,0 +1,128 @@
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from shop.models import Category, Product
+from tests.e_commerce.conftest import get_db_queries
+from tests.e_commerce.factories import (
+    CategoryFactory,
+    ProductFactory,
+    ProductImageFactory,
+    ReviewFactory,
+)
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    pytestmark = pytest.mark.django_db
+
+    @pytest.fixture(autouse=True)
+    def disable_page_cache(self, settings) -> None:
+        settings.SHOP_PAGE_CACHE_VIEWS = ()
+
+    def test_product_page_not_modified(self) -> None:
+        product: Product = ProductFactory()
+        client = Client()
+        client.get(product.get_absolute_url())
+        first = client.get(product.get_absolute_url())
+        assert first['ETag'] and not first.has_header('Last-Modified')
+        with CaptureQueriesContext(connection) as queries:
+            expected_result = client.get(
+                product.get_absolute_url(), HTTP_IF_NONE_MATCH=first['ETag']
+            )
+        assert expected_result.status_code == 304
+        assert not get_db_queries(queries)
+
+    def test_product_page_modified_by_review(self) -> None:
+        product: Product = ProductFactory()
+        client = Client()
+        etag = client.get(product.get_absolute_url())['ETag']
+        ReviewFactory(product=product)
+        expected_result = client.get(product.get_absolute_url(), HTTP_IF_NONE_MATCH=etag)
+        assert expected_result.status_code == 200
+        assert expected_result['ETag'] != etag
+
+    def test_etag_depends_on_cart(self) -> None:
+        product: Product = ProductFactory()
+        client = Client()
+        etag = client.get(product.get_absolute_url())['ETag']
+        client.cookies['cart'] = '{"1": {"quantity": 3}}'
+        expected_result = client.get(product.get_absolute_url(), HTTP_IF_NONE_MATCH=etag)
+        assert expected_result.status_code == 200
+
+    def test_cart_change_not_hidden_by_if_modified_since(self) -> None:
+        product: Product = ProductFactory()
+        client = Client()
+        client.get(product.get_absolute_url())
+        client.cookies['cart'] = '{"1": {"quantity": 3}}'
+        expected_result = client.get(
+            product.get_absolute_url(),
+            HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT',
+        )
+        assert expected_result.status_code == 200
+
+    def test_shared_page_has_last_modified(self, settings) -> None:
+        settings.SHOP_PAGE_CACHE_VIEWS = ('product',)
+        product: Product = ProductFactory()
+        response = Client().get(product.get_absolute_url())
+        expected_result = Client().get(
+            product.get_absolute_url(),
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+        assert expected_result.status_code == 304
+
+    def test_category_page_not_modified(self) -> None:
+        category: Category = CategoryFactory()
+        url = reverse('shop:category', kwargs={'category_slug': category.slug})
+        client = Client()
+        client.get(url)
+        etag = client.get(url)['ETag']
+        expected_result = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert expected_result.status_code == 304
+
+    def test_category_page_modified_by_product_image(self) -> None:
+        product: Product = ProductFactory()
+        url = reverse('shop:category', kwargs={'category_slug': product.category.slug})
+        client = Client()
+        etag = client.get(url)['ETag']
+        ProductImageFactory(product=product)
+        expected_result = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert expected_result.status_code == 200
+
+    def test_category_page_modified_by_review(self) -> None:
+        product: Product = ProductFactory()
+        url = reverse('shop:category', kwargs={'category_slug': product.category.slug})
+        client = Client()
+        client.get(url)
+        etag = client.get(url)['ETag']
+        review = ReviewFactory(product=product)
+        modified = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert modified.status_code == 200
+        review.delete()
+        expected_result = client.get(url, HTTP_IF_NONE_MATCH=modified['ETag'])
+        assert expected_result.status_code == 200
+
+    def test_super_category_page_modified_by_category(self) -> None:
+        category: Category = CategoryFactory()
+        url = reverse(
+            'shop:super_category',
+            kwargs={'super_category_pk': category.super_category_id},
+        )
+        client = Client()
+        client.get(url)
+        etag = client.get(url)['ETag']
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+        category.name = 'Нова категорія'
+        category.save()
+        expected_result = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert expected_result.status_code == 200
+
+    def test_cached_page_not_modified(self, settings) -> None:
+        settings.SHOP_PAGE_CACHE_VIEWS = ('home', 'product')
+        product: Product = ProductFactory()
+        etag = Client().get(product.get_absolute_url())['ETag']
+        expected_result = Client().get(
+            product.get_absolute_url(), HTTP_IF_NONE_MATCH=etag
+        )
+        assert expected_result.status_code == 304
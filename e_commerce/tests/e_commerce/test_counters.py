@@ -0,0 +1,13 @@
+import pytest
+from shop.counters import get_counter, increment_counter
+
+pytestmark = pytest.mark.django_db
+
+
+def test_increment_counter() -> None:
+    assert get_counter('orders') == 0
+    assert increment_counter('orders') == 1
+    assert increment_counter('orders', 5) == 6
+    expected_result = get_counter('orders')
+    assert expected_result == 6
+    assert get_counter('other') == 0
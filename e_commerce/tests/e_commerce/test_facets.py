@@ -0,0 +1,93 @@
+from decimal import Decimal
+from typing import Tuple
+
+import pytest
+from django.db import connection
+from django.http import QueryDict
+from django.test.utils import CaptureQueriesContext
+from shop.facets import (
+    FilterState,
+    compute_facets,
+    get_facets,
+    get_filter_state,
+    get_price_bound,
+)
+from shop.models import Category, CategoryFeatures, Product
+from tests.e_commerce.conftest import get_db_queries
+from tests.e_commerce.factories import (
+    CategoryFactory,
+    CategoryFeatureFactory,
+    ProductFactory,
+    ProductFeatureFactory,
+)
+
+
+def test_get_price_bound() -> None:
+    assert get_price_bound("25.50") == Decimal("25.50")
+    assert get_price_bound("") is None
+    assert get_price_bound(None) is None
+    assert get_price_bound("cheap") is None
+
+
+def test_get_filter_state() -> None:
+    data = QueryDict("brand=b&brand=a&low=5&price=1&price=99&feature_3=x&feature_x=y")
+    expected_result = get_filter_state(data)
+    assert expected_result == FilterState(
+        brands=("a", "b"),
+        low=Decimal(5),
+        buckets=(1,),
+        features=((3, ("x",)),),
+    )
+    assert get_filter_state(None) == FilterState()
+
+
+@pytest.mark.django_db
+class TestFacets:
+    pytestmark = pytest.mark.django_db
+
+    def test_facets_brands_and_prices(
+            self, preparation_for_filter_testing: Tuple[str, str, str]
+    ) -> None:
+        brand_1, brand_2, slug = preparation_for_filter_testing
+        with CaptureQueriesContext(connection) as queries:
+            expected_result = compute_facets(slug, FilterState())
+        assert len(queries) == 1
+        assert expected_result.brands == sorted([(brand_1, 5), (brand_2, 5)])
+        assert expected_result.prices == [(0, 10)]
+        assert expected_result.features == []
+
+    def test_facets_are_disjunctive(
+            self, preparation_for_filter_testing: Tuple[str, str, str]
+    ) -> None:
+        brand_1, brand_2, slug = preparation_for_filter_testing
+        state = get_filter_state(QueryDict(f"brand={brand_1}&high=20"))
+        expected_result = compute_facets(slug, state)
+        assert expected_result.brands == sorted([(brand_1, 2), (brand_2, 2)])
+        assert expected_result.prices == [(0, 5)]
+
+    def test_facets_features(self) -> None:
+        category: Category = CategoryFactory()
+        feature: CategoryFeatures = CategoryFeatureFactory(
+            category=category, feature_name="Колір"
+        )
+        cheap: Product = ProductFactory(category=category, price=Decimal(100))
+        expensive: Product = ProductFactory(category=category, price=Decimal(700))
+        ProductFeatureFactory(product=cheap, feature_name=feature, feature="олива")
+        ProductFeatureFactory(product=expensive, feature_name=feature, feature="койот")
+        state = get_filter_state(QueryDict(f"price=0&feature_{feature.pk}=олива"))
+        expected_result = compute_facets(category.slug, state)
+        assert expected_result.features == [
+            (feature.pk, "Колір", [("койот", 0), ("олива", 1)])
+        ]
+        assert expected_result.prices == [(0, 1), (1, 0)]
+
+    def test_get_facets_cached_and_invalidated(self) -> None:
+        category: Category = CategoryFactory()
+        ProductFactory(category=category, price=Decimal(100))
+        state = FilterState()
+        assert get_facets(category.slug, state).prices == [(0, 1)]
+        with CaptureQueriesContext(connection) as queries:
+            get_facets(category.slug, state)
+        assert not get_db_queries(queries)
+        ProductFactory(category=category, price=Decimal(100))
+        assert get_facets(category.slug, state).prices == [(0, 2)]
@@ -0,0 +1,107 @@
+from typing import List
+
+import pytest
+from django.core.cache import cache
+from shop.feature_index import (
+    FEATURE_INDEX_KEY,
+    FEATURE_INDEX_LOCK_KEY,
+    FEATURE_INDEX_VERSION_KEY,
+    FeatureIndex,
+    compress,
+    decompress,
+    get_feature_index,
+    get_ids,
+    match_products,
+)
+from shop.models import Category, CategoryFeatures, Product, ProductFeature
+from tests.e_commerce.factories import (
+    CategoryFactory,
+    CategoryFeatureFactory,
+    ProductFactory,
+    ProductFeatureFactory,
+)
+
+
+def test_get_ids() -> None:
+    assert get_ids(0) == []
+    assert get_ids(1 << 3 | 1 << 9 | 1 << 1000) == [3, 9, 1000]
+
+
+def test_compress() -> None:
+    bitset = 1 << 5 | 1 << 100000
+    assert decompress(compress(bitset)) == bitset
+    assert len(compress(bitset)) < 200
+
+
+def test_feature_index_match() -> None:
+    index = FeatureIndex(
+        {
+            1: {"5.45": compress(0b0110), "7.62": compress(0b1000)},
+            2: {"M": compress(0b1010)},
+        }
+    )
+    assert index.match([(1, ["5.45", "7.62"])]) == 0b1110
+    assert index.match([(1, ["5.45", "7.62"]), (2, ["M"])]) == 0b1010
+    assert index.match([(1, ["5.45"]), (2, ["L"])]) == 0
+    index.set_product(2, 1, ["7.62"])
+    assert index.match([(1, ["7.62"])]) == 0b1100
+    index.set_product(3, 1, [])
+    assert index.match([(1, ["7.62"])]) == 0b0100
+
+
+@pytest.mark.django_db
+class TestFeatureIndexCache:
+    pytestmark = pytest.mark.django_db
+
+    @pytest.fixture
+    def category(self) -> Category:
+        category: Category = CategoryFactory()
+        cache.delete(FEATURE_INDEX_VERSION_KEY.format(category.slug))
+        return category
+
+    def test_match_products(self, category: Category) -> None:
+        caliber: CategoryFeatures = CategoryFeatureFactory(category=category)
+        size = CategoryFeatures.objects.create(category=category, feature_name="size")
+        products: List[Product] = ProductFactory.create_batch(size=3, category=category)
+        for product, value in zip(products, ["5.45", "5.45", "7.62"]):
+            ProductFeatureFactory(product=product, feature_name=caliber, feature=value)
+        ProductFeatureFactory(product=products[1], feature_name=size, feature="M")
+        assert match_products(category.slug, [(caliber.pk, ["5.45"])]) == [
+            products[0].pk,
+            products[1].pk,
+        ]
+        assert match_products(
+            category.slug, [(caliber.pk, ["5.45", "7.62"]), (size.pk, ["M"])]
+        ) == [products[1].pk]
+
+    def test_feature_index_incremental_update(self, category: Category) -> None:
+        caliber: CategoryFeatures = CategoryFeatureFactory(category=category)
+        product: Product = ProductFactory(category=category)
+        feature: ProductFeature = ProductFeatureFactory(
+            product=product, feature_name=caliber, feature="5.45"
+        )
+        assert match_products(category.slug, [(caliber.pk, ["5.45"])]) == [product.pk]
+        feature.feature = "7.62"
+        feature.save()
+        index = get_feature_index(category.slug)
+        assert index.match([(caliber.pk, ["5.45"])]) == 0
+        assert get_ids(index.match([(caliber.pk, ["7.62"])])) == [product.pk]
+        feature.delete()
+        assert match_products(category.slug, [(caliber.pk, ["7.62"])]) == []
+
+    def test_feature_index_update_during_other_update(self, category: Category) -> None:
+        caliber: CategoryFeatures = CategoryFeatureFactory(category=category)
+        product: Product = ProductFactory(category=category)
+        feature: ProductFeature = ProductFeatureFactory(
+            product=product, feature_name=caliber, feature="5.45"
+        )
+        stale = get_feature_index(category.slug)
+        version = cache.get(FEATURE_INDEX_VERSION_KEY.format(category.slug))
+        cache.add(FEATURE_INDEX_LOCK_KEY.format(category.slug), 1)
+        feature.feature = "7.62"
+        feature.save()
+        cache.delete(FEATURE_INDEX_LOCK_KEY.format(category.slug))
+        cache.set(FEATURE_INDEX_KEY.format(category.slug, version), stale.bitsets)
+        assert match_products(category.slug, [(caliber.pk, ["5.45"])]) == []
+        expected_result = match_products(category.slug, [(caliber.pk, ["7.62"])])
+        assert expected_result == [product.pk]
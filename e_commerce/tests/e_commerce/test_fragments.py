@@ -0,0 +1,29 @@
+import pytest
+from django.core.management import call_command
+from django.test import Client
+from django.urls import reverse
+from shop.models import Category, SuperCategory
+from tests.e_commerce.factories import CategoryFactory, SuperCategoryFactory
+
+
+@pytest.mark.django_db
+class TestNavigationFragments:
+    pytestmark = pytest.mark.django_db
+
+    def test_fragments_invalidated_on_category_change(self, settings) -> None:
+        settings.SHOP_PAGE_CACHE_VIEWS = ()
+        super_category: SuperCategory = SuperCategoryFactory(name='Одяг')
+        category: Category = CategoryFactory(super_category=super_category)
+        url = reverse('shop:category', kwargs={'category_slug': category.slug})
+        assert 'Одяг' in Client().get(url).content.decode()
+        super_category.name = 'Спорядження'
+        super_category.save()
+        expected_result = Client().get(url).content.decode()
+        assert 'Спорядження' in expected_result
+        assert 'Одяг' not in expected_result
+        assert 'aria-current="page"' in expected_result
+
+    def test_benchmark_fragments(self, capsys) -> None:
+        SuperCategoryFactory()
+        call_command('benchmark_fragments', iterations=2)
+        assert 'Saved:' in capsys.readouterr().out
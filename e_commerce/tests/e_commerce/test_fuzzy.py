@@ -0,0 +1,77 @@
+import time
+
+import pytest
+from django.test import Client
+from django.urls import reverse
+from shop.fuzzy import (
+    TrigramIndex,
+    get_did_you_mean,
+    get_trigram_backend,
+    rebuild_terms,
+    suggest_query,
+    trigrams,
+)
+from shop.models import Product, SearchTerm
+from shop.search import HIGHLIGHT_START, get_search_backend
+from tests.e_commerce.factories import BrandFactory, ProductFactory
+
+
+def test_trigrams() -> None:
+    assert trigrams("cat") == {"  c", " ca", "cat", "at "}
+
+
+def test_trigram_index_similar() -> None:
+    index = TrigramIndex(["рюкзак", "ремінь", "рукавиці"])
+    deadline = time.monotonic() + 1
+    expected_result = index.similar("рюкзк", 0.3, 2, deadline)
+    assert expected_result[0][0] == "рюкзак"
+    assert index.similar("балаклава", 0.3, 2, deadline) == []
+
+
+def test_trigram_index_deadline() -> None:
+    index = TrigramIndex(["рюкзак"])
+    assert index.similar("рюкзак", 0.3, 1, time.monotonic() - 1) == []
+
+
+@pytest.mark.django_db
+class TestFuzzySearch:
+    pytestmark = pytest.mark.django_db
+
+    def test_terms_indexed(self) -> None:
+        ProductFactory(name="Тактичний рюкзак 30", brand=BrandFactory(name="Helikon"))
+        terms = set(SearchTerm.objects.values_list("term", flat=True))
+        assert {"тактичний", "рюкзак", "helikon"} <= terms
+        assert "30" not in terms
+
+    def test_suggest_query(self) -> None:
+        ProductFactory(name="Тактичний рюкзак")
+        assert suggest_query("тактичний рюкзк 30") == "тактичний рюкзак 30"
+        assert suggest_query("тактичний рюкзак") is None
+
+    def test_did_you_mean_sparse_results(self) -> None:
+        ProductFactory(name="Тактичний рюкзак")
+        products = get_search_backend().search("рюкзк")
+        assert get_did_you_mean("рюкзк", products) == "рюкзак"
+
+    def test_did_you_mean_enough_results(self, settings) -> None:
+        settings.SHOP_FUZZY_MIN_HITS = 1
+        ProductFactory(name="Тактичний рюкзак")
+        products = get_search_backend().search("рюкзак")
+        assert get_did_you_mean("рюкзк", products) is None
+
+    def test_rebuild_terms(self) -> None:
+        ProductFactory(name="Тактичний рюкзак")
+        SearchTerm.objects.all().delete()
+        assert rebuild_terms(batch_size=1) >= 2
+        assert (
+            get_trigram_backend().similar("рюкзк", 0.3, 1, time.monotonic() + 1)[0][0]
+            == "рюкзак"
+        )
+
+    def test_search_result_view_corrected(self) -> None:
+        product: Product = ProductFactory(name="Тактичний рюкзак")
+        response = Client().get(reverse("shop:search_results"), {"q": "рюкзк"})
+        assert response.context["suggestion"] == "рюкзак"
+        assert response.context["corrected"]
+        assert [card.pk for card in response.context["products"]] == [product.pk]
+        assert HIGHLIGHT_START in response.context["products"][0].snippet
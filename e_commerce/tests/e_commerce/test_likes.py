@@ -0,0 +1,122 @@
+import json
+
+import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from shop.likes import UserVotes, add_vote, fold_counter_shards, get_user_votes
+from shop.models import Like, Product, Review, ReviewCounterShard
+from tests.e_commerce.conftest import get_db_queries
+from tests.e_commerce.factories import ProductFactory, ReviewFactory, UserFactory
+
+
+@pytest.mark.django_db
+class TestLikes:
+    pytestmark = pytest.mark.django_db
+
+    def test_unique_vote(self) -> None:
+        review: Review = ReviewFactory(like_num=0, dislike_num=0)
+        user = UserFactory()
+        assert add_vote(review.pk, user.pk, True)
+        expected_result = add_vote(review.pk, user.pk, False)
+        assert not expected_result
+        like = Like.objects.get(review=review, like_author=user)
+        assert like.like and not like.dislike
+        with pytest.raises(IntegrityError), transaction.atomic():
+            Like.objects.create(review=review, like_author=user, like=True)
+
+    def test_counters(self) -> None:
+        review: Review = ReviewFactory(like_num=None, dislike_num=None)
+        for like in (True, True, False):
+            add_vote(review.pk, UserFactory().pk, like)
+        review.refresh_from_db()
+        expected_result = (review.like_num, review.dislike_num, review.helpfulness)
+        assert expected_result == (2, 1, 1)
+
+    def test_wide_counters(self) -> None:
+        review: Review = ReviewFactory(like_num=2**40, dislike_num=0)
+        add_vote(review.pk, UserFactory().pk, True)
+        review.refresh_from_db()
+        expected_result = review.like_num
+        assert expected_result == 2**40 + 1
+
+    def test_sharded_counters(self, settings) -> None:
+        settings.SHOP_LIKE_COUNTER_SHARDS = 4
+        settings.SHOP_LIKE_SHARD_THRESHOLD = 0
+        review: Review = ReviewFactory(like_num=3, dislike_num=1)
+        for like in (True, True, True, False):
+            add_vote(review.pk, UserFactory().pk, like)
+        review.refresh_from_db()
+        assert (review.like_num, review.dislike_num) == (3, 1)
+        assert 1 <= ReviewCounterShard.objects.filter(review=review).count() <= 4
+        assert fold_counter_shards() == 1
+        review.refresh_from_db()
+        expected_result = (review.like_num, review.dislike_num, review.helpfulness)
+        assert expected_result == (6, 2, 4)
+        assert not ReviewCounterShard.objects.exists()
+
+    def test_fold_like_counters_command(self, settings) -> None:
+        settings.SHOP_LIKE_COUNTER_SHARDS = 2
+        settings.SHOP_LIKE_SHARD_THRESHOLD = 0
+        review: Review = ReviewFactory(like_num=0, dislike_num=0)
+        add_vote(review.pk, UserFactory().pk, False)
+        call_command('fold_like_counters')
+        review.refresh_from_db()
+        expected_result = review.dislike_num
+        assert expected_result == 1
+
+    def test_missing_review(self) -> None:
+        expected_result = add_vote(10**9, UserFactory().pk, True)
+        assert not expected_result
+        assert not Like.objects.exists()
+
+    def test_get_user_votes(self) -> None:
+        user = UserFactory()
+        reviews = ReviewFactory.create_batch(3)
+        add_vote(reviews[0].pk, user.pk, True)
+        add_vote(reviews[1].pk, user.pk, False)
+        add_vote(reviews[2].pk, UserFactory().pk, True)
+        with CaptureQueriesContext(connection) as queries:
+            expected_result = get_user_votes(
+                user.pk, [review.pk for review in reviews]
+            )
+        assert len(queries) == 1
+        assert expected_result == UserVotes(
+            frozenset([reviews[0].pk]), frozenset([reviews[1].pk])
+        )
+        assert get_user_votes(None, [reviews[0].pk]) == UserVotes()
+
+    def test_update_like_view(self) -> None:
+        review: Review = ReviewFactory(like_num=0, dislike_num=0)
+        user = UserFactory()
+        client = Client()
+        client.force_login(user)
+        data = {'review': review.pk, 'author': user.pk, 'like': 'True'}
+        with CaptureQueriesContext(connection) as queries:
+            response = client.post(
+                reverse('shop:update_like'),
+                json.dumps(data),
+                content_type='application/json',
+            )
+        expected_result = [
+            query['sql'] for query in get_db_queries(queries)
+            if 'shop_review' in query['sql'] or 'shop_like' in query['sql']
+        ]
+        assert response.json() == 'Like was added'
+        assert len(expected_result) == 2
+
+    def test_product_page_votes(self, settings) -> None:
+        settings.SHOP_PAGE_CACHE_VIEWS = ()
+        cache.clear()
+        product: Product = ProductFactory()
+        review: Review = ReviewFactory(product=product)
+        user = UserFactory(is_active=True)
+        add_vote(review.pk, user.pk, False)
+        client = Client()
+        client.force_login(user)
+        response = client.get(product.get_absolute_url())
+        expected_result = response.content.decode()
+        assert 'like-button voted' in expected_result
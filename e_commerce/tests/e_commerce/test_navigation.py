@@ -0,0 +1,61 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from shop.models import Category, SuperCategory
+from shop.navigation import get_navigation_tree
+from tests.e_commerce.factories import (
+    CategoryFactory,
+    ProductFactory,
+    SuperCategoryFactory,
+)
+
+
+@pytest.mark.django_db
+class TestNavigationTree:
+    pytestmark = pytest.mark.django_db
+
+    def test_navigation_tree(self) -> None:
+        super_category: SuperCategory = SuperCategoryFactory()
+        first: Category = CategoryFactory(super_category=super_category)
+        second: Category = CategoryFactory(super_category=super_category)
+        ProductFactory.create_batch(size=2, category=first)
+        expected_result = get_navigation_tree()
+        assert expected_result.get_category(first.slug) == first
+        assert expected_result.by_id[second.pk] == second
+        assert expected_result.get_siblings(second.slug) == (first, second)
+        assert expected_result.get_categories(super_category.pk) == (first, second)
+        assert expected_result.get_product_number(first.pk) == 2
+        assert expected_result.get_product_number(second.pk) == 0
+        assert expected_result.get_siblings('missing') == ()
+        with CaptureQueriesContext(connection) as queries:
+            assert expected_result.get_category(first.slug).super_category.name
+        assert len(queries) == 0
+
+    def test_navigation_tree_rebuilt_on_change(self) -> None:
+        super_category: SuperCategory = SuperCategoryFactory()
+        category: Category = CategoryFactory(super_category=super_category)
+        tree = get_navigation_tree()
+        assert get_navigation_tree() is tree
+        category.name = 'Рюкзаки'
+        category.save()
+        assert get_navigation_tree().get_category(category.slug).name == 'Рюкзаки'
+        new_super: SuperCategory = SuperCategoryFactory()
+        assert new_super in get_navigation_tree().super_categories
+        ProductFactory(category=category)
+        assert get_navigation_tree().get_product_number(category.pk) == 1
+
+    def test_navigation_tree_rebuilt_on_product_category_change(self) -> None:
+        first: Category = CategoryFactory()
+        second: Category = CategoryFactory()
+        product = ProductFactory(category=first)
+        tree = get_navigation_tree()
+        product.name = 'Рюкзак'
+        product.save()
+        assert get_navigation_tree() is tree
+        product.category = second
+        product.save()
+        expected_result = get_navigation_tree()
+        assert expected_result.get_product_number(first.pk) == 0
+        assert expected_result.get_product_number(second.pk) == 1
+        product.delete()
+        assert get_navigation_tree().get_product_number(second.pk) == 0
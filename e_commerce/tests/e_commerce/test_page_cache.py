@@ -0,0 +1,63 @@
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from shop.likes import add_vote
+from shop.models import Product
+from shop.page_cache import CSRF_PLACEHOLDER
+from shop.view_counter import view_counter
+from tests.e_commerce.conftest import get_db_queries
+from tests.e_commerce.factories import ProductFactory, ReviewFactory, UserFactory
+
+
+@pytest.mark.django_db
+class TestAnonymousPageCache:
+    pytestmark = pytest.mark.django_db
+
+    def test_home_page_cached(self) -> None:
+        client = Client()
+        first = client.get(reverse('shop:home'))
+        assert CSRF_PLACEHOLDER in first.content.decode()
+        client.cookies['cart'] = '{"1": {"quantity": 3}}'
+        with CaptureQueriesContext(connection) as queries:
+            expected_result = client.get(reverse('shop:home'))
+        assert not get_db_queries(queries)
+        assert expected_result.content == first.content
+
+    def test_product_page_counts_cached_views(self) -> None:
+        product: Product = ProductFactory()
+        view_counter.take()
+        Client().get(product.get_absolute_url())
+        Client().get(product.get_absolute_url())
+        assert view_counter.take()[0][product.pk] == 2
+
+    def test_review_invalidates_only_pages_of_its_product(self) -> None:
+        product: Product = ProductFactory()
+        other: Product = ProductFactory()
+        client = Client()
+        client.get(other.get_absolute_url())
+        first = client.get(product.get_absolute_url())
+        review = ReviewFactory(product=product)
+        with CaptureQueriesContext(connection) as queries:
+            client.get(other.get_absolute_url())
+        assert not get_db_queries(queries)
+        add_vote(review.pk, UserFactory().pk, True)
+        with CaptureQueriesContext(connection) as queries:
+            client.get(other.get_absolute_url())
+        assert not get_db_queries(queries)
+        expected_result = client.get(product.get_absolute_url())
+        assert expected_result['ETag'] != first['ETag']
+
+    def test_session_request_not_cached(self, settings) -> None:
+        client = Client()
+        client.cookies[settings.SESSION_COOKIE_NAME] = 'session'
+        response = client.get(reverse('shop:home'))
+        assert CSRF_PLACEHOLDER not in response.content.decode()
+
+    def test_user_fragment(self) -> None:
+        client = Client()
+        client.cookies['cart'] = '{"1": {"quantity": 3}}'
+        expected_result = client.get(reverse('shop:user_fragment')).json()
+        assert expected_result['cartItem'] == 3
+        assert expected_result['csrfToken']
@@ -0,0 +1,79 @@
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from shop.models import PageData
+from shop.pages import (
+    CART_MARKER,
+    CSRF_MARKER,
+    bump_pages_version,
+    get_pages_version,
+    page_registry,
+)
+from tests.e_commerce.conftest import get_db_queries
+
+
+@pytest.mark.django_db
+class TestPageData:
+    pytestmark = pytest.mark.django_db
+
+    def test_page_registry(self) -> None:
+        page_data = PageData.objects.create(name='about', header_1='Про магазин')
+        assert page_registry.get('about') == page_data
+        assert page_registry.get('terms') is None
+        page_data.header_1 = 'Наша історія'
+        page_data.save()
+        expected_result = page_registry.get('about')
+        assert expected_result.header_1 == 'Наша історія'
+
+    def test_page_data_view(self) -> None:
+        PageData.objects.create(name='delivery', header_1='Нова пошта')
+        response = Client().get(reverse('shop:delivery'))
+        assert response.status_code == 200
+        assert 'Нова пошта' in response.content.decode()
+        assert response.context['title'] == 'Доставка'
+
+    def test_static_pages(self, settings, tmp_path) -> None:
+        settings.SHOP_STATIC_PAGES_DIR = str(tmp_path)
+        PageData.objects.create(name='help', header_1='Як замовити')
+        assert (tmp_path / f'help.{get_pages_version()}.html').exists()
+        client = Client()
+        client.cookies['cart'] = '{"1": {"quantity": 2}}'
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('shop:help'))
+        assert not get_db_queries(queries)
+        expected_result = response.content.decode()
+        assert 'Як замовити' in expected_result
+        assert CSRF_MARKER not in expected_result
+        assert CART_MARKER not in expected_result
+        assert reverse('shop:auth_modals') in expected_result
+        client.cookies[settings.SESSION_COOKIE_NAME] = 'session'
+        response = client.get(reverse('shop:help'))
+        assert response.context['title'] == 'Допомога'
+
+    def test_static_pages_of_former_version(self, settings, tmp_path) -> None:
+        settings.SHOP_STATIC_PAGES_DIR = str(tmp_path)
+        PageData.objects.create(name='help', header_1='Як замовити')
+        former = tmp_path / f'help.{get_pages_version()}.html'
+        assert former.exists()
+        bump_pages_version()
+        response = Client().get(reverse('shop:help'))
+        assert response.context['title'] == 'Допомога'
+        assert not former.exists()
+        expected_result = [path.name for path in tmp_path.iterdir()]
+        assert expected_result == [f'help.{get_pages_version()}.html']
+
+    def test_auth_modals(self) -> None:
+        client = Client()
+        expected_result = client.get(reverse('shop:auth_modals')).content.decode()
+        assert 'id="loginModal"' in expected_result
+        assert 'id="registerModal"' in expected_result
+        assert 'name="password2"' in expected_result
+        assert CSRF_MARKER not in expected_result
+        assert client.cookies['csrftoken'].value
+
+    def test_auth_modals_loaded_on_demand(self) -> None:
+        expected_result = Client().get(reverse('shop:home')).content.decode()
+        assert reverse('shop:auth_modals') in expected_result
+        assert 'id="loginModal"' not in expected_result
@@ -0,0 +1,75 @@
+from typing import List
+
+import pytest
+from django.http import Http404
+from django.test import RequestFactory
+from shop.models import Product, ProductCard
+from shop.pagination import InvalidCursor, KeysetPaginator
+from shop.views import ShopHome
+from tests.e_commerce.factories import ProductFactory
+
+
+@pytest.fixture
+def cards() -> List[ProductCard]:
+    products: List[Product] = ProductFactory.create_batch(size=7)
+    for number, product in enumerate(products):
+        ProductCard.objects.filter(pk=product.pk).update(
+            access_number=number % 3, trending_score=number % 3
+        )
+    return list(ProductCard.objects.order_by("-access_number", "-pk"))
+
+
+@pytest.mark.django_db
+class TestKeysetPaginator:
+    pytestmark = pytest.mark.django_db
+
+    def test_keyset_paginator_forward_and_back(self, cards: List[ProductCard]) -> None:
+        paginator = KeysetPaginator(
+            ProductCard.objects.all(), 3, ("-access_number", "-pk")
+        )
+        first = paginator.page()
+        assert first.object_list == cards[:3]
+        assert not first.has_previous()
+        second = paginator.page(first.next_cursor)
+        assert second.object_list == cards[3:6]
+        assert second.has_previous() and second.has_next()
+        third = paginator.page(second.next_cursor)
+        assert third.object_list == cards[6:]
+        assert not third.has_next()
+        expected_result = paginator.page(third.previous_cursor)
+        assert expected_result.object_list == cards[3:6]
+        assert paginator.page(expected_result.previous_cursor).object_list == cards[:3]
+
+    def test_keyset_paginator_invalid_cursor(self) -> None:
+        paginator = KeysetPaginator(ProductCard.objects.all(), 3, ("pk",))
+        with pytest.raises(InvalidCursor):
+            paginator.page("not-a-cursor")
+
+
+@pytest.mark.django_db
+class TestKeysetPaginationMixin:
+    pytestmark = pytest.mark.django_db
+
+    def test_keyset_pagination_mixin(self, cards: List[ProductCard]) -> None:
+        view = ShopHome(keyset_pagination=True)
+        view.setup(RequestFactory().get("/"))
+        paginator, page, object_list, is_paginated = view.paginate_queryset(
+            view.get_queryset(), 5
+        )
+        assert object_list == cards[:5]
+        assert is_paginated and page.is_keyset
+
+    def test_keyset_pagination_mixin_invalid_cursor(self) -> None:
+        view = ShopHome(keyset_pagination=True)
+        view.setup(RequestFactory().get("/", {"cursor": "broken"}))
+        with pytest.raises(Http404):
+            view.paginate_queryset(view.get_queryset(), 5)
+
+    def test_keyset_pagination_disabled(self, cards: List[ProductCard]) -> None:
+        view = ShopHome()
+        view.setup(RequestFactory().get("/"))
+        paginator, page, object_list, is_paginated = view.paginate_queryset(
+            view.get_queryset(), 5
+        )
+        assert not getattr(page, "is_keyset", False)
+        assert page.number == 1
@@ -0,0 +1,37 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from shop.pricing import CartLine, get_cart_products, price_cart
+from tests.e_commerce.factories import ProductFactory, ProductImageFactory
+
+
+@pytest.mark.django_db
+class TestPricing:
+    pytestmark = pytest.mark.django_db
+
+    def test_price_cart(self) -> None:
+        first = ProductFactory(price=Decimal('10.50'))
+        second = ProductFactory(price=Decimal('3.25'))
+        images = ProductImageFactory.create_batch(size=2, product=first)
+        with CaptureQueriesContext(connection) as queries:
+            expected_result = price_cart([(second.pk, 2), (first.pk, 3), (10**9, 1)])
+        assert len(queries) == 1
+        assert [line.product.id for line in expected_result.lines] == [second.pk, first.pk]
+        assert expected_result.lines[1].product.image_url == images[0].image.url
+        assert expected_result.lines[0].product.image_url == ''
+        assert expected_result.lines[1].get_total == Decimal('31.50')
+        assert expected_result.total_quantity == 5
+        assert expected_result.total == Decimal('38.00')
+
+    def test_cart_line_slots(self) -> None:
+        product = get_cart_products([ProductFactory().pk]).popitem()[1]
+        line = CartLine(product, 1)
+        with pytest.raises(AttributeError):
+            line.extra = 1
+
+    def test_price_empty_cart(self) -> None:
+        expected_result = price_cart([])
+        assert expected_result.lines == []
+        assert expected_result.total == 0
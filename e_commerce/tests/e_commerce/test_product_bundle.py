@@ -0,0 +1,70 @@
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from shop.models import Product
+from shop.product_bundle import get_product_bundle
+from shop.ratings import get_product_eval
+from tests.e_commerce.conftest import get_db_queries
+from tests.e_commerce.factories import (
+    ProductFactory,
+    ProductFeatureFactory,
+    ProductImageFactory,
+    ReviewFactory,
+)
+
+
+@pytest.mark.django_db
+class TestProductBundle:
+    pytestmark = pytest.mark.django_db
+
+    def test_get_product_bundle(self) -> None:
+        product: Product = ProductFactory()
+        feature = ProductFeatureFactory(product=product)
+        image = ProductImageFactory(product=product)
+        reviews = ReviewFactory.create_batch(3, product=product)
+        expected_result = get_product_bundle(product.slug)
+        assert expected_result.product == product
+        assert expected_result.features == (feature,)
+        assert expected_result.image_urls == (image.image.url,)
+        assert expected_result.review_number == 3
+        assert expected_result.product_eval == get_product_eval(
+            sum(review.grade for review in reviews), len(reviews)
+        )
+
+    def test_get_product_bundle_not_found(self) -> None:
+        assert get_product_bundle('missing') is None
+
+    def test_hot_product_page_without_catalog_queries(self, settings) -> None:
+        settings.SHOP_PAGE_CACHE_VIEWS = ()
+        product: Product = ProductFactory()
+        ProductFeatureFactory(product=product)
+        ReviewFactory(product=product)
+        client = Client()
+        client.get(product.get_absolute_url())
+        with CaptureQueriesContext(connection) as queries:
+            expected_result = client.get(product.get_absolute_url())
+        assert not get_db_queries(queries)
+        assert expected_result.status_code == 200
+        assert product.vendor_code in expected_result.content.decode()
+
+    def test_bundle_invalidated_on_review_change(self) -> None:
+        product: Product = ProductFactory()
+        assert get_product_bundle(product.slug).review_number == 0
+        review = ReviewFactory(product=product, review_text='Новий відгук')
+        expected_result = get_product_bundle(product.slug)
+        assert expected_result.review_number == 1
+        review.delete()
+        assert get_product_bundle(product.slug).review_number == 0
+
+    def test_bundle_invalidated_on_product_change(self) -> None:
+        product: Product = ProductFactory()
+        get_product_bundle(product.slug)
+        product.name = 'Новий товар'
+        product.save()
+        expected_result = get_product_bundle(product.slug)
+        assert expected_result.product.name == 'Новий товар'
+
+    def test_product_page_not_found(self) -> None:
+        expected_result = Client().get('/product/missing/')
+        assert expected_result.status_code == 404
@@ -0,0 +1,103 @@
+from typing import List, Tuple
+
+import pytest
+from django.db import connection
+from django.http import QueryDict
+from django.test.utils import CaptureQueriesContext
+from shop.models import Category, CategoryFeatures, Product
+from shop.querysets import querysets
+from tests.e_commerce.factories import (
+    CategoryFactory,
+    CategoryFeatureFactory,
+    ProductFactory,
+    ProductFeatureFactory,
+)
+
+
+@pytest.mark.django_db
+class TestGetProductQuerysetForCategoryView:
+    pytestmark = pytest.mark.django_db
+
+    def test_category_view_queryset_all(
+            self, preparation_for_filter_testing: Tuple[str, str, str]
+    ) -> None:
+        brand_1, brand_2, slug = preparation_for_filter_testing
+        data = QueryDict(f'brand={brand_1}&brand={brand_2}&low=2&high=70')
+        expected_result = querysets.get_product_queryset_for_category_view(slug, data)
+        for elem in expected_result:
+            assert elem.brand_name in {brand_1, brand_2}
+            assert elem.price in {10, 20, 30, 40, 50}
+        assert expected_result.count() == 10
+
+    def test_category_view_queryset_one_brand(
+            self, preparation_for_filter_testing: Tuple[str, str, str]
+    ) -> None:
+        brand_1, brand_2, slug = preparation_for_filter_testing
+        data = QueryDict(f'brand={brand_1}')
+        expected_result = querysets.get_product_queryset_for_category_view(slug, data)
+        for elem in expected_result:
+            assert elem.brand_name == brand_1
+            assert elem.price in {10, 20, 30, 40, 50}
+        assert expected_result.count() == 5
+
+    def test_category_view_queryset_one_brand_one_price(
+            self, preparation_for_filter_testing: Tuple[str, str, str]
+    ) -> None:
+        brand_1, brand_2, slug = preparation_for_filter_testing
+        data = QueryDict(f'brand={brand_2}&low=50')
+        expected_result = querysets.get_product_queryset_for_category_view(slug, data)
+        assert expected_result[0].price == 50
+        assert expected_result[0].brand_name == brand_2
+        assert expected_result.count() == 1
+
+    def test_category_view_queryset_empty_query(
+            self, preparation_for_filter_testing: Tuple[str, str, str]
+    ) -> None:
+        brand_1, brand_2, slug = preparation_for_filter_testing
+        expected_result = querysets.get_product_queryset_for_category_view(
+            slug, QueryDict()
+        )
+        assert expected_result.count() == 10
+
+    def test_category_view_queryset_all_brands_and_high_price(
+            self, preparation_for_filter_testing: Tuple[str, str, str]
+    ) -> None:
+        brand_1, brand_2, slug = preparation_for_filter_testing
+        data = QueryDict(f'brand={brand_1}&brand={brand_2}&low=100')
+        expected_result = querysets.get_product_queryset_for_category_view(slug, data)
+        assert not expected_result.exists()
+
+    def test_category_view_queryset_brands_and_prices(
+            self, preparation_for_filter_testing: Tuple[str, str, str]
+    ) -> None:
+        brand_1, brand_2, slug = preparation_for_filter_testing
+        data = QueryDict(f'brand={brand_1}&brand={brand_2}&low=20&high=40')
+        expected_result = querysets.get_product_queryset_for_category_view(slug, data)
+        for elem in expected_result:
+            assert elem.brand_name in {brand_1, brand_2}
+            assert elem.price in {20, 30, 40}
+        assert expected_result.count() == 6
+
+    def test_category_view_queryset_page_is_one_query(
+            self, preparation_for_filter_testing: Tuple[str, str, str]
+    ) -> None:
+        brand_1, brand_2, slug = preparation_for_filter_testing
+        data = QueryDict(f'brand={brand_1}&high=40')
+        products = querysets.get_product_queryset_for_category_view(slug, data)
+        with CaptureQueriesContext(connection) as queries:
+            page = list(products[1:3])
+        assert len(queries) == 1
+        assert "LIMIT" in queries[0]["sql"]
+        assert [elem.price for elem in page] == [20, 30]
+
+    def test_category_view_queryset_features(self) -> None:
+        category: Category = CategoryFactory()
+        caliber: CategoryFeatures = CategoryFeatureFactory(category=category)
+        products: List[Product] = ProductFactory.create_batch(size=2, category=category)
+        ProductFeatureFactory(product=products[0], feature_name=caliber, feature="5.45")
+        ProductFeatureFactory(product=products[1], feature_name=caliber, feature="7.62")
+        data = QueryDict(f'feature_{caliber.pk}=7.62')
+        expected_result = querysets.get_product_queryset_for_category_view(
+            category.slug, data
+        )
+        assert [card.pk for card in expected_result] == [products[1].pk]
@@ -0,0 +1,105 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from shop.cards import rebuild_product_cards
+from shop.models import Product, ProductCard, Review
+from shop.ratings import get_product_eval, reconcile_ratings
+from tests.e_commerce.factories import ProductFactory, ReviewFactory
+
+
+def get_rating(product: Product) -> tuple:
+    card = ProductCard.objects.get(pk=product.pk)
+    return card.review_count, card.grade_sum, card.grade_4_count, card.grade_5_count
+
+
+@pytest.mark.django_db
+class TestRatings:
+    pytestmark = pytest.mark.django_db
+
+    def test_review_created(self) -> None:
+        product: Product = ProductFactory()
+        ReviewFactory(product=product, grade=5)
+        ReviewFactory(product=product, grade=4)
+        expected_result = get_rating(product)
+        assert expected_result == (2, 9, 1, 1)
+
+    def test_review_changed(self) -> None:
+        product: Product = ProductFactory()
+        review: Review = ReviewFactory(product=product, grade=5)
+        review.grade = 4
+        review.save()
+        assert get_rating(product) == (1, 4, 1, 0)
+        review.like_num = 3
+        review.save()
+        assert get_rating(product) == (1, 4, 1, 0)
+
+    def test_review_moved_to_other_product(self) -> None:
+        product: Product = ProductFactory()
+        other: Product = ProductFactory()
+        review: Review = ReviewFactory(product=product, grade=5)
+        review.product = other
+        review.save()
+        assert get_rating(product) == (0, 0, 0, 0)
+        assert get_rating(other) == (1, 5, 0, 1)
+
+    def test_loaded_review_saved_without_reading_it_again(self) -> None:
+        review: Review = Review.objects.get(pk=ReviewFactory(grade=5).pk)
+        review.grade = 4
+        with CaptureQueriesContext(connection) as context:
+            review.save()
+        expected_result = [
+            query["sql"]
+            for query in context.captured_queries
+            if query["sql"].startswith("SELECT") and "shop_review" in query["sql"]
+        ]
+        assert expected_result == []
+        assert get_rating(review.product) == (1, 4, 1, 0)
+
+    def test_failed_rating_update_rolls_back_review(self, monkeypatch) -> None:
+        product: Product = ProductFactory()
+        review: Review = ReviewFactory(product=product, grade=5)
+
+        def fail(*args) -> None:
+            raise RuntimeError
+
+        monkeypatch.setattr("shop.ratings.apply_rating_changes", fail)
+        review.grade = 4
+        with pytest.raises(RuntimeError):
+            review.save()
+        assert Review.objects.get(pk=review.pk).grade == 5
+        assert get_rating(product) == (1, 5, 0, 1)
+
+    def test_review_deleted(self) -> None:
+        product: Product = ProductFactory()
+        review: Review = ReviewFactory(product=product, grade=5)
+        review.delete()
+        assert get_rating(product) == (0, 0, 0, 0)
+
+    def test_reconcile_ratings(self, capsys) -> None:
+        product: Product = ProductFactory()
+        ReviewFactory(product=product, grade=4)
+        ProductCard.objects.filter(pk=product.pk).update(review_count=7, grade_sum=0)
+        assert reconcile_ratings() == 1
+        assert get_rating(product) == (1, 4, 1, 0)
+        call_command("reconcile_ratings")
+        assert "Corrected 0 product cards" in capsys.readouterr().out
+
+    def test_rebuild_product_cards_keeps_ratings(self) -> None:
+        product: Product = ProductFactory()
+        ReviewFactory(product=product, grade=5)
+        rebuild_product_cards()
+        assert get_rating(product) == (1, 5, 0, 1)
+
+    def test_get_product_eval(self) -> None:
+        assert get_product_eval(9, 2) == "9"
+        assert get_product_eval(None, 0) == 0
+
+    def test_card_rating_on_home_page(self, settings) -> None:
+        settings.SHOP_PAGE_CACHE_VIEWS = ()
+        product: Product = ProductFactory()
+        ReviewFactory(product=product, grade=5)
+        expected_result = Client().get(reverse("shop:home")).content.decode()
+        assert 'star-ratings-css" title="10"' in expected_result
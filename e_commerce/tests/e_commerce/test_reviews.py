@@ -0,0 +1,50 @@
+import pytest
+from django.test import Client
+from shop.models import Product, Review
+from shop.reviews import get_review_page
+from shop.utils import modify_like_with_response
+from tests.e_commerce.factories import ProductFactory, ReviewFactory, UserFactory
+
+
+@pytest.mark.django_db
+class TestReviews:
+    pytestmark = pytest.mark.django_db
+
+    def test_helpfulness(self) -> None:
+        review: Review = ReviewFactory(like_num=5, dislike_num=2)
+        assert review.helpfulness == 3
+        modify_like_with_response(review.id, UserFactory().id, False, True)
+        review.refresh_from_db()
+        expected_result = review.helpfulness
+        assert expected_result == 2
+
+    def test_get_review_page(self, settings) -> None:
+        settings.SHOP_PRODUCT_REVIEWS_PAGE_SIZE = 2
+        product: Product = ProductFactory()
+        reviews = [
+            ReviewFactory(product=product, like_num=likes, dislike_num=0)
+            for likes in (1, 7, 3, 7)
+        ]
+        first = get_review_page(product)
+        assert list(first) == [reviews[3], reviews[1]]
+        expected_result = get_review_page(product, first.next_cursor)
+        assert list(expected_result) == [reviews[2], reviews[0]]
+        assert expected_result.next_cursor is None
+
+    def test_product_reviews_view(self, settings) -> None:
+        settings.SHOP_PRODUCT_REVIEWS_PAGE_SIZE = 1
+        settings.SHOP_PAGE_CACHE_VIEWS = ()
+        product: Product = ProductFactory()
+        ReviewFactory(product=product, like_num=9, dislike_num=0, review_text='Перший')
+        ReviewFactory(product=product, like_num=1, dislike_num=0, review_text='Другий')
+        response = Client().get(product.get_absolute_url())
+        assert 'Перший' in response.content.decode()
+        assert 'Другий' not in response.content.decode()
+        expected_result = Client().get(response.context['reviews_url']).json()
+        assert 'Другий' in expected_result['html']
+        assert expected_result['next'] is None
+
+    def test_product_reviews_invalid_cursor(self) -> None:
+        product: Product = ProductFactory()
+        response = Client().get(f'/product/{product.slug}/reviews/?cursor=broken')
+        assert response.status_code == 404
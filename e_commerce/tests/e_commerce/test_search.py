@@ -0,0 +1,114 @@
+from typing import List
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from faker import Faker
+from shop.models import Brand, Product, ProductCard, ProductSearchDocument
+from shop.search import (
+    HIGHLIGHT_START,
+    HIGHLIGHT_STOP,
+    SimpleSearchBackend,
+    get_query_terms,
+    get_search_backend,
+    highlight_snippet,
+    normalize_text,
+    rebuild_search_index,
+    stem,
+)
+from tests.e_commerce.factories import BrandFactory, ProductFactory
+
+
+def search_ids(query: str) -> List[int]:
+    return [card.pk for card in get_search_backend().search(query)]
+
+
+def test_normalize_text() -> None:
+    assert normalize_text("м'ясо") == normalize_text("мʼясо") == "мясо"
+    assert normalize_text("заа́мок") == "заамок"
+    assert normalize_text("ﬁlter") == "filter"
+    assert normalize_text(None) == ""
+
+
+def test_stem() -> None:
+    assert stem("рюкзаки") == stem("рюкзак") == "рюкзак"
+    assert stem("сумками") == stem("сумка") == "сумк"
+    assert stem("ніж") == "ніж"
+    assert stem("boots") == "boots"
+
+
+def test_get_query_terms() -> None:
+    assert get_query_terms("Тактичні  рюкзаки, тактичні!") == ["тактичн", "рюкзак"]
+    assert get_query_terms("  ...  ") == []
+
+
+def test_highlight_snippet() -> None:
+    expected_result = highlight_snippet(f"<b>{HIGHLIGHT_START}ніж{HIGHLIGHT_STOP}")
+    assert expected_result == "&lt;b&gt;<mark>ніж</mark>"
+
+
+@pytest.mark.django_db
+class TestProductSearch:
+    pytestmark = pytest.mark.django_db
+
+    def test_search_by_inflected_name(self) -> None:
+        product: Product = ProductFactory(name="Тактичний рюкзак")
+        ProductFactory(name="Сумка поясна")
+        assert search_ids("тактичні рюкзаки") == [product.pk]
+
+    def test_search_by_vendor_code_brand_and_description(self) -> None:
+        brand: Brand = BrandFactory(name="Helikon")
+        product: Product = ProductFactory(
+            brand=brand, vendor_code="PL-7731", description="Посилений м'який пояс"
+        )
+        assert search_ids("PL-7731") == [product.pk]
+        assert search_ids("helikon") == [product.pk]
+        assert search_ids("мʼякий поясом") == [product.pk]
+
+    def test_search_title_ranked_above_description(self) -> None:
+        in_body: Product = ProductFactory(description="Підсумок під магазин")
+        in_title: Product = ProductFactory(name="Підсумок", access_number=0)
+        ProductCard.objects.filter(pk=in_body.pk).update(access_number=100)
+        assert search_ids("підсумок") == [in_title.pk, in_body.pk]
+
+    def test_search_snippet(self) -> None:
+        ProductFactory(name="Кобура", description="Кобура для пістолета")
+        card = get_search_backend().search("кобура").get()
+        get_search_backend().add_snippets("кобура", [card])
+        assert f"{HIGHLIGHT_START}Кобура{HIGHLIGHT_STOP}" in card.snippet
+
+    def test_search_count_without_snippets(self) -> None:
+        ProductFactory(name="Кобура", description="Кобура для пістолета")
+        with CaptureQueriesContext(connection) as context:
+            expected_result = get_search_backend().search("кобура")[:100].count()
+        assert expected_result == 1
+        assert "snippet" not in context.captured_queries[-1]["sql"]
+
+    def test_search_empty_query(self) -> None:
+        ProductFactory()
+        assert not get_search_backend().search("!?").exists()
+
+    def test_search_brand_renamed(self, faker: Faker) -> None:
+        brand: Brand = BrandFactory()
+        product: Product = ProductFactory(brand=brand)
+        brand.name = "Mechanix"
+        brand.save()
+        assert search_ids("mechanix") == [product.pk]
+
+    def test_search_product_deleted(self) -> None:
+        product: Product = ProductFactory(name="Балаклава")
+        product.delete()
+        assert search_ids("балаклава") == []
+
+    def test_rebuild_search_index(self) -> None:
+        products: List[Product] = ProductFactory.create_batch(size=3)
+        ProductSearchDocument.objects.all().delete()
+        get_search_backend().clear()
+        assert rebuild_search_index(batch_size=2) == 3
+        assert search_ids(products[0].vendor_code) == [products[0].pk]
+
+    def test_simple_search_backend(self) -> None:
+        product: Product = ProductFactory(name="Тактичний рюкзак")
+        ProductFactory(name="Сумка поясна")
+        expected_result = SimpleSearchBackend().search("рюкзаки")
+        assert [card.pk for card in expected_result] == [product.pk]
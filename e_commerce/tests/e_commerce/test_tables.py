@@ -11,6 +11,7 @@ from shop.models import (
     OrderItem,
     PageData,
     Product,
+    ProductCard,
     ProductFeature,
     ProductImage,
     Review,
@@ -140,6 +141,21 @@ class TestProduct:
         assert expected_result == obj.__str__()
 
 
+@pytest.mark.django_db
+class TestProductCard:
+    pytestmark = pytest.mark.django_db
+
+    def test_get_absolute_url(self) -> None:
+        product: Product = ProductFactory()
+        expected_result = f'/product/{product.slug}/'
+        assert expected_result == product.card.get_absolute_url()
+
+    def test__str__(self) -> None:
+        obj: ProductCard = ProductFactory().card
+        expected_result = obj.name
+        assert expected_result == obj.__str__()
+
+
 @pytest.mark.django_db
 class TestProductFeature:
     pytestmark = pytest.mark.django_db
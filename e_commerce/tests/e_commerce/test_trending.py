@@ -0,0 +1,62 @@
+import datetime
+from typing import List
+
+import pytest
+from shop.models import Order, OrderItem, Product, ProductActivity, ProductCard, Sale
+from shop.querysets import querysets
+from shop.trending import (
+    add_log2,
+    get_event_score,
+    record_activity,
+    update_trending_scores,
+)
+from tests.e_commerce.factories import ProductFactory
+
+
+def test_add_log2() -> None:
+    assert add_log2(3, 3) == 4
+    assert add_log2(2000, 0) == 2000
+
+
+def test_get_event_score_decay(settings) -> None:
+    settings.SHOP_TRENDING_HALF_LIFE_HOURS = 24
+    moment = datetime.datetime(2024, 5, 1, tzinfo=datetime.timezone.utc)
+    old = get_event_score(moment, views=8, sales=0)
+    recent = get_event_score(moment + datetime.timedelta(days=3), views=1, sales=0)
+    assert old == pytest.approx(recent)
+    assert get_event_score(moment, views=0, sales=0) is None
+
+
+@pytest.mark.django_db
+class TestTrendingScores:
+    pytestmark = pytest.mark.django_db
+
+    def test_update_trending_scores(self, settings) -> None:
+        settings.SHOP_TRENDING_HALF_LIFE_HOURS = 24
+        settings.SHOP_TRENDING_SALE_WEIGHT = 10
+        products: List[Product] = ProductFactory.create_batch(size=3)
+        now = datetime.datetime.now(tz=datetime.timezone.utc)
+        record_activity(
+            now - datetime.timedelta(days=10), views={products[0].pk: 1000}
+        )
+        record_activity(now, views={products[1].pk: 5})
+        record_activity(now, sales={products[2].pk: 1})
+        expected_result = 3
+        assert update_trending_scores(batch_size=2) == expected_result
+        assert not ProductActivity.objects.exists()
+        assert list(
+            querysets.get_product_queryset_for_shop_home_view().values_list(
+                "pk", flat=True
+            )
+        ) == [products[2].pk, products[1].pk, products[0].pk]
+        assert update_trending_scores() == 0
+
+    def test_sale_records_activity(self) -> None:
+        product: Product = ProductFactory()
+        order = Order.objects.create()
+        OrderItem.objects.create(product=product, order=order, quantity=2)
+        Sale.objects.create(order=order)
+        activity = ProductActivity.objects.get(product=product)
+        assert (activity.views, activity.sales) == (0, 2)
+        update_trending_scores()
+        assert ProductCard.objects.get(pk=product.pk).trending_score > 0
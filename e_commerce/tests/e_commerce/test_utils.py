@@ -1,5 +1,4 @@
 import json
-import math
 from decimal import Decimal
 from typing import List, Tuple
 import copy
@@ -7,38 +6,33 @@ import pytest
 from django.db.models import Prefetch, Subquery, OuterRef, QuerySet
 from django.urls import reverse
 from faker import Faker
-from tests.e_commerce.conftest import find_instance
+from tests.e_commerce.conftest import find_instance, get_db_queries
 from django.core.paginator import Paginator
+from shop.facets import Facets
+from shop.pagination import KeysetPage
+from shop.pricing import CartLine, CartProduct
 
 from django.http import HttpRequest, QueryDict, HttpResponseRedirect, JsonResponse
 from shop.utils import (
     EmailBackend,
     DataMixin,
-    NestedNamespace,
     check_quantity_in_stock,
     decreasing_stock_items,
-    create_item,
-    define_cart_from_cookies,
     get_cookies_cart,
     correct_cart_order,
-    handling_brand_price_form,
-    get_product_list,
-    get_cart_item_quantity,
-    create_cookie_cart,
     cart_authorization_handler,
-    define_cart,
     define_page_range,
     clear_not_completed_order,
     define_order_list,
     define_buyer_data,
     define_category_with_super_category,
     define_category_list,
-    define_brand_list,
+    define_brand_choices,
+    define_feature_choices,
+    define_price_choices,
     define_category_title_product_list,
-    define_product_eval,
     modify_like_with_response,
     check_buyer_existence,
-    perform_orderItem_actions,
     get_order_with_cleaning,
     update_buyer,
     get_order,
@@ -48,11 +42,13 @@ from shop.utils import (
     get_response_dict_with_sale_creation,
     get_updated_response_dict,
 )
-from shop.forms import CheckoutForm, CustomUserCreationForm
-from django.contrib.auth.forms import AuthenticationForm
+from shop.forms import CheckoutForm
 from django.contrib.auth.models import User, AnonymousUser
+from shop.navigation import get_navigation_tree
 from shop.querysets import querysets
 from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from shop.models import (
     Brand,
     Buyer,
@@ -64,6 +60,7 @@ from shop.models import (
     OrderItem,
     PageData,
     Product,
+    ProductCard,
     ProductFeature,
     ProductImage,
     Review,
@@ -95,6 +92,13 @@ from tests.e_commerce.factories import (
 )
 
 
+def make_line(product: Product, quantity: int) -> CartLine:
+    return CartLine(
+        CartProduct(product.id, product.name, product.price, product.sold, ''),
+        quantity,
+    )
+
+
 @pytest.mark.django_db
 class TestEmailBackend:
     pytestmark = pytest.mark.django_db
@@ -152,15 +156,15 @@ class TestDataMixin:
         setattr(data_mixin, 'request', HttpRequest())
         cache.clear()
         expected_result = data_mixin.get_user_context(**context)
-        assert expected_result['user_creation_form'].__class__ is CustomUserCreationForm
-        assert expected_result['user_login_form'].__class__ is AuthenticationForm
+        assert 'user_creation_form' not in expected_result
+        assert 'user_login_form' not in expected_result
         assert expected_result['cartItem'] == 0
         for key, value in context.items():
             assert expected_result[key] == value
-        super_categories = querysets.get_super_category_queryset_for_data_mixin()
+        super_categories = SuperCategory.objects.all()
         for super_category in expected_result['super_categories']:
             assert super_category in super_categories
-        categories = querysets.get_category_queryset_for_data_mixin()
+        categories = Category.objects.all()
         for category in expected_result['category_list']:
             assert category in categories
 
@@ -172,35 +176,15 @@ class TestDataMixin:
         data_mixin = DataMixin()
         setattr(data_mixin, 'request', HttpRequest())
         expected_result = data_mixin.get_user_context(**context)
-        assert expected_result['user_creation_form'].__class__ is CustomUserCreationForm
-        assert expected_result['user_login_form'].__class__ is AuthenticationForm
+        assert 'user_creation_form' not in expected_result
+        assert 'user_login_form' not in expected_result
         assert expected_result['cartItem'] == 0
         for key, value in context.items():
             assert expected_result[key] == value
-        super_categories = cache.get("super_categories")
-        if not super_categories:
-            super_categories = querysets.get_super_category_queryset_for_data_mixin()
-        for super_category in expected_result['super_categories']:
-            assert super_category in super_categories
-        categories = cache.get("category_list")
-        if not categories:
-            categories = querysets.get_category_queryset_for_data_mixin()
-        for category in expected_result['category_list']:
-            assert category in categories
-
-
-def test_nested_name_space(faker: Faker) -> None:
-    name_space = NestedNamespace({
-        'product': {
-            'id': faker.pyint(),
-            'name': faker.first_name(),
-            'price': faker.pydecimal(),
-        }
-    })
-    assert name_space.product.id.__class__ is int
-    assert name_space.product.__class__ is NestedNamespace
-    assert name_space.product.name.__class__ is str
-    assert name_space.product.price.__class__ is Decimal
+        assert len(expected_result['category_list']) == Category.objects.count()
+        with CaptureQueriesContext(connection) as queries:
+            data_mixin.get_user_context(**context)
+        assert not get_db_queries(queries)
 
 
 @pytest.mark.django_db
@@ -212,16 +196,7 @@ class TestCheckQuantityInStock:
         items = []
         for stock in stocks:
             ProductImageFactory(product=stock.product)
-            items.append(NestedNamespace({
-                "product": {
-                    "id": stock.product.id,
-                    "name": stock.product.name,
-                    "price": stock.product.price,
-                    "productimage": {"image": stock.product.productimage_set},
-                },
-                "quantity": stock.quantity,
-                "get_total": stock.quantity * stock.price,
-            }))
+            items.append(make_line(stock.product, stock.quantity))
         expected_result = check_quantity_in_stock(items)
         assert expected_result[0] == ''
         assert expected_result[1] == items
@@ -231,16 +206,7 @@ class TestCheckQuantityInStock:
         items, quantities = [], []
         for stock in stocks:
             ProductImageFactory(product=stock.product)
-            items.append(NestedNamespace({
-                "product": {
-                    "id": stock.product.id,
-                    "name": stock.product.name,
-                    "price": stock.product.price,
-                    "productimage": {"image": stock.product.productimage_set},
-                },
-                "quantity": stock.quantity + 1,
-                "get_total": stock.quantity * stock.price,
-            }))
+            items.append(make_line(stock.product, stock.quantity + 1))
             quantities.append(stock.quantity + 1)
         expected_result = check_quantity_in_stock(items)
         assert expected_result[0] == ("Нажаль, в одній позиції зі списку виникли зміни."
@@ -256,16 +222,7 @@ class TestCheckQuantityInStock:
         items = []
         for stock in stocks:
             ProductImageFactory(product=stock.product)
-            items.append(NestedNamespace({
-                "product": {
-                    "id": stock.product.id,
-                    "name": stock.product.name,
-                    "price": stock.product.price,
-                    "productimage": {"image": stock.product.productimage_set.first()},
-                },
-                "quantity": stock.quantity - 1,
-                "get_total": stock.quantity * stock.price,
-            }))
+            items.append(make_line(stock.product, stock.quantity - 1))
         expected_result = check_quantity_in_stock(items)
         assert expected_result[0] == ''
         assert expected_result[1] == items
@@ -331,45 +288,6 @@ class TestDecreasingStockItems:
             assert stock.quantity == stock_quantity_list[i]
 
 
-@pytest.mark.django_db
-class TestCreateItem:
-    pytestmark = pytest.mark.django_db
-
-    def test_create_item(self, faker: Faker) -> None:
-        product_image: ProductImage = ProductImageFactory()
-        number = faker.pyint()
-        cart = {product_image.product.id: {'quantity': number}}
-        expected_result = create_item(
-            product_image.product,
-            product_image,
-            cart,
-            product_image.product.id
-        )
-        assert expected_result.product.id == product_image.product.id
-        assert expected_result.product.name == product_image.product.name
-        assert expected_result.product.price == product_image.product.price
-        assert expected_result.product.productimage.image == product_image
-        assert expected_result.quantity == number
-        assert expected_result.get_total == number * product_image.product.price
-
-
-@pytest.mark.django_db
-class TestDefineCartFromCookies:
-    pytestmark = pytest.mark.django_db
-
-    def test_define_cart_from_cookies(self) -> None:
-        request = HttpRequest()
-        cart = {str(i): {'quantity': i + 1} for i in range(5)}
-        request.COOKIES["cart"] = json.dumps(cart)
-        expected_result = define_cart_from_cookies(request)
-        assert expected_result == cart
-
-    def test_define_cart_from_cookies_empty(self) -> None:
-        request = HttpRequest()
-        expected_result = define_cart_from_cookies(request)
-        assert expected_result == {}
-
-
 @pytest.mark.django_db
 class TestGetCookiesCart:
     pytestmark = pytest.mark.django_db
@@ -378,26 +296,34 @@ class TestGetCookiesCart:
         products: List[Product] = ProductFactory.create_batch(size=5)
         [ProductImageFactory(product=product) for product in products]
         cart = {str(product.id): {'quantity': faker.pyint()} for product in products}
-        items, order = [], {}
+        order = {}
         order['get_order_items'] = sum(elem['quantity'] for elem in cart.values())
         order['get_order_total'] = sum(
             elem.price * cart[str(elem.id)]['quantity'] for elem in products
         )
-        items = [
-            create_item(
-                product,
-                product.productimage_set.first(),
-                cart,
-                str(product.id)
-            ) for product in products]
         cartItem = order['get_order_items']
         request = HttpRequest()
         request.COOKIES["cart"] = json.dumps(cart)
         expected_items, expected_order, expected_cartItems = get_cookies_cart(request)
         assert expected_order == order
         assert expected_cartItems == cartItem
+        items = {
+            product.id: (
+                product.name,
+                product.price,
+                product.productimage_set.first().image.url,
+                cart[str(product.id)]['quantity'],
+                cart[str(product.id)]['quantity'] * product.price,
+            ) for product in products
+        }
         for elem in expected_items:
-            assert elem in items
+            assert items[elem.product.id] == (
+                elem.product.name,
+                elem.product.price,
+                elem.product.image_url,
+                elem.quantity,
+                elem.get_total,
+            )
 
     def test_get_cookies_cart_empty(self, faker: Faker) -> None:
         request = HttpRequest()
@@ -416,16 +342,7 @@ class TestCorrectCartOrder:
         items, cart, order = [], {}, {"get_order_total": 0, "get_order_items": 0}
         for product in products:
             ProductImageFactory(product=product)
-            items.append(NestedNamespace({
-                "product": {
-                    "id": product.id,
-                    "name": product.name,
-                    "price": product.price,
-                    "productimage": {"image": product.productimage_set.first()},
-                },
-                "quantity": (number := faker.pyint()),
-                "get_total": number * product.price,
-            }))
+            items.append(make_line(product, (number := faker.pyint())))
             cart[product.id] = {'quantity': number}
             order['get_order_items'] += number
             order['get_order_total'] += product.price * number
@@ -440,132 +357,6 @@ class TestCorrectCartOrder:
         assert expected_order == order
 
 
-@pytest.mark.django_db
-class TestHandlingBrandPriceForm:
-    pytestmark = pytest.mark.django_db
-
-    def test_handling_brand_price_form_all(
-            self, preparation_for_filter_testing: Tuple[str, str, List[Tuple[Product, str]]]
-    ) -> None:
-        brand_1, brand_2, product_list = preparation_for_filter_testing
-        data = QueryDict(f'brand={brand_1}&brand={brand_2}&low=2&high=70')
-        expected_result = handling_brand_price_form(data, product_list)
-        for elem in expected_result:
-            assert elem[0].brand.name in {brand_1, brand_2}
-            assert elem[0].price in {10, 20, 30, 40, 50}
-        assert len(expected_result) == 10
-
-    def test_handling_brand_price_form_one_brand(
-            self, preparation_for_filter_testing: Tuple[str, str, List[Tuple[Product, str]]]
-    ) -> None:
-        brand_1, brand_2, product_list = preparation_for_filter_testing
-        data = QueryDict(f'brand={brand_1}')
-        expected_result = handling_brand_price_form(data, product_list)
-        for elem in expected_result:
-            assert elem[0].brand.name == brand_1
-            assert elem[0].price in {10, 20, 30, 40, 50}
-        assert len(expected_result) == 5
-
-    def test_handling_brand_price_form_one_brand_one_price(
-            self, preparation_for_filter_testing: Tuple[str, str, List[Tuple[Product, str]]]
-    ) -> None:
-        brand_1, brand_2, product_list = preparation_for_filter_testing
-        data = QueryDict(f'brand={brand_2}&low=50')
-        expected_result = handling_brand_price_form(data, product_list)
-        assert expected_result[0][0].price == 50
-        assert expected_result[0][0].brand.name == brand_2
-        assert len(expected_result) == 1
-
-    def test_handling_brand_price_form_empty_query(
-            self, preparation_for_filter_testing: Tuple[str, str, List[Tuple[Product, str]]]
-    ) -> None:
-        brand_1, brand_2, product_list = preparation_for_filter_testing
-        data = QueryDict()
-        expected_result = handling_brand_price_form(data, product_list)
-        assert len(expected_result) == 10
-
-    def test_handling_brand_price_form_all_brands_and_high_price(
-            self, preparation_for_filter_testing: Tuple[str, str, List[Tuple[Product, str]]]
-    ) -> None:
-        brand_1, brand_2, product_list = preparation_for_filter_testing
-        data = QueryDict(f'brand={brand_1}&brand={brand_2}&low=100')
-        expected_result = handling_brand_price_form(data, product_list)
-        assert not len(expected_result)
-
-    def test_handling_brand_price_form_brands_and_prices(
-            self, preparation_for_filter_testing: Tuple[str, str, List[Tuple[Product, str]]]
-    ) -> None:
-        brand_1, brand_2, product_list = preparation_for_filter_testing
-        data = QueryDict(f'brand={brand_1}&brand={brand_2}&low=20&high=40')
-        expected_result = handling_brand_price_form(data, product_list)
-        for elem in expected_result:
-            assert elem[0].brand.name in {brand_1, brand_2}
-            assert elem[0].price in {20, 30, 40}
-        assert len(expected_result) == 6
-
-
-@pytest.mark.django_db
-class TestGetProductList:
-    pytestmark = pytest.mark.django_db
-
-    def test_get_product_list(self) -> None:
-        products: List[Product] = ProductFactory.create_batch(size=5)
-        [ProductImageFactory(product=product) for product in products]
-        queryset = Product.objects.only("id", "name", "price").prefetch_related(
-                Prefetch(
-                    "productimage_set",
-                    queryset=ProductImage.objects.filter(
-                        id__in=Subquery(
-                            ProductImage.objects.filter(
-                                product=OuterRef("product_id")
-                            ).values_list("id", flat=True)[:1]
-                        )
-                    ),
-                )
-            )
-        expected_result = get_product_list(queryset)
-        for i, elem in enumerate(expected_result):
-            assert elem[0] == queryset[i]
-            assert elem[1] == queryset[i].productimage_set.first().image
-
-    def test_get_product_list_empty(self) -> None:
-        queryset = Product.objects.all()
-        expected_result = get_product_list(queryset)
-        assert expected_result == []
-
-
-class TestGetCartItemQuantity:
-
-    def test_get_cart_item_quantity(self, faker: Faker) -> None:
-        data = {i: {'quantity': faker.pyint()} for i in range(5)}
-        data_summ = sum(elem.get('quantity') for elem in data.values())
-        expected_result = get_cart_item_quantity(data)
-        assert expected_result == data_summ
-
-    def test_get_cart_item_quantity_empty(self) -> None:
-        expected_result = get_cart_item_quantity({})
-        assert expected_result == 0
-
-
-@pytest.mark.django_db
-class TestCreateCookieCart:
-    pytestmark = pytest.mark.django_db
-
-    def test_create_cookie_cart(self) -> None:
-        orderitems: List[OrderItem] = OrderItemFactory.create_batch(size=5)
-        queryset = OrderItem.objects.all()
-        expected_result = create_cookie_cart(queryset)
-        for key, value in expected_result.items():
-            instance = find_instance(orderitems, key, 'id')
-            assert key == instance.product.id
-            assert value.get('quantity') == instance.quantity
-
-    def test_create_cookie_cart_empty(self) -> None:
-        queryset = OrderItem.objects.all()
-        expected_result = create_cookie_cart(queryset)
-        assert expected_result == {}
-
-
 @pytest.mark.django_db
 class TestCartAuthorizationHandler:
     pytestmark = pytest.mark.django_db
@@ -650,40 +441,6 @@ class TestCartAuthorizationHandler:
         assert expected_response.cookies['flag']['max-age'] == 1
 
 
-@pytest.mark.django_db
-class TestDefineCart:
-    pytestmark = pytest.mark.django_db
-
-    def test_define_cart(self) -> None:
-        order: Order = OrderFactory(complete=False)
-        orderitems: List[OrderItem] = OrderItemFactory.create_batch(
-            size=5, order=order
-        )
-        expected_result = define_cart('1', order.buyer.user)
-        for key, value in expected_result.items():
-            instance = find_instance(orderitems, int(key), 'id')
-            assert int(key) == instance.product.id
-            assert value.get('quantity') == instance.quantity
-
-    def test_define_cart_complete_order(self) -> None:
-        order: Order = OrderFactory(complete=True)
-        OrderItemFactory.create_batch(
-            size=5, order=order
-        )
-        expected_result = define_cart('1', order.buyer.user)
-        assert expected_result == {}
-
-    def test_define_cart_empty_flag(self) -> None:
-        user: User = UserFactory()
-        expected_result = define_cart(None, user)
-        assert expected_result == {}
-
-    def test_define_cart_anonymous_user(self) -> None:
-        user = AnonymousUser()
-        expected_result = define_cart('1', user)
-        assert expected_result == {}
-
-
 class TestDefinePageRange:
 
     def test_define_page_range(self) -> None:
@@ -706,6 +463,14 @@ class TestDefinePageRange:
         expected_result = define_page_range(context)
         assert expected_result is None
 
+    def test_define_page_range_keyset(self) -> None:
+        context = {
+            'page_obj': KeysetPage([], None, 'next', None),
+            'is_paginated': True,
+        }
+        expected_result = define_page_range(context)
+        assert expected_result is None
+
 
 @pytest.mark.django_db
 class TestClearNotCompletedOrder:
@@ -798,9 +563,8 @@ class TestDefineCategoryWithSuperCategory:
         CategoryFactory.create_batch(size=10)
         super_category: SuperCategory = SuperCategoryFactory()
         CategoryFactory.create_batch(size=5, super_category=super_category)
-        categories = Category.objects.all()
         expected_result = define_category_with_super_category(
-            categories, super_category.id
+            get_navigation_tree(), super_category.id
         )
         for elem in expected_result:
             assert elem.super_category.id == super_category.id
@@ -819,27 +583,31 @@ class TestDefineCategoryList:
             super_category=super_category
         )
         slug = samples[faker.random_int(min=0, max=4)].slug
-        categories = Category.objects.all()
-        expected_result = define_category_list(slug, categories)
+        expected_result = define_category_list(slug, get_navigation_tree())
         for elem in expected_result:
             assert elem.super_category.id == super_category.id
         assert len(expected_result) == 5
 
 
-@pytest.mark.django_db
-class TestDefineBrandList:
-    pytestmark = pytest.mark.django_db
+class TestDefineFilterChoices:
 
-    def test_define_brand_list(self) -> None:
-        ProductFactory.create_batch(size=5)
-        products = Product.objects.all()
-        brands = {product.brand.name for product in products}
-        expected_result = define_brand_list(products)
-        assert len(expected_result) == len(brands)
-        for elem in expected_result:
-            assert type(elem) is tuple
-            assert len(elem) == 2
-            assert elem[0] in brands
+    facets = Facets(
+        brands=[('Helikon', 3), ('Mil-Tec', 0)],
+        prices=[(0, 2), (5, 1)],
+        features=[(7, 'Колір', [('олива', 2)])],
+    )
+
+    def test_define_brand_choices(self) -> None:
+        expected_result = define_brand_choices(self.facets)
+        assert expected_result == [('Helikon', 'Helikon (3)'), ('Mil-Tec', 'Mil-Tec (0)')]
+
+    def test_define_price_choices(self) -> None:
+        expected_result = define_price_choices(self.facets)
+        assert expected_result == [('0', '0 – 500 (2)'), ('5', 'від 10000 (1)')]
+
+    def test_define_feature_choices(self) -> None:
+        expected_result = define_feature_choices(self.facets)
+        assert expected_result == [(7, 'Колір', [('олива', 'олива (2)')])]
 
 
 @pytest.mark.django_db
@@ -857,13 +625,13 @@ class TestDefineCategoryTitleProductList:
         index = faker.random_int(min=0, max=len(category_list)-1)
         slug = category_list[index].slug
         products = querysets.get_product_queryset_for_category_view(slug)
-        categories = querysets.get_category_queryset_for_data_mixin()
+        navigation = get_navigation_tree()
         exp_category, exp_title, exp_product_list = define_category_title_product_list(
-            products, slug, categories
+            products, slug, navigation
         )
         assert exp_category == category_list[index]
         assert exp_title == category_list[index].name
-        assert exp_product_list == get_product_list(products)
+        assert list(exp_product_list) == list(products)
 
     def test_define_category_title_product_list_empty_cat_slug(
             self, faker: Faker
@@ -875,13 +643,13 @@ class TestDefineCategoryTitleProductList:
         index = faker.random_int(min=0, max=len(category_list)-1)
         slug = category_list[index].slug
         products = querysets.get_product_queryset_for_category_view(slug)
-        categories = querysets.get_category_queryset_for_data_mixin()
+        navigation = get_navigation_tree()
         exp_category, exp_title, exp_product_list = define_category_title_product_list(
-            products, slug, categories
+            products, slug, navigation
         )
         assert exp_category == category_list[index]
         assert exp_title == category_list[index].name
-        assert exp_product_list == get_product_list(products)
+        assert list(exp_product_list) == list(products)
 
     def test_define_category_title_product_list_empty_cat_slug_dif(
             self, faker: Faker
@@ -893,35 +661,13 @@ class TestDefineCategoryTitleProductList:
         index = faker.random_int(min=0, max=len(category_list)-1)
         slug = category_list[index].slug[:-2]
         products = querysets.get_product_queryset_for_category_view(slug)
-        categories = querysets.get_category_queryset_for_data_mixin()
+        navigation = get_navigation_tree()
         exp_category, exp_title, exp_product_list = define_category_title_product_list(
-            products, slug, categories
+            products, slug, navigation
         )
-        assert exp_category == categories[0]
-        assert exp_title == categories[0].name
-        assert exp_product_list == get_product_list(products)
-
-
-@pytest.mark.django_db
-class TestDefineProductEval:
-    pytestmark = pytest.mark.django_db
-
-    def test_define_product_eval(self) -> None:
-        product: Product = ProductFactory()
-        reviews: List[Review] = ReviewFactory.create_batch(size=5, product=product)
-        product_review = querysets.get_review_queryset_for_product_view(product)
-        product_eval = 0
-        for review in product_review:
-            product_eval += review.grade
-        product_eval = str(int(math.ceil(2 * product_eval / product_review.count())))
-        expected_result = define_product_eval(product_review)
-        assert expected_result == product_eval
-
-    def test_define_product_eval_empty(self) -> None:
-        product: Product = ProductFactory()
-        product_review = querysets.get_review_queryset_for_product_view(product)
-        expected_result = define_product_eval(product_review)
-        assert expected_result == 0
+        assert exp_category == navigation.categories[0]
+        assert exp_title == navigation.categories[0].name
+        assert not exp_product_list
 
 
 @pytest.mark.django_db
@@ -936,7 +682,7 @@ class TestModifyLikeWithResponse:
         request.COOKIES['like'] = json.dumps('True')
         like_num, dislike_num = review.like_num, review.dislike_num
         expected_result = modify_like_with_response(
-            review, review.review_author, True, False
+            review.id, review.review_author.id, True, False
         )
         expected_like = Like.objects.get(
             like_author=review.review_author, review=review
@@ -955,7 +701,7 @@ class TestModifyLikeWithResponse:
         request.COOKIES['like'] = json.dumps('False')
         like_num, dislike_num = review.like_num, review.dislike_num
         expected_result = modify_like_with_response(
-            review, review.review_author, False, True
+            review.id, review.review_author.id, False, True
         )
         expected_like = Like.objects.get(
             like_author=review.review_author, review=review
@@ -974,10 +720,10 @@ class TestModifyLikeWithResponse:
         request.COOKIES['like'] = json.dumps('True')
         like_num, dislike_num = review.like_num, review.dislike_num
         modify_like_with_response(
-            review, review.review_author, True, False
+            review.id, review.review_author.id, True, False
         )
         expected_result = modify_like_with_response(
-            review, review.review_author, True, False
+            review.id, review.review_author.id, True, False
         )
         expected_like = Like.objects.get(
             like_author=review.review_author, review=review
@@ -996,10 +742,10 @@ class TestModifyLikeWithResponse:
         request.COOKIES['like'] = json.dumps('False')
         like_num, dislike_num = review.like_num, review.dislike_num
         modify_like_with_response(
-            review, review.review_author, False, True
+            review.id, review.review_author.id, False, True
         )
         expected_result = modify_like_with_response(
-            review, review.review_author, False, True
+            review.id, review.review_author.id, False, True
         )
         expected_like = Like.objects.get(
             like_author=review.review_author, review=review
@@ -1027,77 +773,6 @@ class TestCheckBuyerExistence:
 
 
 
-@pytest.mark.django_db
-class TestPerformOrderItemActions:
-    pytestmark = pytest.mark.django_db
-
-    def test_perform_orderItem_actions_add(self, faker: Faker) -> None:
-        order: Order = OrderFactory(complete=False)
-        products: List[Product] = ProductFactory.create_batch(size=5, sold=False)
-        order_items = [
-            OrderItemFactory(order=order, product=product) for product in products
-        ]
-        index = faker.random_int(min=0, max=4)
-        product_id = order_items[index].product.id
-        quantity = order_items[index].quantity
-        perform_orderItem_actions(product_id, 'add', order.buyer)
-        expected_result = OrderItem.objects.get(id=order_items[index].id).quantity
-        assert expected_result == quantity + 1
-
-    def test_perform_orderItem_actions_remove(self, faker: Faker) -> None:
-        order: Order = OrderFactory(complete=False)
-        products: List[Product] = ProductFactory.create_batch(size=5, sold=False)
-        order_items = [
-            OrderItemFactory(order=order, product=product) for product in products
-        ]
-        index = faker.random_int(min=0, max=4)
-        product_id = order_items[index].product.id
-        quantity = order_items[index].quantity
-        perform_orderItem_actions(product_id, 'remove', order.buyer)
-        expected_result = OrderItem.objects.get(id=order_items[index].id).quantity
-        assert expected_result == quantity - 1
-
-    def test_perform_orderItem_actions_add_product_sold(self, faker: Faker) -> None:
-        order: Order = OrderFactory(complete=False)
-        products: List[Product] = ProductFactory.create_batch(size=5, sold=True)
-        order_items = [
-            OrderItemFactory(order=order, product=product) for product in products
-        ]
-        index = faker.random_int(min=0, max=4)
-        product_id = order_items[index].product.id
-        quantity = order_items[index].quantity
-        perform_orderItem_actions(product_id, 'add', order.buyer)
-        expected_result = OrderItem.objects.get(id=order_items[index].id).quantity
-        assert expected_result == quantity
-
-    def test_perform_orderItem_actions_add_create_orderitem(
-            self, faker: Faker
-    ) -> None:
-        buyer: Buyer = BuyerFactory()
-        products: List[Product] = ProductFactory.create_batch(size=5, sold=False)
-        index = faker.random_int(min=0, max=4)
-        product_id = products[index].id
-        orderitem = OrderItem.objects.filter(product=products[index]).first()
-        perform_orderItem_actions(product_id, 'add', buyer)
-        expected_result = OrderItem.objects.get(product=products[index]).quantity
-        assert expected_result == 1
-        assert not orderitem
-
-    def test_perform_orderItem_actions_remove_zero(self, faker: Faker) -> None:
-        order: Order = OrderFactory(complete=False)
-        products: List[Product] = ProductFactory.create_batch(size=5, sold=False)
-        order_items = [
-            OrderItemFactory(
-                order=order, product=product, quantity=1
-            ) for product in products
-        ]
-        index = faker.random_int(min=0, max=4)
-        product_id = order_items[index].product.id
-        perform_orderItem_actions(product_id, 'remove', order.buyer)
-        expected_result = OrderItem.objects.filter(id=order_items[index].id)
-        assert not expected_result
-
-
 @pytest.mark.django_db
 class TestGetOrderWithCleaning:
     pytestmark = pytest.mark.django_db
@@ -1182,16 +857,7 @@ class TestGetOrderItemsList:
         items = []
         for product in products:
             quantity = faker.pyint(min_value=1)
-            items.append(NestedNamespace({
-                "product": {
-                    "id": product.id,
-                    "name": product.name,
-                    "price": product.price,
-                    "productimage": {"image": None},
-                },
-                "quantity": quantity,
-                "get_total": quantity * product.price,
-            }))
+            items.append(make_line(product, quantity))
         expected_result = get_order_items_list(items, order)
         for item in expected_result:
             instance = [elem for elem in items if elem.product.id == item.product.id][0]
@@ -1251,16 +917,7 @@ class TestGetResponseDictWithSaleCreation:
         items = []
         for orderitem in orderitems:
             quantity = faker.pyint(min_value=1)
-            items.append(NestedNamespace({
-                "product": {
-                    "id": orderitem.product.id,
-                    "name": orderitem.product.name,
-                    "price": orderitem.product.price,
-                    "productimage": {"image": None},
-                },
-                "quantity": quantity,
-                "get_total": quantity * orderitem.product.price,
-            }))
+            items.append(make_line(orderitem.product, quantity))
             incomes.append(
                 IncomeFactory(
                     product=orderitem.product,
@@ -1288,7 +945,6 @@ class TestGetResponseDictWithSaleCreation:
         }
         assert expected_result.get('message') == 'Оплата пройшла успішно'
         assert expected_result.get('warning') == ':)'
-        assert expected_result.get('cartJson') == json.dumps({})
         assert expected_sale
         assert not expected_stock
 
@@ -1298,16 +954,7 @@ class TestGetResponseDictWithSaleCreation:
         incomes: List[Income] = IncomeFactory.create_batch(size=5)
         items = []
         for income in incomes:
-            items.append(NestedNamespace({
-                "product": {
-                    "id": income.product.id,
-                    "name": income.product.name,
-                    "price": income.product.price,
-                    "productimage": {"image": None},
-                },
-                "quantity": income.income_quantity,
-                "get_total": income.income_quantity * income.product.price,
-            }))
+            items.append(make_line(income.product, income.income_quantity))
         initial = {
             'name': faker.user_name(),
             'email': faker.email(),
@@ -1329,7 +976,6 @@ class TestGetResponseDictWithSaleCreation:
         }
         assert expected_result.get('message') == 'Оплата пройшла успішно'
         assert expected_result.get('warning') == ':)'
-        assert expected_result.get('cartJson') == json.dumps({})
         assert expected_sale
         assert not Stock.objects.all()
         assert expected_buyer.name == initial.get('name')
@@ -1349,16 +995,7 @@ class TestGetUpdatedResponseDict:
         incomes: List[Income] = IncomeFactory.create_batch(size=5)
         items = []
         for income in incomes:
-            items.append(NestedNamespace({
-                "product": {
-                    "id": income.product.id,
-                    "name": income.product.name,
-                    "price": income.product.price,
-                    "productimage": {"image": None},
-                },
-                "quantity": income.income_quantity,
-                "get_total": income.income_quantity * income.product.price,
-            }))
+            items.append(make_line(income.product, income.income_quantity))
         initial = {
             'name': faker.user_name(),
             'email': faker.email(),
@@ -1371,7 +1008,7 @@ class TestGetUpdatedResponseDict:
         context, message = dict(), 'Hello'
         args = QueryDict('', mutable=True)
         args.update(initial)
-        cart, order = correct_cart_order(items)
+        _, order = correct_cart_order(items)
         expected_result = get_updated_response_dict(
             context, message, items, CheckoutForm(args)
         )
@@ -1379,7 +1016,6 @@ class TestGetUpdatedResponseDict:
         expected_form_data = {key: form[key].value() for key in form.fields.keys()}
         assert isinstance(expected_result.get('checkout_form'), CheckoutForm)
         assert expected_result.get('message') == message
-        assert expected_result.get('cartJson') == json.dumps(cart)
         assert expected_result.get('order') == order
         for key, value in initial.items():
             assert expected_form_data[key] == value
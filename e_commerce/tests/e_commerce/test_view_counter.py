@@ -0,0 +1,79 @@
+import pytest
+from django.db import DatabaseError
+from shop import view_counter as view_counter_module
+from shop.models import Product, ProductCard, ProductViewSpill
+from shop.view_counter import ViewCounter
+from tests.e_commerce.factories import ProductFactory
+
+
+def test_view_counter_is_due(settings) -> None:
+    settings.SHOP_VIEW_FLUSH_INTERVAL = 3600
+    settings.SHOP_VIEW_FLUSH_SIZE = 2
+    counter = ViewCounter()
+    assert not counter.is_due()
+    counter.record(1)
+    counter.record(1)
+    assert not counter.is_due()
+    counter.record(2)
+    assert counter.is_due()
+
+
+@pytest.mark.django_db
+class TestViewCounterFlush:
+    pytestmark = pytest.mark.django_db
+
+    def test_flush(self) -> None:
+        first: Product = ProductFactory(access_number=5)
+        second: Product = ProductFactory(access_number=0)
+        counter = ViewCounter()
+        for product in (first, first, first, second):
+            counter.record(product.pk)
+        moment = counter.accessed[first.pk]
+        expected_result = 2
+        assert counter.flush() == expected_result
+        first.refresh_from_db()
+        second.refresh_from_db()
+        assert (first.access_number, second.access_number) == (8, 1)
+        assert first.last_access_at == moment
+        assert ProductCard.objects.get(pk=first.pk).access_number == 8
+        assert counter.flush() == 0
+
+    def test_flush_failure_keeps_views(self, monkeypatch) -> None:
+        product: Product = ProductFactory(access_number=0)
+        counter = ViewCounter()
+        counter.record(product.pk)
+
+        def fail(*args, **kwargs) -> None:
+            raise DatabaseError
+
+        monkeypatch.setattr(view_counter_module, "write_views", fail)
+        with pytest.raises(DatabaseError):
+            counter.flush()
+        counter.record(product.pk)
+        assert counter.deltas[product.pk] == 2
+        counter.spill()
+        assert not counter.deltas
+        assert ProductViewSpill.objects.get().views == 2
+        monkeypatch.undo()
+        assert ViewCounter().flush() == 1
+        product.refresh_from_db()
+        assert product.access_number == 2
+        assert not ProductViewSpill.objects.exists()
+        assert ViewCounter().flush() == 0
+
+
+    def test_flush_skips_deleted_products(self) -> None:
+        deleted: Product = ProductFactory(access_number=0)
+        product: Product = ProductFactory(access_number=0)
+        counter = ViewCounter()
+        counter.record(deleted.pk)
+        counter.record(product.pk)
+        ProductViewSpill.objects.create(
+            product=deleted, views=3, last_access_at=counter.accessed[deleted.pk]
+        )
+        deleted.delete()
+        expected_result = counter.flush()
+        assert expected_result == 1
+        assert not counter.deltas
+        product.refresh_from_db()
+        assert product.access_number == 1